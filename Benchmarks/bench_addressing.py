@@ -0,0 +1,57 @@
+'''
+Times loops that read variables bound in the closure's own environment and
+bound many scopes further out, to show the cost of variable access. Each
+identifier is read with an indexed load at the depth and slot it was
+resolved to when the control structures were generated.
+
+Run from the project root:  python3 -m Benchmarks.bench_addressing
+'''
+
+import contextlib
+import io
+import time
+
+from src.interpreter import Interpreter
+
+REPEATS = 5
+ITERATIONS = 20000
+
+# Reads only the loop's own parameters.
+LOCAL = f"""
+let rec Loop (n, a) = n eq 0 -> a | Loop (n - 1, a + n - n)
+in Print (Loop ({ITERATIONS}, 0))
+"""
+
+# Reads names bound by eight enclosing 'let's and by the loop's own recursive binding.
+OUTER = f"""
+let a = 1 in let b = 2 in let c = 3 in let d = 4 in
+let e = 5 in let f = 6 in let g = 7 in let h = 8 in
+let rec Loop n = n eq 0 -> a + h | Loop (n - a + b - c + d - e + f - g + h - 5)
+in Print (Loop {ITERATIONS})
+"""
+
+# Functions with many parameters, reading the last ones.
+WIDE = f"""
+let Pick (p, q, r, s, t, u, v, w) = w - v + u
+in let rec Loop n = n eq 0 -> 0 | Loop (n - Pick (1, 2, 3, 4, 5, 6, 7, 2))
+in Print (Loop {ITERATIONS})
+"""
+
+PROGRAMS = [("local", LOCAL), ("outer", OUTER), ("wide", WIDE)]
+
+def measure(source):
+    interpreter = Interpreter()
+    best = None
+    for _ in range(REPEATS):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            interpreter.run(source)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return interpreter.machine.stepCount, best
+
+if __name__ == "__main__":
+    print(f"{'program':>10} {'steps':>10} {'ms':>9} {'ns/step':>9}")
+    for name, source in PROGRAMS:
+        steps, seconds = measure(source)
+        print(f"{name:>10} {steps:>10} {seconds * 1000:>9.2f} {seconds / steps * 1e9:>9.1f}")
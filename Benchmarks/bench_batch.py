@@ -0,0 +1,43 @@
+'''
+Batch throughput in programs per second for growing numbers of worker
+processes. The Input/ corpus is copied COPIES times into a temporary
+directory and evaluated with src.batch.runBatch.
+
+Run from the project root:  python3 -m Benchmarks.bench_batch
+'''
+
+import glob
+import os
+import shutil
+import tempfile
+import time
+
+from Benchmarks.common import PROJECT_ROOT
+from src.batch import listPrograms, runBatch
+
+COPIES = 40
+
+def workerCounts():
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    return counts
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        for fileName in glob.glob(os.path.join(PROJECT_ROOT, "Input", "t*.txt")):
+            for copy in range(COPIES):
+                shutil.copy(fileName, os.path.join(directory, f"{copy:03}_{os.path.basename(fileName)}"))
+        programs = listPrograms(directory)
+
+        print(f"{'workers':>8} {'programs':>9} {'programs/s':>11} {'speedup':>8}")
+        base = None
+        for jobs in workerCounts():
+            start = time.perf_counter()
+            runBatch(programs, jobs=jobs)
+            rate = len(programs) / (time.perf_counter() - start)
+            base = base or rate
+            print(f"{jobs:>8} {len(programs):>9} {rate:>11.1f} {rate / base:>8.2f}")
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,61 @@
+'''
+Compares compiling a program from source (screen, parse, standardize and
+generate control structures) with loading its control structures from the
+compiled-artifact cache, in process and for complete myrpal.py runs.
+
+Programs make COUNT simultaneous definitions with 'and'; the evaluation
+itself is tiny, so the time is dominated by the front end.
+
+Run from the project root:  python3 -m Benchmarks.bench_cache
+'''
+
+import os
+import shutil
+import tempfile
+import time
+
+from Benchmarks.common import timeRun, writeProgram
+from src.artifactCache import ArtifactCache
+from src.ASTtoST import buildST
+from src.cseMachine import CSEMachine
+from src.parser import parseSource
+
+COUNTS = [100, 1000, 5000]
+REPEATS = 5
+
+def definitions(count):
+    lines = [f"f{i} x = x * {i} + (x - {i}) / 2" for i in range(count)]
+    return "let " + "\nand ".join(lines) + "\nin Print (f0 1)\n"
+
+def best(function):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    os.environ["RPAL_CACHE_DIR"] = directory
+    try:
+        print(f"{'definitions':>12} {'compile (ms)':>13} {'cache load (ms)':>16} {'run, cold (ms)':>15} {'run, warm (ms)':>15}")
+        for count in COUNTS:
+            source = definitions(count).encode()
+            cache = ArtifactCache(directory)
+            cache.store(source, CSEMachine().compile(buildST(parseSource(source))))
+
+            compileTime = best(lambda: CSEMachine().compile(buildST(parseSource(source))))
+            loadTime = best(lambda: cache.load(source))
+
+            fileName = writeProgram(source.decode())
+            try:
+                cold = min(timeRun(fileName)[0] for _ in range(REPEATS))
+                timeRun(fileName, useCache=True)
+                warm = min(timeRun(fileName, useCache=True)[0] for _ in range(REPEATS))
+            finally:
+                os.remove(fileName)
+
+            print(f"{count:>12} {compileTime * 1000:>13.2f} {loadTime * 1000:>16.2f} {cold * 1000:>15.1f} {warm * 1000:>15.1f}")
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,42 @@
+'''
+Runs programs nested 1k to 100k levels deep (nested lets, parentheses,
+conditional chains and aug chains) and reports the time per level. The parser,
+the standardizer and the control structure generator walk the tree with
+explicit stacks, so none of these programs reaches Python's recursion limit,
+which is left at its default.
+
+Run from the project root:  python3 -m Benchmarks.bench_deep
+'''
+
+import sys
+import time
+
+from src.interpreter import Interpreter
+
+DEPTHS = [1000, 10000, 100000]
+
+def nestedLets(depth):
+    return "let x0 = 0 in " + "".join(f"let x{i} = x{i - 1} + 1 in " for i in range(1, depth)) + f"x{depth - 1}"
+
+def nestedParentheses(depth):
+    return "(" * depth + "5" + ")" * depth
+
+def conditionalChain(depth):
+    return "".join(f"{i} eq {depth - 1} -> {i} | " for i in range(depth)) + "0"
+
+def augChain(depth):
+    return "nil" + "".join(f" aug {i}" for i in range(depth))
+
+PROGRAMS = [("let", nestedLets), ("parens", nestedParentheses), ("cond", conditionalChain), ("aug", augChain)]
+
+if __name__ == "__main__":
+    print(f"recursion limit {sys.getrecursionlimit()}")
+    print(f"{'program':>8} {'depth':>8} {'time (s)':>10} {'us/level':>10}")
+    interpreter = Interpreter(cache=None)
+    for name, build in PROGRAMS:
+        for depth in DEPTHS:
+            source = build(depth)
+            start = time.perf_counter()
+            interpreter.run(source)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>8} {depth:>8} {elapsed:>10.3f} {elapsed / depth * 1e6:>10.3f}")
@@ -0,0 +1,53 @@
+'''
+Dumps ASTs of 10k to 1M nodes and compares dumpTree with printing one line per
+node, the way the tree printer used to work. Each is timed writing to a
+block-buffered file and to a line-buffered one, which is how standard output
+behaves on a terminal.
+
+Run from the project root:  python3 -m Benchmarks.bench_dump
+'''
+
+import contextlib
+import os
+import time
+
+from src.node import dumpTree
+from src.parser import parseSource
+
+SIZES = [10000, 100000, 1000000]
+
+# Program whose AST has roughly 'size' nodes.
+def syntheticProgram(size):
+    return "let f x = x + 1 in " + " , ".join(f"f (x{i} * 2 - y{i}) aug 'str{i}'" for i in range(size // 9))
+
+def countNodes(root):
+    count = 0
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        count += 1
+        pending.extend(node.children)
+    return count
+
+# One print call per node, as the tree printer did before dumpTree.
+def printPerNode(node, depth=0):
+    print("." * depth + node.value)
+    for child in node.children:
+        printPerNode(child, depth + 1)
+
+def timeDump(dump, root, buffering):
+    with open(os.devnull, "w", buffering=buffering) as stream:
+        with contextlib.redirect_stdout(stream):
+            start = time.perf_counter()
+            dump(root)
+            return time.perf_counter() - start
+
+if __name__ == "__main__":
+    print(f"{'nodes':>10} {'buffering':>10} {'print (s)':>10} {'text (s)':>10} {'json (s)':>10} {'speedup':>8}")
+    for size in SIZES:
+        root = parseSource(syntheticProgram(size))
+        for name, buffering in (("block", -1), ("line", 1)):
+            printTime = timeDump(printPerNode, root, buffering)
+            textTime = timeDump(dumpTree, root, buffering)
+            jsonTime = timeDump(lambda tree: dumpTree(tree, format="json"), root, buffering)
+            print(f"{countNodes(root):>10} {name:>10} {printTime:>10.3f} {textTime:>10.3f} {jsonTime:>10.3f} {printTime / textTime:>7.1f}x")
@@ -0,0 +1,72 @@
+'''
+Reports machine steps per second for each evaluator on the Input/ corpus.
+
+Every program is run in a fresh process so that runs do not share memory
+or warmed-up caches. Only the evaluation itself is timed; lexing, parsing
+and standardizing are excluded.
+
+Run from the project root:  python3 -m Benchmarks.bench_engines
+'''
+
+import contextlib
+import glob
+import io
+import os
+import subprocess
+import sys
+import time
+
+from Benchmarks.common import PROJECT_ROOT
+
+REPEATS = 3
+
+# Runs one program with one engine in this process and prints "steps seconds".
+def measure(engineName, fileName, recursion="knot"):
+    from src import cseMachine
+
+    engine = cseMachine.engines[engineName]
+    timing = {}
+
+    def timedEngine(*arguments):
+        start = time.perf_counter()
+        engine(*arguments)
+        timing["seconds"] = time.perf_counter() - start
+
+    cseMachine.engines[engineName] = timedEngine
+    with contextlib.redirect_stdout(io.StringIO()):
+        machine = cseMachine.getResult(fileName, engine=engineName, recursion=recursion, useCache=False)
+    print(machine.stepCount, timing["seconds"])
+
+def runMeasure(engineName, fileName, recursion="knot"):
+    command = [sys.executable, "-m", "Benchmarks.bench_engines", "--measure", engineName, fileName, recursion]
+    output = subprocess.run(command, capture_output=True, text=True, cwd=PROJECT_ROOT).stdout.split()
+    return int(output[0]), float(output[1])
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3], sys.argv[4])
+        sys.exit(0)
+
+    from src.cseMachine import engines
+
+    files = [os.path.join(PROJECT_ROOT, "Input.txt")] + sorted(glob.glob(os.path.join(PROJECT_ROOT, "Input", "t*.txt")))
+    totals = {name: [0, 0.0] for name in engines}
+
+    print(f"{'program':>10} {'steps':>8}" + "".join(f" {name + ' (steps/s)':>20}" for name in engines))
+    for fileName in files:
+        row = f"{os.path.basename(fileName):>10}"
+        for index, name in enumerate(engines):
+            try:
+                steps, seconds = min((runMeasure(name, fileName) for _ in range(REPEATS)), key=lambda run: run[1])
+            except (IndexError, ValueError):
+                steps, seconds = 0, 0.0         # The program stopped with an error
+            # Engines that count no steps of their own are rated by the steps of the first engine.
+            if index == 0:
+                programSteps = steps
+                row += f" {steps:>8}"
+            totals[name][0] += programSteps
+            totals[name][1] += seconds
+            row += f" {(programSteps / seconds if seconds else 0):>20,.0f}"
+        print(row)
+
+    print(f"{'total':>10} {totals[next(iter(engines))][0]:>8}" + "".join(f" {(steps / seconds if seconds else 0):>20,.0f}" for steps, seconds in totals.values()))
@@ -0,0 +1,54 @@
+'''
+Measures the cost of applying a closure (creating a child scope and binding
+its parameter) as the number of bindings visible from the enclosing scope grows.
+
+The "copying" column reproduces the old behaviour where every child received a
+copy of all of its parent's variables; the "linked" column creates frames the
+way the CSE machine does with the current scope-chain Environment.
+
+Run from the project root:  python3 -m Benchmarks.bench_environment
+'''
+
+import time
+
+from src.environmentManager import Environment
+
+CALLS = 20000
+SCOPE_SIZES = [10, 100, 1000, 10000]
+
+def buildScope(size):
+    parent = Environment(0, None)
+    for i in range(size):
+        parent.addVariable(f"v{i}", i)
+    return parent
+
+# The old scopes: a dictionary of every visible variable and a list of children.
+def buildCopyingScope(size):
+    return {f"v{i}": i for i in range(size)}, []
+
+# The old addChild: copy every parent variable into the child.
+def copyingCall(parent, number):
+    variables, children = parent
+    child = (dict(variables), [])
+    children.append(child)
+    child[0]["x"] = number
+    return child[0]["v0"]
+
+# The CSE machine's closure application: a frame binding the parameter, linked to the parent.
+# Identifiers are resolved to a depth and slot beforehand, so reading 'v0' skips one link.
+def linkedCall(parent, number):
+    child = Environment(number, parent, ("x",), [number])
+    return child.parent.values[0]
+
+def timeCalls(call, parent):
+    start = time.perf_counter()
+    for number in range(CALLS):
+        call(parent, number)
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+if __name__ == "__main__":
+    print(f"{'bindings':>10} {'copying (us/call)':>20} {'linked (us/call)':>20}")
+    for size in SCOPE_SIZES:
+        copying = timeCalls(copyingCall, buildCopyingScope(size))
+        linked = timeCalls(linkedCall, buildScope(size))
+        print(f"{size:>10} {copying:>20.3f} {linked:>20.3f}")
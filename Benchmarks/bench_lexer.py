@@ -0,0 +1,90 @@
+'''
+Lexer throughput in MB/s and peak traced memory for multi-megabyte sources.
+
+"extractTokens" is the character-by-character lexer fed with a list of
+characters, as the screener used to do. "generateTokens" is the streaming
+lexer over a str, and "tokenizeFile" the streaming lexer over a memory-mapped
+file. The streaming lexers are consumed one token at a time without keeping
+the tokens, so their memory stays flat as the source grows.
+
+Run from the project root:  python3 -m Benchmarks.bench_lexer
+'''
+
+import glob
+import os
+import time
+import tracemalloc
+
+from Benchmarks.common import PROJECT_ROOT, writeProgram
+from src.lexicalAnalyzer import extractTokens, generateTokens, tokenizeFile
+
+SIZES_MB = [1, 4, 16]
+EXTRACT_LIMIT_MB = 4                        # extractTokens needs gigabytes of memory beyond this
+
+# Concatenates the Input/ corpus until the source reaches the requested size.
+def corpusSource(sizeMB):
+    programs = []
+    for fileName in sorted(glob.glob(os.path.join(PROJECT_ROOT, "Input", "t*.txt"))):
+        with open(fileName) as file:
+            programs.append(file.read())
+    chunk = "\n".join(programs) + "\n"
+    return chunk * (sizeMB * 1024 * 1024 // len(chunk) + 1)
+
+def runExtract(source, fileName):
+    characters = []
+    characters.extend(source)
+    return len(extractTokens(characters))
+
+def runGenerate(source, fileName):
+    count = 0
+    for _ in generateTokens(source):
+        count += 1
+    return count
+
+def runFile(source, fileName):
+    count = 0
+    for _ in tokenizeFile(fileName):
+        count += 1
+    return count
+
+LEXERS = [("extractTokens", runExtract), ("generateTokens", runGenerate), ("tokenizeFile", runFile)]
+
+MEMORY_SIZES_MB = [1, 4]                    # tracemalloc slows lexing down a lot, so memory uses smaller sources
+
+def throughput():
+    print(f"{'lexer':>15} {'size (MB)':>10} {'tokens':>10} {'MB/s':>8}")
+    for sizeMB in SIZES_MB:
+        source = corpusSource(sizeMB)
+        fileName = writeProgram(source)
+        megabytes = len(source) / (1024 * 1024)
+        try:
+            for name, lexer in LEXERS:
+                if name == "extractTokens" and sizeMB > EXTRACT_LIMIT_MB:
+                    continue
+                start = time.perf_counter()
+                count = lexer(source, fileName)
+                elapsed = time.perf_counter() - start
+                print(f"{name:>15} {megabytes:>10.1f} {count:>10} {megabytes / elapsed:>8.2f}")
+        finally:
+            os.remove(fileName)
+
+def memory():
+    print(f"{'lexer':>15} {'size (MB)':>10} {'peak memory (MB)':>17}")
+    for sizeMB in MEMORY_SIZES_MB:
+        source = corpusSource(sizeMB)
+        fileName = writeProgram(source)
+        megabytes = len(source) / (1024 * 1024)
+        try:
+            for name, lexer in LEXERS:
+                tracemalloc.start()
+                lexer(source, fileName)
+                peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                tracemalloc.stop()
+                print(f"{name:>15} {megabytes:>10.1f} {peak:>17.1f}")
+        finally:
+            os.remove(fileName)
+
+if __name__ == "__main__":
+    throughput()
+    print()
+    memory()
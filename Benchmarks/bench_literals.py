@@ -0,0 +1,41 @@
+'''
+Times literal-heavy RPAL loops. Every integer, string and identifier in the
+loop body used to be re-parsed from its node string (<INT:5>, <ID:x>) each
+time it was executed; they are now converted once when the control
+structures are generated.
+
+Run from the project root:  python3 -m Benchmarks.bench_literals [BASELINE_DIR]
+'''
+
+import os
+import sys
+
+from Benchmarks.common import PROJECT_ROOT, timeRun, writeProgram
+
+ITERATIONS = [2000, 4000, 8000]
+REPEATS = 3
+
+def arithmeticProgram(iterations):
+    literals = " + ".join(str(i) for i in range(1, 41))
+    return f"let rec Loop n = n eq 0 -> 0 | ({literals}) - 820 + Loop (n - 1) in Print (Loop {iterations})"
+
+def stringProgram(iterations):
+    strings = ", ".join(f"'s{i}'" for i in range(40))
+    return f"let rec Loop n = n eq 0 -> 0 | Order ({strings}) - 40 + Loop (n - 1) in Print (Loop {iterations})"
+
+PROGRAMS = [("Arith", arithmeticProgram), ("Strings", stringProgram)]
+
+if __name__ == "__main__":
+    roots = [("current", PROJECT_ROOT)]
+    if len(sys.argv) > 1:
+        roots.append(("baseline", os.path.abspath(sys.argv[1])))
+
+    print(f"{'program':>8} {'loops':>7}" + "".join(f" {name + ' (s)':>15}" for name, _ in roots))
+    for programName, program in PROGRAMS:
+        for iterations in ITERATIONS:
+            path = writeProgram(program(iterations))
+            try:
+                timings = [min(timeRun(path, projectRoot=root)[0] for _ in range(REPEATS)) for _, root in roots]
+            finally:
+                os.remove(path)
+            print(f"{programName:>8} {iterations:>7}" + "".join(f" {t:>15.3f}" for t in timings))
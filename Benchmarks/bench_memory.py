@@ -0,0 +1,72 @@
+'''
+Bytes per object for the classes created in the largest numbers: one Token
+per lexeme, one Node per AST node, and one Lambda plus one Environment per
+closure application. Sizes are measured with tracemalloc over many instances
+and include everything an instance allocates (its dict or slots, and any
+list, dict or string built in its constructor).
+
+Run from the project root:  python3 -m Benchmarks.bench_memory [BASELINE_DIR]
+
+When BASELINE_DIR points at another checkout of the interpreter, its classes
+are measured in a separate process and shown next to the current ones.
+'''
+
+import os
+import subprocess
+import sys
+import tracemalloc
+
+from Benchmarks.common import PROJECT_ROOT
+
+INSTANCES = 100000
+OBJECTS = ["token", "node", "closure", "environment"]
+
+# Imports the classes of the checkout at projectRoot and returns a constructor for each object kind.
+def constructors(projectRoot):
+    sys.path.insert(0, projectRoot)
+    from src.environmentManager import Environment
+    from src.node import Node
+    from src.structures import Lambda
+    from src.tokenDefinitions import Token
+
+    parent = Environment(0, None)
+    return {
+        "token": lambda i: Token("x", "<IDENTIFIER>", 1),
+        "node": lambda i: Node("gamma"),
+        "closure": lambda i: Lambda(1, "x", parent),
+        "environment": lambda i: Environment(i, parent),
+    }
+
+# Average number of traced bytes held by each of INSTANCES objects.
+def bytesPerObject(construct):
+    objects = [None] * INSTANCES
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(INSTANCES):
+        objects[i] = construct(i)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / INSTANCES
+
+def measure(projectRoot):
+    for name, construct in constructors(projectRoot).items():
+        print(name, bytesPerObject(construct))
+
+def runMeasure(projectRoot):
+    command = [sys.executable, "-m", "Benchmarks.bench_memory", "--measure", projectRoot]
+    output = subprocess.run(command, capture_output=True, text=True, cwd=PROJECT_ROOT).stdout.split()
+    return {name: float(size) for name, size in zip(output[::2], output[1::2])}
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--measure":
+        measure(sys.argv[2])
+        sys.exit(0)
+
+    roots = [("current", PROJECT_ROOT)]
+    if len(sys.argv) > 1:
+        roots.insert(0, ("baseline", os.path.abspath(sys.argv[1])))
+
+    sizes = [runMeasure(root) for _, root in roots]
+    print(f"{'object':>12}" + "".join(f" {label + ' (bytes)':>17}" for label, _ in roots))
+    for name in OBJECTS:
+        print(f"{name:>12}" + "".join(f" {size[name]:>17.1f}" for size in sizes))
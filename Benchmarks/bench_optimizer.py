@@ -0,0 +1,68 @@
+'''
+Counts the machine steps and times the evaluation of the Input/ corpus, of a
+loop full of constant expressions and of a loop full of local 'let' bindings,
+with and without the optimizer (-O).
+
+Run from the project root:  python3 -m Benchmarks.bench_optimizer
+'''
+
+import contextlib
+import glob
+import io
+import os
+import time
+
+from Benchmarks.common import PROJECT_ROOT
+from src.interpreter import Interpreter
+
+REPEATS = 3
+PROGRAMS = [os.path.join(PROJECT_ROOT, "Input.txt")] + sorted(glob.glob(os.path.join(PROJECT_ROOT, "Input", "t*.txt")))
+
+CONSTANT_LOOP = """
+let rec Loop n = n eq 0 -> 0
+               | (2 ** 10 + 3 gr 1000) & not (4 * 5 eq 21) -> Loop (n - 1 + 12 / 4 - 3)
+               | 1 / 0
+in Print (Loop 20000)
+"""
+
+LET_LOOP = """
+let rec Sum n = n eq 0 -> 0
+              | (let step = 1 in let scale = 2 in let Double x = x * scale in Double step / 2 + Sum (n - step))
+in Print (Sum 20000)
+"""
+
+def readSource(fileName):
+    with open(fileName, "rb") as file:
+        return file.read()
+
+# Best time of a few runs of one program, and the steps it took. None when the program fails.
+def measure(source, optimize):
+    interpreter = Interpreter(optimize=optimize)
+    best = None
+    for _ in range(REPEATS):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            try:
+                interpreter.run(source)
+            except SystemExit:
+                return None
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return interpreter.machine.stepCount, best
+
+if __name__ == "__main__":
+    programs = [(os.path.basename(fileName), readSource(fileName)) for fileName in PROGRAMS]
+    programs.append(("constants", CONSTANT_LOOP))
+    programs.append(("lets", LET_LOOP))
+
+    print(f"{'program':>10} {'steps':>10} {'-O steps':>10} {'ms':>9} {'-O ms':>9}")
+    totals = [0, 0, 0.0, 0.0]
+    for name, source in programs:
+        plain = measure(source, False)
+        optimized = measure(source, True)
+        if plain is None or optimized is None:
+            continue
+        row = (plain[0], optimized[0], plain[1] * 1000, optimized[1] * 1000)
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{name:>10} {row[0]:>10} {row[1]:>10} {row[2]:>9.2f} {row[3]:>9.2f}")
+    print(f"{'total':>10} {totals[0]:>10} {totals[1]:>10} {totals[2]:>9.2f} {totals[3]:>9.2f}")
@@ -0,0 +1,39 @@
+'''
+Parses synthetic token streams of 10k to 1M tokens and reports the time per
+token, which stays flat now that the parser reads through a cursor instead of
+deleting the first token of the list after every read.
+
+The tokens are built directly, so only the recursive-descent parser is timed.
+
+Run from the project root:  python3 -m Benchmarks.bench_parser
+'''
+
+import time
+
+from src import parser
+from src.tokenDefinitions import Token
+
+SIZES = [10000, 100000, 1000000]
+
+# Token stream for 'let x = 1 in x + 2 * x - 3 ...', roughly 'size' tokens long.
+def syntheticTokens(size):
+    tokens = [Token("let", "<KEYWORD>", 1), Token("x", "<IDENTIFIER>", 1), Token("=", "<OPERATOR>", 1),
+              Token("1", "<INTEGER>", 1), Token("in", "<KEYWORD>", 1), Token("x", "<IDENTIFIER>", 1)]
+    operators = ["+", "*", "-"]
+    i = 0
+    while len(tokens) < size:
+        tokens.append(Token(operators[i % 3], "<OPERATOR>", 1))
+        tokens.append(Token(str(i), "<INTEGER>", 1) if i % 2 else Token("x", "<IDENTIFIER>", 1))
+        i += 1
+    tokens[0].markAsFirst()
+    tokens[-1].markAsLast()
+    return tokens
+
+if __name__ == "__main__":
+    print(f"{'tokens':>10} {'time (s)':>10} {'us/token':>10}")
+    for size in SIZES:
+        tokens = syntheticTokens(size)
+        start = time.perf_counter()
+        parser.parseTokens(tokens)
+        elapsed = time.perf_counter() - start
+        print(f"{len(tokens):>10} {elapsed:>10.3f} {elapsed / len(tokens) * 1e6:>10.3f}")
@@ -0,0 +1,39 @@
+'''
+Compares the two ways the CSE machine can apply Y* on the recursive programs
+in Input/: unfolding an Eta closure on every recursive call ("eta") and
+building self-referencing closures once ("knot").
+
+Run from the project root:  python3 -m Benchmarks.bench_recursion
+'''
+
+import glob
+import os
+
+from Benchmarks.common import PROJECT_ROOT
+from Benchmarks.bench_engines import REPEATS, runMeasure
+
+MODES = ["eta", "knot"]
+
+def isRecursive(fileName):
+    with open(fileName) as file:
+        return "rec" in file.read().split()
+
+if __name__ == "__main__":
+    files = [os.path.join(PROJECT_ROOT, "Input.txt")] + sorted(glob.glob(os.path.join(PROJECT_ROOT, "Input", "t*.txt")))
+    files = [fileName for fileName in files if isRecursive(fileName)]
+
+    print(f"{'program':>10}" + "".join(f" {mode + ' steps':>11} {mode + ' (ms)':>10}" for mode in MODES))
+    totals = {mode: [0, 0.0] for mode in MODES}
+    for fileName in files:
+        row = f"{os.path.basename(fileName):>10}"
+        for mode in MODES:
+            try:
+                steps, seconds = min((runMeasure("cse", fileName, mode) for _ in range(REPEATS)), key=lambda run: run[1])
+            except (IndexError, ValueError):
+                steps, seconds = 0, 0.0         # The program stopped with an error
+            totals[mode][0] += steps
+            totals[mode][1] += seconds
+            row += f" {steps:>11} {seconds * 1000:>10.2f}"
+        print(row)
+
+    print(f"{'total':>10}" + "".join(f" {steps:>11} {seconds * 1000:>10.2f}" for steps, seconds in totals.values()))
@@ -0,0 +1,49 @@
+'''
+Times RPAL programs that return from many closure applications.
+
+Returning used to scan the stack backwards for the previous environment
+marker, so each return cost time proportional to the number of values the
+caller had pending on the stack. The deep recursive programs keep few values
+per frame; the "Calls" program returns 'size' times into a single frame that
+accumulates one pending value per call, which made it quadratic.
+
+Run from the project root:  python3 -m Benchmarks.bench_returns [BASELINE_DIR]
+
+When BASELINE_DIR points at another checkout of the interpreter, its
+timings are printed next to the current ones.
+'''
+
+import os
+import sys
+
+from Benchmarks.common import PROJECT_ROOT, timeRun, writeProgram
+
+SIZES = [2000, 4000, 8000]
+REPEATS = 3
+
+def sumProgram(size):
+    return f"let rec Sum n = n eq 0 -> 0 | n + Sum (n - 1) in Print (Sum {size})"
+
+def countProgram(size):
+    return f"let rec Count n = n eq 0 -> nil | (Count (n - 1)) aug n in Print (Order (Count {size}))"
+
+def callsProgram(size):
+    calls = ", ".join(f"Id {i}" for i in range(size))
+    return f"let Id x = x in Print (Order ({calls}))"
+
+PROGRAMS = [("Sum", sumProgram), ("Count", countProgram), ("Calls", callsProgram)]
+
+if __name__ == "__main__":
+    roots = [("current", PROJECT_ROOT)]
+    if len(sys.argv) > 1:
+        roots.append(("baseline", os.path.abspath(sys.argv[1])))
+
+    print(f"{'program':>8} {'size':>7}" + "".join(f" {name + ' (s)':>15}" for name, _ in roots))
+    for programName, program in PROGRAMS:
+        for size in SIZES:
+            path = writeProgram(program(size))
+            try:
+                timings = [min(timeRun(path, projectRoot=root)[0] for _ in range(REPEATS)) for _, root in roots]
+            finally:
+                os.remove(path)
+            print(f"{programName:>8} {size:>7}" + "".join(f" {t:>15.3f}" for t in timings))
@@ -0,0 +1,48 @@
+'''
+Screening time for growing sources.
+
+"reverse pop" is the original screener: the whole token list is built, then
+walked backwards with tokenStream.pop(i) for every whitespace, comment and
+line break token, so each removal shifts the tail of the list. "filterTokens"
+is the fused scan-and-screen pass, which never builds those tokens.
+
+Run from the project root:  python3 -m Benchmarks.bench_screener
+'''
+
+import os
+import time
+
+from Benchmarks.bench_lexer import corpusSource
+from Benchmarks.common import writeProgram
+from src.lexicalAnalyzer import tokenizeFile
+from src.screener import filterTokens, rpalKeywords
+
+SIZES_MB = [1, 2, 4]
+
+def reversePop(fileName):
+    tokenStream = list(tokenizeFile(fileName))
+    for i in range(len(tokenStream) - 1, -1, -1):
+        token = tokenStream[i]
+        if token.tokenType == "<IDENTIFIER>" and token.content in rpalKeywords:
+            token.markAsKeyword()
+        if token.tokenType == "<DELETE>" or token.content == "\n":
+            tokenStream.pop(i)
+    return tokenStream
+
+def fused(fileName):
+    return filterTokens(fileName)[0]
+
+SCREENERS = [("reverse pop", reversePop), ("filterTokens", fused)]
+
+if __name__ == "__main__":
+    print(f"{'screener':>13} {'size (MB)':>10} {'tokens':>10} {'time (s)':>9}")
+    for sizeMB in SIZES_MB:
+        fileName = writeProgram(corpusSource(sizeMB))
+        try:
+            for name, screener in SCREENERS:
+                start = time.perf_counter()
+                count = len(screener(fileName))
+                elapsed = time.perf_counter() - start
+                print(f"{name:>13} {sizeMB:>10} {count:>10} {elapsed:>9.2f}")
+        finally:
+            os.remove(fileName)
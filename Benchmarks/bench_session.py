@@ -0,0 +1,40 @@
+'''
+Runs the whole Input/ corpus in one process with a single Interpreter, and
+compares it with launching myrpal.py once per program.
+
+Run from the project root:  python3 -m Benchmarks.bench_session
+'''
+
+import contextlib
+import glob
+import io
+import os
+import time
+
+from Benchmarks.common import PROJECT_ROOT, timeRun
+from src.interpreter import Interpreter
+
+ROUNDS = 20
+PROGRAMS = [os.path.join(PROJECT_ROOT, "Input.txt")] + sorted(glob.glob(os.path.join(PROJECT_ROOT, "Input", "t*.txt")))
+
+def oneProcess():
+    interpreter = Interpreter()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for fileName in PROGRAMS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                try:
+                    interpreter.runFile(fileName)
+                except SystemExit:
+                    pass
+    return time.perf_counter() - start
+
+def processPerProgram():
+    return sum(timeRun(fileName)[0] for fileName in PROGRAMS)
+
+if __name__ == "__main__":
+    perProcess = processPerProgram()
+    session = oneProcess() / ROUNDS
+    print(f"{'mode':>22} {'corpus (s)':>11} {'per program (ms)':>17}")
+    print(f"{'process per program':>22} {perProcess:>11.3f} {perProcess / len(PROGRAMS) * 1000:>17.2f}")
+    print(f"{'one Interpreter':>22} {session:>11.3f} {session / len(PROGRAMS) * 1000:>17.2f}")
@@ -0,0 +1,36 @@
+'''
+Runs tail-recursive RPAL loops of growing length and reports the wall time
+and the peak number of live environments. With proper tail calls the peak
+stays constant; the legacy evaluator keeps one frame per iteration.
+
+Run from the project root:  python3 -m Benchmarks.bench_tailcalls
+'''
+
+import os
+
+from Benchmarks.common import timeRun, writeProgram
+
+ITERATIONS = [10000, 100000, 1000000]
+LEGACY_LIMIT = 100000                       # The legacy evaluator needs too much memory beyond this
+
+def loopProgram(iterations):
+    return f"let rec Loop (n, acc) = n eq 0 -> acc | Loop (n - 1, acc + 1) in Print (Loop ({iterations}, 0))"
+
+def peakEnvironments(output):
+    for line in output.splitlines():
+        if line.startswith("Peak live environments:"):
+            return int(line.split(":")[1])
+    return 0
+
+if __name__ == "__main__":
+    print(f"{'engine':>8} {'iterations':>11} {'time (s)':>10} {'peak live envs':>15}")
+    for engine in ("cse", "legacy"):
+        for iterations in ITERATIONS:
+            if engine == "legacy" and iterations > LEGACY_LIMIT:
+                continue
+            path = writeProgram(loopProgram(iterations))
+            try:
+                seconds, output = timeRun(path, switches=("--mem-stats", "--engine=" + engine))
+            finally:
+                os.remove(path)
+            print(f"{engine:>8} {iterations:>11} {seconds:>10.2f} {peakEnvironments(output):>15}")
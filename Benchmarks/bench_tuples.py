@@ -0,0 +1,32 @@
+'''
+Builds tuples element by element with 'aug' and reports the wall time.
+Every 'aug' used to copy the whole tuple, so the legacy evaluator is quadratic
+in the tuple size; the table-driven evaluator appends to a shared list.
+
+Run from the project root:  python3 -m Benchmarks.bench_tuples
+'''
+
+import os
+
+from Benchmarks.common import timeRun, writeProgram
+
+SIZES = [10000, 50000, 100000]
+LEGACY_LIMIT = 10000                        # Beyond this the legacy evaluator needs gigabytes and minutes
+
+def buildProgram(size):
+    return (f"let rec Build (n, t) = n eq 0 -> t | Build (n - 1, t aug n)\n"
+            f"in let T = Build ({size}, nil)\n"
+            f"in Print (Order T, T 1, T {size})")
+
+if __name__ == "__main__":
+    print(f"{'engine':>8} {'elements':>9} {'time (s)':>10}  output")
+    for engine in ("cse", "legacy"):
+        for size in SIZES:
+            if engine == "legacy" and size > LEGACY_LIMIT:
+                continue
+            path = writeProgram(buildProgram(size))
+            try:
+                seconds, output = timeRun(path, switches=("--engine=" + engine,))
+            finally:
+                os.remove(path)
+            print(f"{engine:>8} {size:>9} {seconds:>10.2f}  {output.strip()}")
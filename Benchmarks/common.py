@@ -0,0 +1,47 @@
+'''
+Helpers shared by the benchmark scripts: writing generated RPAL programs to
+temporary files and timing complete interpreter runs.
+
+Timed runs compile the program every time unless they ask for the cache, so
+timings measure the interpreter and not cache hits. Runs that do use the
+cache keep it in a temporary directory, never in the user's own cache.
+'''
+
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Writes an RPAL program to a temporary file and returns its path.
+def writeProgram(source):
+    handle, path = tempfile.mkstemp(suffix=".rpal", text=True)
+    with os.fdopen(handle, "w") as file:
+        file.write(source)
+    return path
+
+# Cache of compiled programs for the runs below, unless the caller has chosen one with RPAL_CACHE_DIR.
+CACHE_DIRECTORY = tempfile.mkdtemp(prefix="rpal-bench-cache-")
+atexit.register(shutil.rmtree, CACHE_DIRECTORY, True)
+
+# Whether the myrpal.py of a checkout has a cache that --no-cache turns off. Older checkouts have neither.
+def hasCache(projectRoot):
+    with open(os.path.join(projectRoot, "myrpal.py")) as file:
+        return "--no-cache" in file.read()
+
+# Runs myrpal.py from the given checkout in a fresh process, with '--no-cache' unless useCache is set.
+# Returns the wall time in seconds and the captured output.
+def timeRun(fileName, switches=(), projectRoot=PROJECT_ROOT, useCache=False):
+    if not useCache and hasCache(projectRoot) and "--no-cache" not in switches:
+        switches = ["--no-cache", *switches]
+    command = [sys.executable, os.path.join(projectRoot, "myrpal.py"), *switches, fileName]
+    environment = dict(os.environ)
+    environment.setdefault("RPAL_CACHE_DIR", CACHE_DIRECTORY)
+    start = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, cwd=projectRoot, env=environment)
+    elapsed = time.perf_counter() - start
+    return elapsed, result.stdout + result.stderr
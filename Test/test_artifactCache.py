@@ -0,0 +1,122 @@
+import unittest
+import contextlib
+import io
+import marshal
+import os
+import shutil
+import tempfile
+import time
+import sys
+from unittest import mock
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+from Test.test_engines import PROGRAMS
+from src import artifactCache
+from src.artifactCache import ArtifactCache, encodeInstruction
+from src.interpreter import Interpreter
+
+def encode(controlStructures):
+    return [[encodeInstruction(instruction) for instruction in structure] for structure in controlStructures]
+
+class TestArtifactCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip_on_corpus(self):
+        cache = ArtifactCache(self.directory)
+        compiled = Interpreter()
+        cached = Interpreter(cache=cache)
+        for fileName in PROGRAMS:
+            with self.subTest(program=os.path.basename(fileName)):
+                with open(fileName, "rb") as f:
+                    source = f.read()
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        expected = compiled.run(source)
+                except (SystemExit, Exception):
+                    continue                    # Programs that fail at run time
+                self.assertIsNone(cache.load(source))
+                self.assertEqual(cached.run(source), expected)
+                controlStructures, sourceLines = cache.load(source)
+                self.assertEqual(encode(controlStructures), encode(compiled.machine.controlStructures))
+                self.assertEqual(sourceLines, compiled.machine.sourceLines)
+                self.assertEqual(cached.run(source), expected)
+
+    def test_cached_run_skips_the_front_end(self):
+        interpreter = Interpreter(cache=ArtifactCache(self.directory))
+        self.assertEqual(interpreter.run("let x = 4 in x * x"), 16)
+        with mock.patch("src.cseMachine.parseSource", side_effect=AssertionError("front end used")):
+            self.assertEqual(interpreter.run("let x = 4 in x * x"), 16)
+
+    def test_key_depends_on_interpreter_version(self):
+        cache = ArtifactCache(self.directory)
+        path = cache.path("Print 1")
+        with mock.patch.object(artifactCache, "versionHash", b"another version"):
+            self.assertNotEqual(cache.path("Print 1"), path)
+
+    # Every module of the interpreter is part of the version, including the ones slots are resolved with.
+    def test_version_covers_every_module(self):
+        sourceDirectory = os.path.dirname(os.path.abspath(artifactCache.__file__))
+        original = artifactCache.interpreterVersion()
+        opened = []
+        realOpen = open
+        def recordingOpen(path, *args, **kwargs):
+            opened.append(os.path.basename(path))
+            return realOpen(path, *args, **kwargs)
+
+        with mock.patch.object(artifactCache, "versionHash", None), mock.patch("builtins.open", recordingOpen):
+            self.assertEqual(artifactCache.interpreterVersion(), original)
+        self.assertEqual(opened, sorted(name for name in os.listdir(sourceDirectory) if name.endswith(".py")))
+        self.assertIn("environmentManager.py", opened)
+
+    # Entries that read back but do not decode are misses, and the program is compiled again.
+    def test_malformed_entries_are_misses(self):
+        cache = ArtifactCache(self.directory)
+        source = "let x = 4 in x * x"
+        entries = [((((),),), ()), (((("x",),),), ()), ((((4, "x"),),), (b"",)), ((("gamma",),), (b"",)), (1, 2, 3)]
+        for entry in entries:
+            with self.subTest(entry=entry):
+                os.makedirs(self.directory, exist_ok=True)
+                with open(cache.path(source), "wb") as f:
+                    f.write(marshal.dumps(entry))
+                self.assertIsNone(cache.load(source))
+                self.assertEqual(Interpreter(cache=cache).run(source), 16)
+
+    def test_optimized_programs_have_their_own_entries(self):
+        cache = ArtifactCache(self.directory)
+        self.assertNotEqual(cache.path("Print (2 + 3)", "-O"), cache.path("Print (2 + 3)"))
+
+        plain = Interpreter(cache=cache)
+        optimized = Interpreter(cache=cache, optimize=True)
+        self.assertEqual(plain.run("Print (2 + 3)"), 5)
+        self.assertEqual(optimized.run("Print (2 + 3)"), 5)
+        self.assertLess(optimized.machine.stepCount, plain.machine.stepCount)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        sources = ["Print " + str(i) for i in range(4)]
+        cache = ArtifactCache(self.directory)
+        for source in sources[:3]:
+            Interpreter(cache=cache).run(source)
+        entrySize = os.path.getsize(cache.path(sources[0]))
+
+        past = time.time() - 100
+        for age, source in enumerate(sources[:3]):
+            os.utime(cache.path(source), (past + age, past + age))
+        cache.load(sources[0])                  # Now the most recently used entry
+
+        cache.maxBytes = 3 * entrySize
+        Interpreter(cache=cache).run(sources[3])
+
+        remaining = [source for source in sources if os.path.exists(cache.path(source))]
+        self.assertEqual(remaining, [sources[0], sources[2], sources[3]])
+
+if __name__ == '__main__':
+    unittest.main()
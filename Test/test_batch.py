@@ -0,0 +1,90 @@
+import unittest
+import io
+import json
+import shutil
+import signal
+import tempfile
+import time
+import sys, os
+from unittest import mock
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+from Test.test_engines import PROJECT_ROOT, run
+from src import batch
+from src.batch import listPrograms, runBatch, runProgram, writeSummary
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, source):
+        with open(os.path.join(self.directory, name), 'w') as f:
+            f.write(source)
+
+    def test_corpus_results_in_input_order(self):
+        programs = listPrograms(os.path.join(PROJECT_ROOT, "Input"))
+        records = runBatch(programs, jobs=2)
+
+        self.assertEqual([record["file"] for record in records], programs)
+        for record in records:
+            with self.subTest(program=os.path.basename(record["file"])):
+                self.assertEqual(record["output"], run(record["file"])[1])
+
+    def test_timeout_and_step_limit(self):
+        self.write("a_loop.rpal", "let rec Loop n = Loop (n + 1) in Loop 0")
+        self.write("b_count.rpal", "let rec Count n = n eq 0 -> 0 | Count (n - 1) in Print (Count 1000)")
+        self.write("c_quick.rpal", "Print (1 + 2)")
+
+        records = runBatch(listPrograms(self.directory), jobs=1, timeout=0.5)
+        self.assertEqual([record["status"] for record in records], ["timeout", "ok", "ok"])
+        self.assertEqual(records[2]["output"], "3\n")
+
+        records = runBatch(listPrograms(self.directory)[1:], jobs=1, stepLimit=100)
+        self.assertEqual([record["status"] for record in records], ["step-limit", "ok"])
+
+    def test_summary_is_json_lines(self):
+        self.write("one.rpal", "Print 'one'")
+        self.write("two.rpal", "Print x")
+
+        stream = io.StringIO()
+        writeSummary(runBatch(listPrograms(self.directory), jobs=1), stream)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        self.assertEqual([record["status"] for record in records], ["ok", "error"])
+        self.assertEqual(records[0]["result"], "one")
+        self.assertEqual(records[1]["output"], os.path.join(self.directory, "two.rpal") + ":1: Undeclared Identifier: x\n")
+        self.assertTrue(all(record["seconds"] >= 0 for record in records))
+
+    # Handling what the program left behind is not timed, so a slow one is not reported as a timeout.
+    @unittest.skipUnless(hasattr(signal, "setitimer"), "needs interval timers")
+    def test_alarm_stops_with_the_program(self):
+        class SlowError(Exception):
+            def __repr__(self):
+                time.sleep(0.2)
+                return "SlowError()"
+
+        interpreter = mock.Mock()
+        interpreter.runFile.side_effect = SlowError()
+        with mock.patch.object(batch, "workerInterpreter", interpreter):
+            record = runProgram("slow.rpal", timeout=0.05)
+            time.sleep(0.1)
+        self.assertEqual(record["status"], "error")
+        self.assertIn("SlowError()", record["output"])
+
+    def test_numeric_options_are_checked(self):
+        for switch in ("--jobs=abc", "--jobs=0", "--timeout=soon", "--max-steps=1.5"):
+            with self.subTest(switch=switch):
+                returnCode, output = run(self.directory, "--batch", switch)
+                self.assertEqual(returnCode, 1)
+                self.assertTrue(output.startswith("Invalid value for " + switch.partition("=")[0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import sys, os
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+import contextlib
+import io
+
+from src.ASTtoST import buildST
+from src.cseMachine import CSEMachine, compileInstruction
+from src.parser import parseSource
+from src.structures import Constant, Identifier, Lambda, Operator
+
+# Name, depth and slot of every identifier in the control structures of a program.
+def addresses(source):
+    controlStructures = CSEMachine().compile(buildST(parseSource(source)))
+    return sorted((symbol.name, symbol.depth, symbol.slot) for structure in controlStructures
+                  for symbol in structure if type(symbol) == Identifier)
+
+class TestCompileInstruction(unittest.TestCase):
+    def test_literals_are_converted(self):
+        self.assertEqual(compileInstruction("<INT:42>").value, 42)
+        self.assertEqual(compileInstruction("<STR:'hi'>").value, "hi")
+        self.assertIs(compileInstruction("<true>").value, True)
+        self.assertIs(compileInstruction("<false>").value, False)
+        self.assertEqual(compileInstruction("<nil>").value, ())
+        self.assertIsNone(compileInstruction("<dummy>").value)
+        self.assertEqual(compileInstruction("<Y*>").value, "Y*")
+
+    def test_identifiers_and_built_ins(self):
+        identifier = compileInstruction("<ID:x>")
+        self.assertIsInstance(identifier, Identifier)
+        self.assertEqual(identifier.name, "x")
+
+        builtIn = compileInstruction("<ID:Print>")
+        self.assertIsInstance(builtIn, Constant)
+        self.assertEqual(builtIn.value, "Print")
+
+    def test_operators(self):
+        plus = compileInstruction("+")
+        self.assertIsInstance(plus, Operator)
+        self.assertEqual((plus.symbol, plus.arity), ("+", 2))
+        self.assertEqual(compileInstruction("neg").arity, 1)
+
+    def test_other_values_stay_strings(self):
+        self.assertEqual(compileInstruction("gamma"), "gamma")
+        self.assertEqual(compileInstruction("beta"), "beta")
+
+class TestStaticAddressing(unittest.TestCase):
+    def test_identifiers_are_resolved_to_depth_and_slot(self):
+        self.assertEqual(addresses("let a = 5 in let f (p, q) = q + a in f (2, 3)"),
+                         [("a", 1, 0), ("f", 0, 0), ("q", 0, 1)])
+
+    # Conditional branches run in the environment of the code around them.
+    def test_branches_share_the_enclosing_scope(self):
+        self.assertEqual(addresses("fn x. fn y. x eq y -> x | y"),
+                         [("x", 1, 0), ("x", 1, 0), ("y", 0, 0), ("y", 0, 0)])
+
+    # An unbound name is reported when the program is compiled, even if it would never be reached.
+    def test_unbound_identifiers_fail_before_running(self):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            with self.assertRaises(SystemExit):
+                CSEMachine().compile(buildST(parseSource("(true -> 3 | undefined)")))
+        self.assertEqual(output.getvalue(), "<string>:1: Undeclared Identifier: undefined\n")
+
+class TestSourceLines(unittest.TestCase):
+    SOURCE = "let Sq x =\n    x * x\nin\nlet rec Loop n =\n    n eq 0 -> 0\n  | Loop (n - 1)\nin Loop (Sq 3)"
+
+    # (element, line) for every control element of the program, with closures and operators by name.
+    def lines(self, optimize=False):
+        machine = CSEMachine(optimize=optimize)
+        controlStructures = machine.compile(buildST(parseSource(self.SOURCE)))
+        names = {Lambda: lambda symbol: "lambda " + symbol.boundedVariable, Operator: lambda symbol: symbol.symbol,
+                 Identifier: lambda symbol: symbol.name, Constant: lambda symbol: symbol.value}
+        return [(names.get(type(symbol), str)(symbol), line) for structure, lines in zip(controlStructures, machine.sourceLines)
+                for symbol, line in zip(structure, lines)]
+
+    # Every control element has the line of the node it was generated from, kept through standardization.
+    def test_lines_follow_the_control_structures(self):
+        lines = self.lines()
+        for element in [("lambda Sq", 1), ("*", 2), ("Y*", 4), ("lambda n", 4), ("eq", 5), ("beta", 5), ("-", 6), ("Sq", 7)]:
+            self.assertIn(element, lines)
+
+    def test_lines_survive_optimization(self):
+        self.assertEqual([element for element in self.lines(True) if not element[1]], [])
+
+    def test_runtime_errors_give_the_line(self):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            with self.assertRaises(SystemExit):
+                machine = CSEMachine()
+                machine.sourceName = "test.rpal"
+                machine.evaluate(buildST(parseSource("let x = 'a'\nin\nItoS x")))
+        self.assertEqual(output.getvalue(), "test.rpal:3: Error: ItoS function can only accept integers.\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import atexit
+import shutil
+import subprocess
+import tempfile
+import glob
+import sys, os
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROGRAMS = [os.path.join(PROJECT_ROOT, "Input.txt")] + sorted(glob.glob(os.path.join(PROJECT_ROOT, "Input", "t*.txt")))
+
+# Cache of compiled programs for the runs below, so the tests never write to the user's own cache.
+CACHE_DIRECTORY = tempfile.mkdtemp(prefix="rpal-test-cache-")
+atexit.register(shutil.rmtree, CACHE_DIRECTORY, True)
+
+# Runs myrpal.py in a fresh process, exactly as it is used from the command line.
+def run(fileName, *switches, stderr=False):
+    command = [sys.executable, os.path.join(PROJECT_ROOT, "myrpal.py"), *switches, fileName]
+    environment = dict(os.environ, RPAL_CACHE_DIR=CACHE_DIRECTORY)
+    result = subprocess.run(command, capture_output=True, text=True, cwd=PROJECT_ROOT, env=environment)
+    if stderr:
+        return result.returncode, result.stdout, result.stderr
+    return result.returncode, result.stdout
+
+class TestEngines(unittest.TestCase):
+    # Differential test: every engine must match the legacy evaluator on the whole corpus.
+    def test_engines_match_legacy_on_corpus(self):
+        for fileName in PROGRAMS:
+            expected = run(fileName, "--engine=legacy")
+            for engine in ("cse", "vm", "pycompile"):
+                with self.subTest(program=os.path.basename(fileName), engine=engine):
+                    self.assertEqual(run(fileName, "--engine=" + engine), expected)
+
+    def test_tail_calls_run_in_constant_space(self):
+        loopFile = os.path.join(os.path.dirname(__file__), 'temp_tail_loop.rpal')
+        with open(loopFile, 'w') as f:
+            f.write("let rec Loop n = n eq 0 -> 'done' | Loop (n - 1) in Print (Loop 5000)")
+
+        try:
+            returnCode, output, report = run(loopFile, "--mem-stats", stderr=True)
+        finally:
+            os.remove(loopFile)
+
+        self.assertEqual((returnCode, output), (0, "done\n"))
+        peak = int(report.split("Peak live environments:")[1])
+        self.assertLess(peak, 10)
+
+    def test_knot_and_eta_recursion_agree(self):
+        for fileName in PROGRAMS:
+            with self.subTest(program=os.path.basename(fileName)):
+                self.assertEqual(run(fileName, "--recursion=knot"), run(fileName, "--recursion=eta"))
+
+    def test_knot_supports_simultaneous_definitions(self):
+        mutualFile = os.path.join(os.path.dirname(__file__), 'temp_mutual.rpal')
+        with open(mutualFile, 'w') as f:
+            f.write("let rec (Even n = n eq 0 -> true | Odd (n - 1) and Odd n = n eq 0 -> false | Even (n - 1))\n"
+                    "in Print (Even 10, Odd 7, Even 3)")
+
+        try:
+            self.assertEqual(run(mutualFile), (0, "(true, true, false)\n"))
+        finally:
+            os.remove(mutualFile)
+
+if __name__ == '__main__':
+    unittest.main()
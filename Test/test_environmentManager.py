@@ -7,7 +7,9 @@ sys.path.insert(
     os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
 )
 
-from src.environmentManager import Environment
+import gc
+
+from src.environmentManager import Environment, TrackedEnvironment, slotOf
 
 class TestEnvironment(unittest.TestCase):
     def test_add_variable(self):
@@ -23,9 +25,9 @@ class TestEnvironment(unittest.TestCase):
         child = Environment(2, parent)
         parent.addChild(child)
 
-        # Child inherits 'x'
-        self.assertIn("x", child.variables)
-        self.assertEqual(child.variables["x"], 100)
+        # Child sees 'x' through its parent link without copying it
+        self.assertNotIn("x", child.variables)
+        self.assertEqual(child.lookup("x"), 100)
 
     def test_override_in_child_does_not_affect_parent(self):
         parent = Environment(1, None)
@@ -36,9 +38,9 @@ class TestEnvironment(unittest.TestCase):
 
         # Child overrides 'v'
         child.addVariable("v", 99)
-        self.assertEqual(child.variables["v"], 99)
+        self.assertEqual(child.lookup("v"), 99)
         # Parent must remain unchanged
-        self.assertEqual(parent.variables["v"], 42)
+        self.assertEqual(parent.lookup("v"), 42)
 
     def test_parent_and_children_links(self):
         parent = Environment(1, None)
@@ -48,6 +50,12 @@ class TestEnvironment(unittest.TestCase):
         self.assertIn(child, parent.children)
         self.assertEqual(child.parent, parent)
 
+    def test_slotted_environment_keeps_its_attributes(self):
+        env = TrackedEnvironment(7, None)
+        self.assertFalse(hasattr(env, "__dict__"))
+        self.assertEqual(env.name, "e_7")
+        self.assertEqual(env.children, [])
+
     def test_grandchild_inherits_grandparent(self):
         grandparent = Environment(0, None)
         grandparent.addVariable("g", 7)
@@ -57,9 +65,55 @@ class TestEnvironment(unittest.TestCase):
         child = Environment(2, parent)
         parent.addChild(child)
 
-        # The child should have inherited "g" from grandparent
-        self.assertIn("g", child.variables)
-        self.assertEqual(child.variables["g"], 7)
+        # The child should resolve "g" from grandparent
+        self.assertEqual(child.lookup("g"), 7)
+
+    def test_unbound_name_raises_key_error(self):
+        parent = Environment(1, None)
+        child = Environment(2, parent)
+        parent.addChild(child)
+
+        with self.assertRaises(KeyError):
+            child.lookup("missing")
+
+    # Values are stored in the order of the names that bind them; a repeated name means its last value.
+    def test_values_are_stored_by_slot(self):
+        env = Environment(1, None, ("x", "y", "x"), [1, 2, 3])
+        self.assertEqual(env.values[1], 2)
+        self.assertEqual(env.lookup("x"), 3)
+        self.assertEqual(slotOf(env.names, "x"), 2)
+        self.assertIsNone(slotOf(env.names, "z"))
+
+    def test_lookup_walks_the_parent_chain(self):
+        grandparent = Environment(0, None)
+        grandparent.addVariable("g", 7)
+
+        parent = Environment(1, grandparent)
+        grandparent.addChild(parent)
+        child = Environment(2, parent)
+        parent.addChild(child)
+
+        self.assertEqual(child.lookup("g"), 7)
+        child.addVariable("g", 1)
+        self.assertEqual(child.lookup("g"), 1)
+        with self.assertRaises(KeyError):
+            child.lookup("missing")
+
+    def test_unreachable_environments_are_reclaimed(self):
+        TrackedEnvironment.resetStats()
+        root = TrackedEnvironment(0, None)
+
+        for i in range(1, 11):
+            frame = TrackedEnvironment(i, root)
+            frame.addVariable("i", i)
+        del frame
+        gc.collect()
+
+        # Only the root survives; the parent does not keep its children alive
+        self.assertEqual(TrackedEnvironment.created, 11)
+        self.assertEqual(TrackedEnvironment.live, 1)
+        # Root, the previous frame and the one being created
+        self.assertEqual(TrackedEnvironment.peakLive, 3)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import contextlib
+import io
+import sys, os
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+from Test.test_engines import PROGRAMS, run
+from src.interpreter import Interpreter
+
+# Runs a file on the interpreter and returns what myrpal.py would print, including error messages.
+def runInProcess(interpreter, fileName):
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        try:
+            result = interpreter.runFile(fileName)
+            if interpreter.printed:
+                print(result)
+        except SystemExit:
+            pass
+    return output.getvalue()
+
+class TestInterpreter(unittest.TestCase):
+    # One interpreter runs the whole corpus twice and prints what separate processes print.
+    def test_corpus_in_one_process_matches_command_line(self):
+        interpreter = Interpreter()
+        expected = {fileName: run(fileName)[1] for fileName in PROGRAMS}
+        for _ in range(2):
+            for fileName in PROGRAMS:
+                with self.subTest(program=os.path.basename(fileName)):
+                    self.assertEqual(runInProcess(interpreter, fileName), expected[fileName])
+
+    def test_run_source_text(self):
+        interpreter = Interpreter()
+        self.assertEqual(interpreter.run("let x = 3 in Print (x, 'a')"), "(3, a)")
+        self.assertTrue(interpreter.printed)
+        self.assertEqual(interpreter.run(b"nil aug 2 aug 3"), (2, 3))
+        self.assertFalse(interpreter.printed)
+
+    def test_no_state_leaks_between_runs(self):
+        interpreter = Interpreter(engine="legacy")
+        self.assertEqual(interpreter.run("let x = 3 in Print x"), 3)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            with self.assertRaises(SystemExit):
+                interpreter.run("Print x")
+        self.assertEqual(output.getvalue(), "<string>:1: Undeclared Identifier: x\n")
+
+    # Programs nested far deeper than Python's recursion limit parse, standardize and run.
+    def test_deeply_nested_programs(self):
+        depth = 4 * sys.getrecursionlimit()
+        interpreter = Interpreter()
+        programs = {
+            "let x0 = 0 in " + "".join(f"let x{i} = x{i - 1} + 1 in " for i in range(1, depth)) + f"x{depth - 1}": depth - 1,
+            "(" * depth + "5" + ")" * depth: 5,
+            "".join(f"{i} eq 7 -> {i} | " for i in range(depth)) + "0": 7,
+            "nil" + "".join(f" aug {i}" for i in range(depth)): tuple(range(depth)),
+        }
+        for source, expected in programs.items():
+            with self.subTest(program=source[:20]):
+                self.assertEqual(interpreter.run(source), expected)
+
+    # 'fn x y. E' is 'fn x. fn y. E', so y is bound in E whether or not the function is ever applied.
+    def test_lambdas_with_several_parameters(self):
+        for engine in ("cse", "legacy", "vm", "pycompile"):
+            with self.subTest(engine=engine):
+                interpreter = Interpreter(engine=engine)
+                self.assertEqual(interpreter.run("let f = fn x y. y in 3"), 3)
+                self.assertEqual(interpreter.run("let y = 1 in fn x y. 3"), "[lambda closure: x: 2]")
+                self.assertEqual(interpreter.run("let f = fn (a, b) c d. a + b * c - d in f (1, 2) 3 4"), 3)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Interpreter(engine="missing")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,9 @@ sys.path.insert(
     os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
 )
 
-from src.lexicalAnalyzer import extractTokens
+import glob
+
+from src.lexicalAnalyzer import extractTokens, generateTokens, tokenizeFile
 
 class TestLexicalAnalyzer(unittest.TestCase):
 
@@ -92,5 +94,39 @@ class TestLexicalAnalyzer(unittest.TestCase):
         # Since '@' is being classified as <OPERATOR>, we'll just verify it's tokenized
         self.assertIsNotNone(at_tok.tokenType)
 
+def describe(tokens):
+    return [(tok.content, tok.tokenType, tok.lineNumber, tok.isFirstToken, tok.isLastToken) for tok in tokens]
+
+class TestStreamingLexer(unittest.TestCase):
+    samples = [
+        "A 123 +",
+        "X",
+        "X\n",
+        "let x = 'multi\nline' in x // trailing comment\n",
+        "a +// comment cuts the operator\nb",
+        "x / y",
+        "12ab <= 'q' -> (1, 2) | nil",
+        "",
+    ]
+
+    def test_generate_tokens_matches_extract_tokens(self):
+        for sample in self.samples:
+            with self.subTest(sample=sample):
+                expected = describe(extractTokens(sample))
+                self.assertEqual(describe(generateTokens(sample)), expected)
+                self.assertEqual(describe(generateTokens(sample.encode())), expected)
+
+    def test_generate_tokens_is_lazy(self):
+        tokens = generateTokens("a b c")
+        self.assertEqual(next(tokens).content, "a")
+
+    def test_tokenize_file_matches_corpus(self):
+        projectRoot = os.path.join(os.path.dirname(__file__), '..')
+        for fileName in glob.glob(os.path.join(projectRoot, 'Input', 't*.txt')):
+            with self.subTest(program=os.path.basename(fileName)):
+                with open(fileName) as f:
+                    expected = describe(extractTokens(f.read()))
+                self.assertEqual(describe(tokenizeFile(fileName)), expected)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import sys, os
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+from Test.test_engines import PROGRAMS, run
+from src.ASTtoST import buildST
+from src.interpreter import Interpreter
+from src.optimizer import optimize
+from src.parser import parseSource
+
+def optimizedTree(source):
+    return optimize(buildST(parseSource(source)))[0]
+
+# Result and machine steps of a program, without and with -O.
+def steps(source):
+    plain = Interpreter()
+    optimized = Interpreter(optimize=True)
+    return (plain.run(source), plain.machine.stepCount), (optimized.run(source), optimized.machine.stepCount)
+
+class TestOptimizer(unittest.TestCase):
+    # Differential test: -O must print exactly what the unoptimized run prints.
+    def test_optimized_run_matches_on_corpus(self):
+        for fileName in PROGRAMS:
+            with self.subTest(program=os.path.basename(fileName)):
+                self.assertEqual(run(fileName, "-O", "--no-cache"), run(fileName, "--no-cache"))
+
+    def test_folds_literal_arithmetic(self):
+        root = optimizedTree("Print (2 ** 10 + 3)")
+        self.assertEqual(root.children[1].value, "<INT:1027>")
+
+        plain = Interpreter()
+        optimized = Interpreter(optimize=True)
+        self.assertEqual(optimized.run("Print (2 ** 10 + 3)"), plain.run("Print (2 ** 10 + 3)"))
+        self.assertLess(optimized.machine.stepCount, plain.machine.stepCount)
+
+    def test_drops_unreachable_branch(self):
+        self.assertEqual(optimizedTree("(3 gr 2 -> 'yes' | 'no')").value, "<STR:'yes'>")
+
+    def test_leaves_failing_expressions_to_run_time(self):
+        self.assertEqual(optimizedTree("(1 / 0)").value, "/")
+        self.assertEqual(optimizedTree("(1 + 'a')").value, "+")
+        self.assertEqual(optimizedTree("(2 ** 100000)").value, "**")
+
+    # A product of folded powers grows past the folding limit, and past str()'s digit limit, without '**'.
+    def test_leaves_large_products_to_run_time(self):
+        source = "Print ((" + " * ".join(["2 ** 2000"] * 8) + ") gr 0)"
+        self.assertEqual(steps(source)[1][0], steps(source)[0][0])
+        self.assertEqual(Interpreter(optimize=True).run(source), "true")
+        self.assertEqual(optimizedTree("(2 ** 4000 * 2 ** 4000)").value, "*")
+
+    def test_substitutes_literal_bindings(self):
+        root = optimizedTree("let x = 3 in let y = x * 2 in Print (y + x) where z = 1")
+        self.assertEqual([root.value] + [child.value for child in root.children], ["gamma", "<ID:Print>", "<INT:9>"])
+
+    def test_inlines_function_used_once(self):
+        (plain, plainSteps), (optimized, optimizedSteps) = steps("let Abs N = N ls 0 -> -N | N in Print (Abs (-7))")
+        self.assertEqual(optimized, plain)
+        self.assertEqual(optimizedSteps, 4)
+
+    def test_keeps_functions_used_twice_or_inside_functions(self):
+        root = optimizedTree("let f x = x + 1 in f (f 2)")
+        self.assertEqual(root.children[0].value, "lambda")
+        root = optimizedTree("let f x = x + 1 in fn y. f y")
+        self.assertEqual(root.children[0].value, "lambda")
+
+    def test_inlining_does_not_capture_names(self):
+        self.assertEqual(Interpreter(optimize=True).run("let g a = (let f x = x + a in let a = a * 2 in f 1) in g 10"), 11)
+
+    # Removing and moving parts of the tree keeps the numbers of the lambdas, which show up in the printed result.
+    def test_closure_numbers_are_unchanged(self):
+        for source in ["(false -> (fn a. a) | (fn b. b)) (fn c. c)",
+                       "(true -> (1 eq 1 -> (fn a. a) | (fn q. q)) | (fn b. (fn x. x) b)) (fn c. c)",
+                       "let Id x = x in let Const y = fn z. y in Id (Const 1)",
+                       "let n = 2 in (fn a. fn b. a + n) n"]:
+            with self.subTest(source=source):
+                self.assertEqual(Interpreter(optimize=True).run(source), Interpreter().run(source))
+
+if __name__ == '__main__':
+    unittest.main()
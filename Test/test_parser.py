@@ -1,4 +1,7 @@
 import unittest
+import contextlib
+import io
+import json
 import sys, os
 
 # ─── Ensure "<project_root>/src" is on sys.path ───
@@ -7,8 +10,9 @@ sys.path.insert(
     os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
 )
 
-from src.parser import parse
-from src.node import Node
+from src.parser import parse, parseTokens
+from src.screener import filterTokens, screenTokens
+from src.node import Node, dumpTree
 
 class TestParser(unittest.TestCase):
     def setUp(self):
@@ -47,5 +51,68 @@ class TestParser(unittest.TestCase):
         with self.assertRaises(SystemExit):
             parse(self.bad_file)
 
+    def test_parse_tokens_matches_parse(self):
+        tokens, _, _ = filterTokens(self.nested_file)
+        fromTokens = parseTokens(tokens)
+        fromFile = parse(self.nested_file)
+
+        self.assertEqual(fromTokens.value, fromFile.value)
+        self.assertEqual([child.value for child in fromTokens.children],
+                         [child.value for child in fromFile.children])
+
+    def test_deep_nesting_does_not_recurse(self):
+        depth = 4 * sys.getrecursionlimit()
+        tokens, _, _ = screenTokens("(" * depth + "x" + ")" * depth + " where rec x = 1")
+        root = parseTokens(tokens)
+        self.assertEqual(root.value, "where")
+        self.assertEqual([child.value for child in root.children], ["<ID:x>", "rec"])
+
+    # Input that stops in the middle of a rule ends with a syntax error instead of parsing forever.
+    def test_truncated_input_is_a_syntax_error(self):
+        for source in ("Print (", "let x =", "let x = 1 in x where", "(1 -> 2"):
+            with self.subTest(source=source):
+                tokens, _, _ = screenTokens(source)
+                with contextlib.redirect_stdout(io.StringIO()) as output:
+                    with self.assertRaises(SystemExit):
+                        parseTokens(tokens)
+                self.assertTrue(output.getvalue().startswith("Syntax error in line 1: "))
+
+    # A program may end with a keyword such as 'true' or 'nil'.
+    def test_program_ending_in_a_keyword(self):
+        tokens, _, _ = screenTokens("Print true")
+        root = parseTokens(tokens)
+        self.assertEqual([child.value for child in root.children], ["<ID:Print>", "<true>"])
+
+    # Leaves start on their token's line and every other node where its first child does.
+    def test_nodes_carry_source_lines(self):
+        tokens, _, _ = screenTokens("let f x =\n  x + 1\nin\nf 2")
+        root = parseTokens(tokens)
+        function, body = root.children
+        self.assertEqual([root.line, function.line, body.line], [1, 1, 4])
+        self.assertEqual([child.line for child in function.children], [1, 1, 2])
+        self.assertEqual([child.line for child in function.children[2].children], [2, 2])
+
+class TestDumpTree(unittest.TestCase):
+    def setUp(self):
+        tokens, _, _ = screenTokens("let f x = x + 1 in f 'a b'")
+        self.root = parseTokens(tokens)
+
+    def dump(self, format="text"):
+        stream = io.StringIO()
+        dumpTree(self.root, stream, format)
+        return stream.getvalue()
+
+    def test_text_format(self):
+        self.assertEqual(self.dump(), "let\n.function_form\n..<ID:f>\n..<ID:x>\n..+\n...<ID:x>\n...<INT:1>\n.gamma\n..<ID:f>\n..<STR:'a b'>\n")
+
+    def test_dumping_twice_gives_the_same_output(self):
+        self.assertEqual(self.dump(), self.dump())
+        self.assertEqual(self.dump("json"), self.dump("json"))
+
+    def test_json_format_matches_text_format(self):
+        nodes = [json.loads(line) for line in self.dump("json").splitlines()]
+        self.assertEqual(["." * node["depth"] + node["value"] for node in nodes], self.dump().splitlines())
+        self.assertEqual([node["children"] for node in nodes], [2, 3, 0, 0, 2, 0, 0, 2, 0, 0])
+
 if __name__ == '__main__':
     unittest.main()
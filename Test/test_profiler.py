@@ -0,0 +1,90 @@
+import unittest
+import json
+import tempfile
+import sys, os
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+from Test.test_engines import PROGRAMS, run
+from src.interpreter import Interpreter
+
+FIB = "let rec Fib n = n ls 2 -> n | Fib (n - 1) + Fib (n - 2) in let T = (1, 2, 3) in Print (Fib 10, T 2, Order T)"
+
+def profiled(source, recursion="knot"):
+    interpreter = Interpreter(profile=True, recursion=recursion)
+    result = interpreter.run(source)
+    return result, interpreter.machine
+
+class TestProfiler(unittest.TestCase):
+    # Profiling changes neither the result nor the number of steps.
+    def test_steps_match_unprofiled_run(self):
+        for recursion in ("knot", "eta"):
+            with self.subTest(recursion=recursion):
+                plain = Interpreter(recursion=recursion)
+                result, machine = profiled(FIB, recursion)
+                self.assertEqual(result, plain.run(FIB))
+                self.assertEqual(machine.profile.totalSteps, plain.machine.stepCount)
+                self.assertEqual(sum(machine.profile.rules.values()), machine.profile.totalSteps)
+                self.assertEqual(sum(machine.profile.steps.values()), machine.profile.totalSteps)
+
+    def test_counts_rules_and_invocations(self):
+        _, machine = profiled(FIB)
+        profile = machine.profile
+        self.assertEqual(profile.rules["gamma tuple"], 1)
+        self.assertEqual(profile.rules["built-in Order"], 1)
+        self.assertEqual(profile.rules["gamma Y*"], 1)
+
+        # Fib 10 makes 177 calls, each one an application of the body of 'lambda n'
+        body = next(number for number, label in profile.labels.items() if label == "lambda n")
+        self.assertEqual(profile.invocations[body], 177)
+        self.assertEqual(profile.rules["gamma lambda"], sum(profile.invocations.get(number, 0) for number, label in profile.labels.items()
+                                                          if label.startswith("lambda")))
+        self.assertEqual(profile.hotStructures()[0], next(number for number, label in profile.labels.items() if label.startswith("else-branch")))
+
+    # A tail call into another closure of the same lambda reuses the frame, and still counts as a call.
+    def test_tail_calls_into_the_same_lambda_are_counted(self):
+        _, machine = profiled("let Ap f x = f x in Ap (Ap (fn y. y)) 3")
+        profile = machine.profile
+        calls = {profile.labels[number]: count for number, count in profile.invocations.items()}
+        self.assertEqual(calls["lambda x"], 2)
+        self.assertEqual(calls["lambda f"], 2)
+        self.assertEqual(calls["lambda y"], 1)
+
+    # Steps are also counted per source line, and every structure starts on the line of its lambda or branch.
+    def test_points_back_to_source_lines(self):
+        interpreter = Interpreter(profile=True)
+        interpreter.run("let rec Fib n =\n    n ls 2 -> n\n  | Fib (n - 1) + Fib (n - 2)\nin Fib 10", "fib.rpal")
+        profile = interpreter.machine.profile
+        self.assertEqual(profile.hotLines()[0], 3)
+        self.assertEqual(sum(profile.lineSteps.values()), profile.totalSteps - profile.rules["exit environment"])
+        self.assertEqual({profile.labels[number]: profile.location(line) for number, line in profile.lines.items()},
+                         {"program": "fib.rpal:1", "lambda Fib": "fib.rpal:1", "lambda n": "fib.rpal:1",
+                          "then-branch in 3": "fib.rpal:2", "else-branch in 3": "fib.rpal:3"})
+
+    def test_writes_json_from_command_line(self):
+        handle, path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        try:
+            returnCode, output = run(PROGRAMS[0], "--profile=" + path, "--no-cache")
+            with open(path) as stream:
+                report = json.load(stream)
+        finally:
+            os.remove(path)
+
+        self.assertEqual((returnCode, output), run(PROGRAMS[0], "--no-cache"))
+        self.assertEqual(sum(report["rules"].values()), report["steps"])
+        self.assertLessEqual(report["structures"][-1]["steps"], report["structures"][0]["steps"])
+        self.assertEqual(report["source"], PROGRAMS[0])
+        self.assertTrue(all(entry["line"] > 0 for entry in report["lines"]))
+
+    def test_table_goes_to_stderr(self):
+        returnCode, output, report = run(PROGRAMS[0], "--profile", stderr=True)
+        self.assertEqual((returnCode, output), run(PROGRAMS[0]))
+        self.assertTrue(report.startswith("Machine steps: "))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import contextlib
+import io
+import sys, os
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+from src.ASTtoST import buildST
+from src.cseMachine import CSEMachine
+from src.interpreter import Interpreter
+from src.parser import parseSource
+from src.pythonCompiler import PythonCompiler, runPython
+from src.structures import Constant, EnvironmentMarker, Lambda
+
+PROGRAMS = [
+    "Print (7 / 2, -7 / 2, 2 ** 10, 3 - 5 - 1)",
+    "Print (nil aug 1 aug (2, 3) aug 'x', Order (1, 2, 3), Order nil)",
+    "Print ('a\\\\nb', true, (true, 'c'), ('d'))",
+    "Print (Conc 'ab' 'cd', Stem 'xyz', Stern 'xyz', ItoS 42, Isinteger 3, Isstring 3, Istuple nil)",
+    "let rec Fact n = n eq 0 -> 1 | n * Fact (n - 1) in Print (Fact 20)",
+    "let rec (Even n = n eq 0 -> true | Odd (n - 1) and Odd n = n eq 0 -> false | Even (n - 1)) in Print (Even 10, Odd 7)",
+    "let T = (5, 'b', true) in Print (T 2, T 3 -> T 1 | 0)",
+    "let Sum (a, b) = a + b in let Twice f x = f (f x) in Print (Twice (fn y. Sum (y, y)) 3)",
+    "let f x = x in f",
+    "fn x. fn y. x",
+    "let y = 1 in Print (fn x y. 3)",
+]
+
+# What myrpal.py would print for a program on one engine, or the error it stops with.
+def output(source, engine, recursion="knot"):
+    interpreter = Interpreter(engine=engine, recursion=recursion)
+    with contextlib.redirect_stdout(io.StringIO()) as printed:
+        try:
+            result = interpreter.run(source)
+            if interpreter.printed:
+                print(result)
+        except SystemExit:
+            pass
+        except Exception as error:
+            return type(error).__name__
+    return printed.getvalue()
+
+def pythonSource(source):
+    return PythonCompiler(CSEMachine().compile(buildST(parseSource(source)))).compile()
+
+class TestPythonCompiler(unittest.TestCase):
+    def test_matches_cse_machine(self):
+        for source in PROGRAMS:
+            for recursion in ("knot", "eta"):
+                with self.subTest(source=source, recursion=recursion):
+                    self.assertEqual(output(source, "pycompile", recursion), output(source, "cse", recursion))
+
+    def test_closures_print_like_the_cse_machine(self):
+        self.assertEqual(Interpreter(engine="pycompile").run("fn x. fn y. x"), Interpreter().run("fn x. fn y. x"))
+
+    # The recursive call is returned to the trampoline rather than made from the body.
+    def test_tail_calls_are_returned(self):
+        self.assertIn("return TailCall(", pythonSource("let rec Loop n = n eq 0 -> 0 | Loop (n - 1) in Loop 3"))
+        self.assertEqual(Interpreter(engine="pycompile").run("let rec Loop n = n eq 0 -> 'done' | Loop (n - 1) in Loop 200000"), "done")
+
+    def test_deep_recursion_and_nesting(self):
+        interpreter = Interpreter(engine="pycompile")
+        self.assertEqual(interpreter.run("let rec F n = n eq 0 -> 0 | 2 + F (n - 1) in F 20000"), 40000)
+        self.assertEqual(interpreter.run(" (true -> " * 200 + "3" + " | 4)" * 200), 3)
+
+    # A body that would leave two values on the stack only fails if it is run.
+    def test_malformed_structures_fail_when_run(self):
+        def evaluate(program):
+            machine = CSEMachine()
+            machine.controlStructures = [program, (Constant(3), Constant(4))]
+            machine.currentEnvironment = machine.environmentClass(0, None)
+            marker = EnvironmentMarker(machine.currentEnvironment, machine.currentEnvironment)
+            machine.stack.push(marker)
+            runPython(machine, marker)
+            return machine.stack[0]
+
+        closure = Lambda(1, "x", None, ("x",))
+        self.assertEqual(type(evaluate((closure,))), Lambda)
+        with self.assertRaises(ValueError):
+            evaluate(("gamma", closure, Constant(2)))
+
+    def test_step_limits_are_refused(self):
+        with self.assertRaises(ValueError):
+            Interpreter(engine="pycompile", stepLimit=100).run("1 + 2")
+
+if __name__ == '__main__':
+    unittest.main()
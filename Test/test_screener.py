@@ -7,7 +7,10 @@ sys.path.insert(
     os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
 )
 
-from src.screener import filterTokens
+import glob
+
+from src.lexicalAnalyzer import tokenizeFile
+from src.screener import filterTokens, rpalKeywords, screenTokens
 from src.tokenDefinitions import Token
 
 
@@ -196,5 +199,49 @@ def test_operators_and_punctuation(self):
         # Even if invalid, filterTokens still returns a list of tokens
         self.assertIsInstance(tokens, list)
 
+# The original two-pass screener: reverse traversal over the full token list, popping as it goes.
+def referenceFilter(fileName):
+    tokenStream = list(tokenizeFile(fileName))
+    for i in range(len(tokenStream) - 1, -1, -1):
+        token = tokenStream[i]
+        if token.tokenType == "<IDENTIFIER>" and token.content in rpalKeywords:
+            token.markAsKeyword()
+        if token.tokenType == "<DELETE>" or token.content == "\n":
+            tokenStream.pop(i)
+    if tokenStream:
+        tokenStream[-1].isLastToken = True
+    return tokenStream
+
+def describe(tokens):
+    return [(tok.content, tok.tokenType, tok.lineNumber, tok.isFirstToken, tok.isLastToken) for tok in tokens]
+
+class TestFusedScreener(unittest.TestCase):
+    def test_matches_reference_on_corpus(self):
+        projectRoot = os.path.join(os.path.dirname(__file__), '..')
+        for fileName in glob.glob(os.path.join(projectRoot, 'Input', '*')):
+            with self.subTest(program=os.path.basename(fileName)):
+                expected = referenceFilter(fileName)
+                tokens, invalid_flag, invalid_token = filterTokens(fileName)
+                self.assertEqual(describe(tokens), describe(expected))
+
+                invalid = [tok for tok in expected if tok.tokenType == "<INVALID>"]
+                self.assertEqual(invalid_flag, bool(invalid))
+                if invalid:
+                    self.assertEqual(describe([invalid_token]), describe(invalid[:1]))
+
+    def test_first_invalid_token_in_source_order(self):
+        tokens, invalid_flag, invalid_token = screenTokens("let 1a = 2b in 3c")
+        self.assertTrue(invalid_flag)
+        self.assertEqual(invalid_token.content, "1a")
+
+    def test_first_flag_only_on_leading_lexeme(self):
+        tokens, _, _ = screenTokens(" x y")
+        self.assertFalse(any(tok.isFirstToken for tok in tokens))
+        tokens, _, _ = screenTokens(b"let x = 1 in x // done\n")
+        self.assertTrue(tokens[0].isFirstToken)
+        self.assertEqual([tok.isLastToken for tok in tokens].count(True), 1)
+        self.assertEqual(tokens[-1].content, "x")
+
+
 if __name__ == '__main__':
     unittest.main()
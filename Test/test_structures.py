@@ -0,0 +1,46 @@
+import unittest
+import sys, os
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+from src.structures import RpalTuple
+
+class TestRpalTuple(unittest.TestCase):
+    def test_extend_shares_the_backing_list(self):
+        first = RpalTuple([], 0).extend((1,))
+        second = first.extend((2,))
+        self.assertIs(first.items, second.items)
+        self.assertEqual(tuple(second), (1, 2))
+
+    def test_value_semantics_when_branching(self):
+        base = RpalTuple([1, 2], 2)
+        left = base.extend(("a",))
+        right = base.extend(("b",))
+
+        self.assertEqual(tuple(base), (1, 2))
+        self.assertEqual(tuple(left), (1, 2, "a"))
+        self.assertEqual(tuple(right), (1, 2, "b"))
+
+    def test_indexing_and_length(self):
+        values = RpalTuple([10, 20, 30, 40], 3)
+        self.assertEqual(len(values), 3)
+        self.assertEqual(values[0], 10)
+        self.assertEqual(values[-1], 30)
+        self.assertEqual(values[1:], (20, 30))
+        with self.assertRaises(IndexError):
+            values[3]
+
+    def test_compares_and_prints_like_a_tuple(self):
+        values = RpalTuple([1, "x", (2,)], 3)
+        self.assertEqual(values, (1, "x", (2,)))
+        self.assertEqual((1, "x", (2,)), values)
+        self.assertNotEqual(values, (1, "x"))
+        self.assertEqual(repr(values), repr((1, "x", (2,))))
+        self.assertEqual(str(RpalTuple([5], 1)), "(5,)")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import contextlib
+import io
+import sys, os
+
+# ─── Ensure "<project_root>/src" is on sys.path ───
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+)
+
+from src.ASTtoST import buildST
+from src.cseMachine import CSEMachine, StepLimitExceeded
+from src.environmentManager import TrackedEnvironment
+from src.interpreter import Interpreter
+from src.parser import parseSource
+from src.vm import BRANCH, GAMMA, RETURN, compileBytecode, opcodeNames
+
+PROGRAMS = [
+    "let Sum (a, b) = a + b in Print (Sum (3, 4))",
+    "let rec Fact n = n eq 0 -> 1 | n * Fact (n - 1) in Print (Fact 10)",
+    "let rec (Even n = n eq 0 -> true | Odd (n - 1) and Odd n = n eq 0 -> false | Even (n - 1)) in Print (Even 10, Odd 7)",
+    "let T = (5, 'b', true) in Print (T 2, Order T, Istuple T, nil aug T aug 3)",
+    "Print (Conc 'ab' 'cd', Stem 'xyz', Stern 'xyz', ItoS 42)",
+    "let rec Rev s = s eq '' -> '' | Conc (Rev (Stern s)) (Stem s) in Print (Rev 'hello')",
+    "let Twice f x = f (f x) in Print (Twice (fn y. y * 3) 2)",
+    "let rec Ones = 1 aug Ones in Order Ones",      # Fails the same way on every engine
+    "let C = Conc 'ab' in Print (C 'cd', C 'ef')",  # Conc needs both arguments at once
+    "let g x = Conc x in Print (g 'a' 'b')",
+    "Print (Isfunction Print, Isfunction (fn x. x), Isfunction 3)",
+]
+
+def compiled(source):
+    machine = CSEMachine()
+    return compileBytecode(machine.compile(buildST(parseSource(source))))
+
+# Result and step count of a program on one engine, or what it fails with.
+# Without 'steps', only the result, for engines that do not count steps.
+def outcome(source, engine, recursion="knot", steps=True):
+    interpreter = Interpreter(engine=engine, recursion=recursion)
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        try:
+            result = interpreter.run(source)
+            return (result, interpreter.machine.stepCount) if steps else result
+        except SystemExit:
+            return output.getvalue()
+        except Exception as error:
+            return type(error).__name__
+
+class TestBytecode(unittest.TestCase):
+    def test_code_is_an_int_array(self):
+        program = compiled("let f x = x + 1 in f 2")
+        self.assertEqual(program.code.typecode, "i")
+        self.assertEqual(len(program.starts), 3)     # The program, 'let' and f
+        ops = [opcodeNames[op] for op in program.code[program.starts[0]:program.starts[0] + 8:2]]
+        self.assertEqual(ops, ["LAMBDA", "LAMBDA", "GAMMA", "RETURN"])
+
+    # Branches are compiled inline; only lambda bodies are entered with a call.
+    def test_conditionals_are_inline(self):
+        program = compiled("fn x. x -> 1 | 2")
+        self.assertEqual(len(program.starts), 2)
+        self.assertIn(BRANCH, program.code[program.starts[1]::2])
+
+    # A closure applied at the end of a branch of a body is a tail call.
+    def test_branches_ending_a_body_return(self):
+        program = compiled("let rec Loop n = n eq 0 -> 0 | Loop (n - 1) in Loop 3")
+        ops = [opcodeNames[op] for op in program.code[program.entry::2]]
+        self.assertNotIn("JUMP", ops)
+        self.assertTrue(any(program.code[pc] == GAMMA and program.code[pc + 2] == RETURN for pc in range(program.entry, len(program.code) - 2, 2)))
+
+class TestVM(unittest.TestCase):
+    # The VM takes the same steps as the CSE machine, so step counts and limits agree.
+    def test_matches_cse_machine_with_step_counts(self):
+        for source in PROGRAMS:
+            for recursion in ("knot", "eta"):
+                with self.subTest(source=source, recursion=recursion):
+                    self.assertEqual(outcome(source, "vm", recursion), outcome(source, "cse", recursion))
+
+    # The Python back end counts no steps, but gives the same results and fails the same way.
+    def test_matches_python_back_end(self):
+        for source in PROGRAMS:
+            for recursion in ("knot", "eta"):
+                with self.subTest(source=source, recursion=recursion):
+                    self.assertEqual(outcome(source, "pycompile", recursion, steps=False), outcome(source, "vm", recursion, steps=False))
+
+    def test_step_limit(self):
+        with self.assertRaises(StepLimitExceeded):
+            Interpreter(engine="vm", stepLimit=100).run("let rec Loop n = Loop n in Loop 1")
+
+    def test_tail_calls_run_in_constant_space(self):
+        interpreter = Interpreter(engine="vm", memStats=True)
+        self.assertEqual(interpreter.run("let rec Loop n = n eq 0 -> 'done' | Loop (n - 1) in Loop 20000"), "done")
+        self.assertLess(TrackedEnvironment.peakLive, 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import sys
 from src.parser import parse
-from src.node import preOrderTraversal
+from src.node import dumpTree, treeFormats
 from src.ASTtoST import *
 from src.cseMachine import *
 
@@ -8,7 +8,7 @@ if __name__ == "__main__":
     arguments = sys.argv
     
     if len(arguments) < 2:
-        print("Incorrect usage. Please run the command as follows:\n python ./myrpal.py [-l] [-ast] [-st] filename")
+        print("Incorrect usage. Please run the command as follows:\n python ./myrpal.py [-l] [-ast] [-st] [--tree-format=FORMAT] [-O] [--mem-stats] [--profile[=FILE]] [--no-cache] [--engine=NAME] [--recursion=MODE] filename\n python ./myrpal.py --batch [--jobs=N] [--timeout=SECONDS] [--max-steps=N] [--summary=FILE] [-O] [--no-cache] [--engine=NAME] [--recursion=MODE] directory")
         sys.exit(1)
         
     else:
@@ -22,6 +22,16 @@ if __name__ == "__main__":
             
             if "-l" in switches or "-ast" in switches or "-st" in switches:
 
+                # '--tree-format=json' prints the trees as JSON lines instead of the indented text format.
+                treeFormat = "text"
+                for switch in switches:
+                    if switch.startswith("--tree-format="):
+                        treeFormat = switch[len("--tree-format="):]
+
+                if treeFormat not in treeFormats:
+                    print("Unknown tree format: " + treeFormat + ". Available formats: " + ", ".join(treeFormats))
+                    sys.exit(1)
+
                 # When '-l' is specified, output the raw contents of the file.
                 if "-l" in switches:
                     with open(file_name, "r") as file:
@@ -32,14 +42,14 @@ if __name__ == "__main__":
                 # When '-ast' is present, generate and display the abstract syntax tree (AST).
                 if "-ast" in switches:
                     ast = parse(file_name)
-                    preOrderTraversal(ast)
+                    dumpTree(ast, format=treeFormat)
                     
                     print()
                     
                     # If '-st' is also included, produce and show the standardized tree.
                     if "-st" in switches:
                         st = buildST(ast)
-                        preOrderTraversal(st)
+                        dumpTree(st, format=treeFormat)
 
                         print()
                         exit()
@@ -47,11 +57,103 @@ if __name__ == "__main__":
                 # If only '-st' is specified, create and print the standardized tree.
                 elif "-st" in switches:
                     st = standardize(file_name)
-                    preOrderTraversal(st)
+                    dumpTree(st, format=treeFormat)
 
                     print()
                     exit()
+
+            # '--batch' evaluates every file in the directory given last across a pool of processes and
+            # writes one JSON line per program, in file name order, to '--summary=FILE' or the console.
+            elif "--batch" in switches:
+                options = {"--jobs": None, "--timeout": None, "--max-steps": None, "--summary": None, "--engine": "cse", "--recursion": "knot"}
+                for switch in switches:
+                    name, _, value = switch.partition("=")
+                    if switch not in ("--batch", "--no-cache", "-O") and (name not in options or not value):
+                        print("Unknown batch option: " + switch)
+                        sys.exit(1)
+                    if value:
+                        options[name] = value
+
+                if options["--engine"] not in engines:
+                    print("Unknown engine: " + options["--engine"] + ". Available engines: " + ", ".join(engines))
+                    sys.exit(1)
+
+                if options["--recursion"] not in ("knot", "eta"):
+                    print("Unknown recursion mode: " + options["--recursion"] + ". Available modes: knot, eta")
+                    sys.exit(1)
+
+                if options["--engine"] == "pycompile" and options["--max-steps"]:
+                    print("The pycompile engine does not count machine steps, so --max-steps cannot be used with it")
+                    sys.exit(1)
+
+                # '--jobs' and '--max-steps' take whole numbers and '--timeout' any number of seconds, all above 0.
+                numbers = {}
+                for name, convert, expected in (("--jobs", int, "a positive integer"), ("--timeout", float, "a positive number of seconds"),
+                                                ("--max-steps", int, "a positive integer")):
+                    if options[name]:
+                        try:
+                            numbers[name] = convert(options[name])
+                        except ValueError:
+                            numbers[name] = 0
+                        if not 0 < numbers[name] < float("inf"):
+                            print("Invalid value for " + name + ": " + options[name] + ". Expected " + expected)
+                            sys.exit(1)
+                    else:
+                        numbers[name] = None
+
+                from src.batch import listPrograms, runBatch, writeSummary
+
+                records = runBatch(
+                    listPrograms(file_name),
+                    jobs=numbers["--jobs"],
+                    timeout=numbers["--timeout"],
+                    stepLimit=numbers["--max-steps"],
+                    engine=options["--engine"],
+                    recursion=options["--recursion"],
+                    useCache="--no-cache" not in switches,
+                    optimize="-O" in switches,
+                )
+
+                if options["--summary"]:
+                    with open(options["--summary"], "w") as summary:
+                        writeSummary(records, summary)
+                else:
+                    writeSummary(records, sys.stdout)
+
+            # Otherwise evaluate the program with the requested options.
+            # '--mem-stats' reports environment usage, '--engine=NAME' picks the evaluator,
+            # '--recursion=MODE' how it applies Y*, '--no-cache' skips the compiled-artifact cache,
+            # '-O' folds constant expressions and conditions before the program runs and '--profile'
+            # reports where the machine steps went, as a table on stderr or as JSON in '--profile=FILE'.
+            elif all(switch in ("-O", "--mem-stats", "--no-cache", "--profile") or switch.startswith(("--engine=", "--recursion=", "--profile=")) for switch in switches):
+                engine = "cse"
+                recursion = "knot"
+                profile = False
+                profileFile = None
+                for switch in switches:
+                    if switch.startswith("--engine="):
+                        engine = switch[len("--engine="):]
+                    elif switch.startswith("--recursion="):
+                        recursion = switch[len("--recursion="):]
+                    elif switch.startswith("--profile"):
+                        profile = True
+                        profileFile = switch[len("--profile="):] or None
+
+                if engine not in engines:
+                    print("Unknown engine: " + engine + ". Available engines: " + ", ".join(engines))
+                    sys.exit(1)
+
+                if recursion not in ("knot", "eta"):
+                    print("Unknown recursion mode: " + recursion + ". Available modes: knot, eta")
+                    sys.exit(1)
+
+                if profile and engine != "cse":
+                    print("Profiling is only supported by the cse engine")
+                    sys.exit(1)
+
+                getResult(file_name, memStats="--mem-stats" in switches, engine=engine, recursion=recursion, useCache="--no-cache" not in switches,
+                          optimize="-O" in switches, profile=profile, profileFile=profileFile)
             
             else:
-                print("Incorrect usage. Please run the command as follows:\n python ./myrpal.py [-l] [-ast] [-st] filename")
+                print("Incorrect usage. Please run the command as follows:\n python ./myrpal.py [-l] [-ast] [-st] [--tree-format=FORMAT] [-O] [--mem-stats] [--profile[=FILE]] [--no-cache] [--engine=NAME] [--recursion=MODE] filename\n python ./myrpal.py --batch [--jobs=N] [--timeout=SECONDS] [--max-steps=N] [--summary=FILE] [-O] [--no-cache] [--engine=NAME] [--recursion=MODE] directory")
                 sys.exit(1)
\ No newline at end of file
@@ -11,11 +11,24 @@ def standardize(fileName):
     standardizedTree = buildST(ast)
     return standardizedTree
 
-# Traverses and transforms the tree to a standardized form
+# Traverses and transforms the tree to a standardized form.
+# Nodes are visited in post-order from an explicit stack, so deeply nested programs
+# do not run into Python's recursion limit.
 def buildST(root):
-    for child in root.children:
-        buildST(child)
+    pending = [(root, False)]
+    while pending:
+        node, childrenDone = pending.pop()
+        if childrenDone:
+            standardizeNode(node)
+        else:
+            pending.append((node, True))
+            for child in reversed(node.children):
+                pending.append((child, False))
+    return root
 
+# Applies the standardize rule for one node whose children are already standardized.
+# Nodes a rule creates start on the line of the node it rewrites, or of the parameter they bind.
+def standardizeNode(root):
     if root.value == "let" and root.children[0].value == "=":
         # Uses the standardize rule to convert 'let' into a 'gamma' structure
         letExpr = root.children[0]
@@ -43,8 +56,8 @@ def buildST(root):
         currentNode = root
 
         for _ in range(len(root.children) - 1):
-            lambdaNode = Node("lambda")
             parameter = root.children.pop(1)
+            lambdaNode = Node("lambda", parameter.line)
             lambdaNode.children.append(parameter)
             currentNode.children.append(lambdaNode)
             currentNode = lambdaNode
@@ -58,23 +71,37 @@ def buildST(root):
         currentNode = root
 
         for _ in range(len(root.children) - 1):
-            lambdaNode = Node("lambda")
             argument = root.children.pop(1)
+            lambdaNode = Node("lambda", argument.line)
             lambdaNode.children.append(argument)
             currentNode.children.append(lambdaNode)
             currentNode = lambdaNode
 
         currentNode.children.append(finalExpr)
 
+    elif root.value == "lambda" and len(root.children) > 2:
+        # Use the standardize rule to convert 'fn V1 V2 ... . E' into nested single-parameter lambdas
+        body = root.children.pop()
+        currentNode = root
+
+        for _ in range(len(root.children) - 1):
+            parameter = root.children.pop(1)
+            lambdaNode = Node("lambda", parameter.line)
+            lambdaNode.children.append(parameter)
+            currentNode.children.append(lambdaNode)
+            currentNode = lambdaNode
+
+        currentNode.children.append(body)
+
     elif root.value == "within" and root.children[0].value == root.children[1].value == "=":
         # Uses the standardize rule to convert 'within' into a '= root' structure
         innerDef = root.children[1].children[0]
-        gammaNode = Node("gamma")
-        lambdaNode = Node("lambda")
+        gammaNode = Node("gamma", root.line)
+        lambdaNode = Node("lambda", root.line)
 
         lambdaNode.children.append(root.children[0].children[0])
         lambdaNode.children.append(root.children[1].children[1])
-        gammaNode.children.append(Node("<Y*>") if False else lambdaNode)  # keep style
+        gammaNode.children.append(Node("<Y*>", root.line) if False else lambdaNode)  # keep style
 
         gammaNode.children[0] = lambdaNode
         gammaNode.children[1] = root.children[0].children[1]
@@ -88,7 +115,7 @@ def buildST(root):
         functionExpr = root.children.pop(0)
         functionId = root.children[0]
 
-        innerGamma = Node("gamma")
+        innerGamma = Node("gamma", root.line)
         innerGamma.children.append(functionId)
         innerGamma.children.append(functionExpr)
 
@@ -97,8 +124,8 @@ def buildST(root):
 
     elif root.value == "and":
         # Uses the standardize rule to convert 'and' into a '= root' and 'tuple' structure
-        tupleNode = Node(",")
-        valueNode = Node("tau")
+        tupleNode = Node(",", root.line)
+        valueNode = Node("tau", root.line)
 
         for binding in root.children:
             tupleNode.children.append(binding.children[0])
@@ -114,12 +141,10 @@ def buildST(root):
         lambdaExpr = root.children.pop()
         lambdaExpr.value = "lambda"
 
-        gammaNode = Node("gamma")
-        gammaNode.children.append(Node("<Y*>"))
+        gammaNode = Node("gamma", root.line)
+        gammaNode.children.append(Node("<Y*>", root.line))
         gammaNode.children.append(lambdaExpr)
 
         root.children.append(lambdaExpr.children[0])
         root.children.append(gammaNode)
         root.value = "="
-
-    return root
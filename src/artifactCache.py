@@ -0,0 +1,165 @@
+'''
+On-disk cache of compiled control structures.
+
+An entry is keyed by a hash of the program source, of the interpreter version (all of its modules in src/)
+and of the compiler options (the variant, "-O" for optimized programs), so any
+change to one of them gives a new key. The control structures
+are stored as nested tuples of plain values in marshal format and load with
+a single read. The cache is bounded in size: the least recently used entries
+are removed first, with recency tracked through each file's modification time.
+The source line of every control element is stored with the control
+structures, so programs loaded from the cache report errors and profiles the
+same way as freshly compiled ones.
+
+The cache lives in $RPAL_CACHE_DIR, or in rpal-interpreter under
+$XDG_CACHE_HOME (default ~/.cache).
+'''
+
+from array import array
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+
+from src.structures import Constant, Delta, Identifier, Lambda, Tau
+
+CACHE_FORMAT = 3
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+versionHash = None
+
+# Hash of every module of the interpreter, computed once per process. Hashing all of them rather
+# than a list of the ones thought to matter means no change to the compiler can be missed.
+def interpreterVersion():
+    global versionHash
+
+    if versionHash is None:
+        digest = hashlib.sha256(str(CACHE_FORMAT).encode())
+        sourceDirectory = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(sourceDirectory)):
+            if name.endswith(".py"):
+                digest.update(name.encode() + b"\0")
+                with open(os.path.join(sourceDirectory, name), "rb") as module:
+                    digest.update(module.read())
+        versionHash = digest.digest()
+    return versionHash
+
+def defaultDirectory():
+    if os.environ.get("RPAL_CACHE_DIR"):
+        return os.environ["RPAL_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "rpal-interpreter")
+
+# Instructions become tagged tuples of values marshal can store. Control words (gamma, beta, ...) stay strings.
+def encodeInstruction(instruction):
+    kind = type(instruction)
+    if kind == str:
+        return instruction
+    elif kind == Lambda:
+        return (0, instruction.number, instruction.boundedVariable, instruction.parameters)
+    elif kind == Delta:
+        return (1, instruction.number)
+    elif kind == Tau:
+        return (2, instruction.number)
+    elif kind == Constant:
+        return (3, instruction.value)
+    elif kind == Identifier:
+        return (4, instruction.name, instruction.depth, instruction.slot)
+    else:
+        return (5, instruction.symbol)
+
+def decodeInstruction(code, compileInstruction):
+    if type(code) == str:
+        return code
+
+    tag = code[0]
+    if tag == 0:
+        return Lambda(code[1], code[2], None, tuple(sys.intern(name) for name in code[3]))
+    elif tag == 1:
+        return Delta(code[1])
+    elif tag == 2:
+        return Tau(code[1])
+    elif tag == 3:
+        return Constant(code[1])
+    elif tag == 4:
+        return Identifier(sys.intern(code[1]), code[2], code[3])
+    else:
+        return compileInstruction(code[1])
+
+class ArtifactCache:
+    def __init__(self, directory=None, maxBytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or defaultDirectory()
+        self.maxBytes = maxBytes
+        self.knownBytes = None              # Running estimate of the cache size, rescanned when it overflows
+
+    def path(self, source, variant=""):
+        if isinstance(source, str):
+            source = source.encode()
+        key = hashlib.sha256(interpreterVersion() + variant.encode() + b"\0" + bytes(source)).hexdigest()
+        return os.path.join(self.directory, key + ".rpalc")
+
+    # Returns the cached control structures for a source and their source lines, or None when there are
+    # none. An entry that cannot be read or decoded is treated the same as a missing one.
+    def load(self, source, variant=""):
+        from src.cseMachine import compileInstruction
+
+        path = self.path(source, variant)
+        try:
+            with open(path, "rb") as entry:
+                data = entry.read()
+            os.utime(path)                  # Marks the entry as recently used
+            structures, lines = marshal.loads(data)
+            controlStructures = [tuple(decodeInstruction(code, compileInstruction) for code in structure) for structure in structures]
+            sourceLines = [array("i", packed) for packed in lines]
+        except (OSError, ValueError, EOFError, TypeError, IndexError):
+            return None
+
+        if [len(structure) for structure in controlStructures] != [len(structureLines) for structureLines in sourceLines]:
+            return None
+        return controlStructures, sourceLines
+
+    # Stores the control structures for a source, with the source line of every control element
+    # when they are known. Failing to write the cache is not an error.
+    def store(self, source, controlStructures, variant="", sourceLines=None):
+        if sourceLines is None:
+            sourceLines = [array("i", [0]) * len(structure) for structure in controlStructures]
+        data = marshal.dumps((tuple(tuple(encodeInstruction(instruction) for instruction in structure) for structure in controlStructures),
+                              tuple(lines.tobytes() for lines in sourceLines)))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(handle, "wb") as entry:
+                entry.write(data)
+            os.replace(temporary, self.path(source, variant))
+        except OSError:
+            return
+
+        if self.knownBytes is not None:
+            self.knownBytes += len(data)
+        if self.knownBytes is None or self.knownBytes > self.maxBytes:
+            self.evict()
+
+    # Removes the least recently used entries until the cache fits in maxBytes.
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".rpalc"):
+                try:
+                    status = entry.stat()
+                except OSError:
+                    continue
+                entries.append((status.st_mtime, status.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+        self.knownBytes = total
@@ -0,0 +1,99 @@
+'''
+Evaluates many RPAL programs across a pool of worker processes.
+
+Every worker keeps one Interpreter and runs the programs it is handed one
+after another. A program is stopped when it runs longer than the timeout or
+takes more machine steps than the step limit. Results come back in the order
+of the input files, with what the program printed and how long it took, and
+can be written out as a JSON-lines summary.
+'''
+
+import concurrent.futures
+import contextlib
+import io
+import json
+import os
+import signal
+import time
+
+from src.artifactCache import ArtifactCache
+from src.cseMachine import StepLimitExceeded
+from src.interpreter import Interpreter
+
+# Raised in a worker when the running program reaches its timeout.
+class ProgramTimeout(Exception):
+    pass
+
+def raiseTimeout(signum, frame):
+    raise ProgramTimeout()
+
+# The Interpreter of the current worker process, created by startWorker.
+workerInterpreter = None
+
+def startWorker(engine, recursion, stepLimit, useCache, optimize=False):
+    global workerInterpreter
+    cache = ArtifactCache() if useCache else None
+    workerInterpreter = Interpreter(engine=engine, recursion=recursion, stepLimit=stepLimit, cache=cache, optimize=optimize)
+
+# Runs one program on the worker's Interpreter and returns its summary record.
+# Status is "ok", "error" (the program stopped with an error message), "timeout" or "step-limit".
+# The alarm is cancelled as soon as the program stops, before its result or error is handled; an
+# alarm that still goes off while it is being cancelled is caught with the rest and counts as a timeout.
+def runProgram(fileName, timeout=None):
+    interpreter = workerInterpreter
+    record = {"file": fileName, "status": "ok", "result": None}
+    useAlarm = timeout is not None and hasattr(signal, "setitimer")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        try:
+            try:
+                if useAlarm:
+                    signal.signal(signal.SIGALRM, raiseTimeout)
+                    signal.setitimer(signal.ITIMER_REAL, timeout)
+                result = interpreter.runFile(fileName)
+            finally:
+                if useAlarm:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+            record["result"] = str(result)
+            if interpreter.printed:
+                print(result)
+        except SystemExit:
+            record["status"] = "error"
+        except ProgramTimeout:
+            record["status"] = "timeout"
+        except StepLimitExceeded:
+            record["status"] = "step-limit"
+        except Exception as error:
+            print("An unexpected error occurred:", repr(error))
+            record["status"] = "error"
+
+    record["seconds"] = time.perf_counter() - start
+    record["steps"] = interpreter.machine.stepCount if record["status"] == "ok" else None
+    record["output"] = output.getvalue()
+    return record
+
+# Lists the files directly inside a directory, sorted by name.
+def listPrograms(directory):
+    names = sorted(os.listdir(directory))
+    return [os.path.join(directory, name) for name in names if os.path.isfile(os.path.join(directory, name))]
+
+# Evaluates the given files on 'jobs' worker processes (all cores by default).
+# Returns one record per file, in the same order as fileNames.
+# With useCache, workers share the on-disk cache of compiled programs. With optimize, programs are compiled with -O.
+def runBatch(fileNames, jobs=None, timeout=None, stepLimit=None, engine="cse", recursion="knot", useCache=False, optimize=False):
+    fileNames = list(fileNames)
+    if not fileNames:
+        return []
+
+    jobs = jobs or os.cpu_count() or 1
+    chunkSize = max(1, len(fileNames) // (jobs * 8))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=startWorker,
+                                                initargs=(engine, recursion, stepLimit, useCache, optimize)) as pool:
+        return list(pool.map(runProgram, fileNames, [timeout] * len(fileNames), chunksize=chunkSize))
+
+# Writes one JSON object per program.
+def writeSummary(records, stream):
+    for record in records:
+        stream.write(json.dumps(record) + "\n")
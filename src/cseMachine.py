@@ -7,78 +7,42 @@ and evaluates expressions by applying reduction rules, including support for lam
 
 The evaluator simulates the execution flow by manipulating a control list and stack,
 supporting both user-defined and built-in functions within nested lexical scopes.
+
+All of the state of an evaluation lives in a CSEMachine object, so any number of programs
+can be evaluated one after another in the same process.
 '''
 
-from src.ASTtoST import standardize
+import operator
+import sys
+from array import array
+
+from src.ASTtoST import buildST, standardize
+from src.artifactCache import ArtifactCache
+from src.parser import parseSource
 from src.node import *
-from src.environmentManager import Environment
+from src.optimizer import optimize
+from src.profiler import ETA_STRUCTURE, Profile, structureLabels, structureLines
+from src.pythonCompiler import runPython
+from src.vm import runBytecode
+from src.environmentManager import Environment, TrackedEnvironment, slotOf
 from src.stack import Stack
 from src.structures import *
 
-controlStructures = []
-count = 0
-control = []
-stack = Stack("CSE")                        # Stack for the CSE machine
-environments = [Environment(0, None)]
-currentEnvironment = 0
+binaryOperators = ["+", "-", "*", "/", "**", "gr", "ge", "ls", "le", "eq", "ne", "or", "&", "aug"]
+unaryOperators = ["neg", "not"]
 builtInFunctions = ["Order", "Print", "print", "Conc", "Stern", "Stem", "Isinteger", "Istruthvalue", "Isstring", "Istuple", "Isfunction", "ItoS"]
-printPresent = False
-
-
-def generateControlStructure(root, i):
-    global count
-    
-    while(len(controlStructures) <= i):
-        controlStructures.append([])
-
-    # When lambda is encountered, we have to generate a new control structure.
-    if (root.value == "lambda"):
-        count += 1
-        leftChild = root.children[0]
-        if (leftChild.value == ","):
-            temp = Lambda(count)
-            
-            x = ""
-            for child in leftChild.children:
-                x += child.value[4:-1] + ","
-            x = x[:-1]
-            
-            temp.boundedVariable = x
-            controlStructures[i].append(temp)
-        else:
-            temp = Lambda(count)
-            temp.boundedVariable = leftChild.value[4:-1]
-            controlStructures[i].append(temp)
-
-        for child in root.children[1:]:
-            generateControlStructure(child, count)
-
-    elif (root.value == "->"):
-        count += 1
-        temp = Delta(count)
-        controlStructures[i].append(temp)
-        generateControlStructure(root.children[1], count)
-        count += 1
-        temp = Delta(count)
-        controlStructures[i].append(temp)
-        generateControlStructure(root.children[2], count)
-        controlStructures[i].append("beta")
-        generateControlStructure(root.children[0], i)
-
-    elif (root.value == "tau"):
-        n = len(root.children)
-        temp = Tau(n)
-        controlStructures[i].append(temp)
-        for child in root.children:
-            generateControlStructure(child, i)
-
-    else:
-        controlStructures[i].append(root.value)
-        for child in root.children:
-            generateControlStructure(child, i)
 
-def lookup(name):
-    name = name[1:-1]
+# Turns a node value such as <INT:5>, <ID:x> or '+' into the instruction the CSE machine executes.
+# Values that are not literals, identifiers or operators (gamma, beta, ...) are kept as plain strings.
+def compileInstruction(value):
+    if value in binaryOperators:
+        return Operator(value, 2, binaryOperations[value])
+    elif value in unaryOperators:
+        return Operator(value, 1, unaryOperations[value])
+    elif not (value[0] == "<" and value[-1] == ">"):
+        return value
+
+    name = value[1:-1]
     info = name.split(":")
     
     if (len(info) == 1):
@@ -88,276 +52,956 @@ def lookup(name):
         value = info[1]
     
         if dataType == "INT":
-            return int(value)
+            return Constant(int(value))
         elif dataType == "STR":
-            return value.strip("'")
+            return Constant(value.strip("'"))
         elif dataType == "ID":
             if (value in builtInFunctions):
-                return value
+                return Constant(value)
             else:
-                try:
-                    value = environments[currentEnvironment].variables[value]
-                except KeyError:
-                    print("Undeclared Identifier: " + value)
-                    exit(1)
-                else:
-                    return value
+                return Identifier(sys.intern(value))
             
     if value == "Y*":
-        return "Y*"
+        return Constant("Y*")
     elif value == "nil":
-        return ()
+        return Constant(())
     elif value == "true":
-        return True
+        return Constant(True)
     elif value == "false":
-        return False
-    
-def builtIn(function, argument):
-    global printPresent
-    
-    if (function == "Order"):
-        order = len(argument)
-        stack.push(order)
-
-    elif (function == "Print" or function == "print"):
-        printPresent = True
-        
-        if type(argument) == str:
-            if "\\n" in argument:
-                argument = argument.replace("\\n", "\n")
-            if "\\t" in argument:
-                argument = argument.replace("\\t", "\t")
-
-        stack.push(argument)
-
-    elif (function == "Conc"):
-        stackSymbol = stack.pop()
-        control.pop()
-        temp = argument + stackSymbol
-        stack.push(temp)
-
-    elif (function == "Stern"):
-        stack.push(argument[1:])
-
-    elif (function == "Stem"):
-        stack.push(argument[0])
-
-    elif (function == "Isinteger"):
-        if (type(argument) == int):
-            stack.push(True)
-        else:
-            stack.push(False)
+        return Constant(False)
+    else:
+        return Constant(None)
+
+# 'aug' for the table-driven evaluator. Results are RpalTuples, so a chain of 'aug's
+# appends to one shared list instead of copying the whole tuple every time.
+def augment(rand1, rand2):
+    if type(rand1) == tuple:
+        rand1 = RpalTuple(list(rand1), len(rand1))
+    elif type(rand1) != RpalTuple:
+        return rand1 + (rand2,)             # Not a tuple: fails the same way the legacy evaluator does
+
+    if (type(rand2) == tuple or type(rand2) == RpalTuple):
+        return rand1.extend(rand2)
+    else:
+        return rand1.extend((rand2,))
+
+# Callables for the operators. Operands are passed in the order they are popped from the stack.
+binaryOperations = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.floordiv,
+    "**": operator.pow,
+    "gr": operator.gt,
+    "ge": operator.ge,
+    "ls": operator.lt,
+    "le": operator.le,
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "or": lambda rand1, rand2: rand1 or rand2,
+    "&": lambda rand1, rand2: rand1 and rand2,
+    "aug": augment,
+}
+unaryOperations = {
+    "not": operator.not_,
+    "neg": operator.neg,
+}
+
+# Raised when an evaluation takes more machine steps than the machine's step limit allows.
+class StepLimitExceeded(Exception):
+    pass
+
+# Control elements unfolding one level of recursion (rule 13).
+etaControl = ("gamma", "gamma")
+
+# Numbers every lambda and conditional of a standardized tree the way generateControlStructure
+# does, visiting the nodes in the same order. Returns a dict from id(node) to the number of a
+# lambda's control structure, or to the pair of numbers of a conditional's then and else parts.
+# The optimizer keeps these numbers while it moves and removes parts of the tree, so the
+# closures a program prints are numbered the same with and without -O.
+def numberStructures(root):
+    numbers = {}
+    count = 0
+    pending = [root]
+
+    while pending:
+        node = pending.pop()
+
+        if type(node) == tuple:
+            conditional = node[1]
+            count += 1
+            numbers[id(conditional)] = (numbers[id(conditional)], count)
+            pending.append(conditional.children[2])
+
+        elif node.value == "lambda":
+            count += 1
+            numbers[id(node)] = count
+            pending.extend(reversed(node.children[1:]))
+
+        elif node.value == "->":
+            count += 1
+            numbers[id(node)] = count
+            pending.append(node.children[0])
+            pending.append(("else", node))
+            pending.append(node.children[1])
 
-    elif (function == "Istruthvalue"):
-        if (type(argument) == bool):
-            stack.push(True)
         else:
-            stack.push(False)
+            pending.extend(reversed(node.children))
+
+    return numbers
+
+# Finds where a name is bound, starting from the scope of the code that uses it. A scope is
+# (names, outer scope): the parameters of the innermost lambda around the code and the scope
+# of the code that lambda is in, or None outside of every lambda. Returns the number of
+# environments to go up from the current one and the index of the value there, or None
+# when no lambda around the code binds the name.
+def resolveName(name, scope):
+    depth = 0
+    while scope is not None:
+        names, scope = scope
+        slot = slotOf(names, name)
+        if slot is not None:
+            return depth, slot
+        depth += 1
+    return None
+
+# Converts the value left at the bottom of the stack into its printed form.
+def formatResult(result):
+    if type(result) == Lambda:
+        result = "[lambda closure: " + str(result.boundedVariable) + ": " + str(result.number) + "]"
+         
+    if type(result) == tuple:          
+        for i in range(len(result)):
+            if type(result[i]) == bool:
+                result = list(result)
+                result[i] = str(result[i]).lower()
+                result = tuple(result)
+                
+        if len(result) == 1:
+            result = "(" + str(result[0]) + ")"
+        else: 
+            if any(type(element) == str for element in result):
+                temp = "("
+                for element in result:
+                    temp += str(element) + ", "
+                temp = temp[:-2] + ")"
+                result = temp
+                
+    if result == True or result == False:
+        result = str(result).lower()
+
+    return result
+
+##############################################################
+# One CSE machine evaluates one program. It owns the control structures generated for it,
+# the control, the stack, the environments and the flags collected while it runs.
+#
+# The table-driven evaluator maps each kind of control element straight to the rule that
+# handles it, and function application dispatches once more on the kind of value being applied.
+#
+# Its control is a stack of frames [structure, pc, marker]. A frame reads the shared control
+# structure in place from index pc - 1 down to 0, so entering a function body or a branch of
+# a conditional costs the same however long it is. When a frame that belongs to a closure
+# application (marker is not None) runs out, the environment it opened is exited.
+#
+# A closure applied as the last thing its caller's body does (the caller's marker is the next
+# control element) is a tail call: it reuses the caller's frame and marker instead of stacking
+# new ones, so tail-recursive loops run in constant space.
+class CSEMachine:
+    def __init__(self, environmentClass=Environment, recursion="knot", stepLimit=None, optimize=False):
+        self.controlStructures = []
+        self.sourceLines = []                       # Source line of every control element, per control structure
+        self.sourceName = "<string>"                # File the program came from, for error messages and profiles
+        self.count = 0
+        self.control = []                           # Flat control list used by the legacy evaluator
+        self.controlFrames = []                     # Control for the table-driven evaluator
+        self.stack = Stack("CSE")                   # Stack for the CSE machine
+        self.stackItems = self.stack.stack          # The list behind 'stack', used directly by the table-driven rules
+        self.environmentClass = environmentClass    # TrackedEnvironment when memory statistics are requested
+        self.environmentCount = 0                   # Number of environments created so far, used to name them
+        self.currentEnvironment = None
+        self.printPresent = False
+        self.popControl = self.control.pop          # Removes the next control element of the running evaluator
+        self.stepCount = 0                          # Machine steps taken by the evaluation
+        self.recursionMode = recursion              # How the table-driven evaluator applies Y*: "knot" or "eta"
+        self.stepLimit = stepLimit                  # Most machine steps the evaluation may take, None for no limit
+        self.optimize = optimize                    # Whether compile runs the optimizer on the standardized tree
+        self.profile = None                         # Profile the cse engine fills in instead of running unprofiled
+
+        self.controlRules = {
+            Constant: self.ruleConstant,
+            Identifier: self.ruleIdentifier,
+            Lambda: self.ruleLambda,
+            EnvironmentMarker: self.ruleExitEnvironment,
+            Operator: self.ruleOperator,
+            Tau: self.ruleTau,
+            "gamma": self.ruleGamma,
+            "beta": self.ruleBeta,
+            "Y*": self.ruleYStar,
+        }
+
+        self.applicationRules = {
+            Lambda: self.applyLambda,
+            tuple: self.applyTuple,
+            RpalTuple: self.applyTuple,
+            Eta: self.applyEta,
+        }
+
+    # Appends the control elements of the tree under root to control structure i, opening a new
+    # control structure for every lambda body and conditional branch. Works through an explicit
+    # stack of pending work so deeply nested programs do not run into the recursion limit.
+    # Pending entries are (node, i) pairs, or ("beta", i) and ("else", conditional, i) for the parts of
+    # a conditional that follow its then-branch.
+    # Control structures are numbered in the order they are opened, unless 'numbers' (from
+    # numberStructures, kept by the optimizer) gives the number of each lambda and conditional.
+    # Every identifier is resolved to the environment and slot it is bound in, using the scope
+    # of the control structure it is in. A name no lambda binds is reported before anything runs.
+    # The line of the node every control element comes from goes to the same index of sourceLines,
+    # so the control structures themselves stay as they are.
+    def generateControlStructure(self, root, i, numbers=None):
+        controlStructures = self.controlStructures
+        sourceLines = self.sourceLines
+        scopes = {i: None}                  # Scope of each control structure, see resolveName
+        pending = [(root, i)]
+
+        while pending:
+            work = pending.pop()
+
+            if work[0] == "beta":
+                _, i, line = work
+                controlStructures[i].append("beta")
+                sourceLines[i].append(line)
+                continue
+
+            if work[0] == "else":
+                _, root, i = work
+                if numbers is None:
+                    self.count += 1
+                    elseNumber = self.count
+                else:
+                    elseNumber = numbers[id(root)][1]
+                controlStructures[i].append(Delta(elseNumber))
+                sourceLines[i].append(root.line)
+                scopes[elseNumber] = scopes[i]
+                pending.append((root.children[2], elseNumber))
+                continue
+
+            root, i = work
+            while(len(controlStructures) <= i):
+                controlStructures.append([])
+                sourceLines.append([])
+            sourceLines[i].append(root.line)
+
+            # When lambda is encountered, we have to generate a new control structure.
+            if (root.value == "lambda"):
+                if numbers is None:
+                    self.count += 1
+                    count = self.count
+                else:
+                    count = numbers[id(root)]
+                leftChild = root.children[0]
+                if (leftChild.value == ","):
+                    temp = Lambda(count)
+
+                    x = ""
+                    for child in leftChild.children:
+                        x += child.value[4:-1] + ","
+                    x = x[:-1]
+
+                    temp.boundedVariable = x
+                    temp.parameters = tuple(sys.intern(name) for name in x.split(","))
+                    controlStructures[i].append(temp)
+                else:
+                    temp = Lambda(count)
+                    temp.boundedVariable = leftChild.value[4:-1]
+                    temp.parameters = (sys.intern(temp.boundedVariable),)
+                    controlStructures[i].append(temp)
+                scopes[count] = (temp.parameters, scopes[i])
+
+                for child in reversed(root.children[1:]):
+                    pending.append((child, count))
+
+            # The then-branch is generated first, then the else-branch, 'beta' and the condition.
+            elif (root.value == "->"):
+                if numbers is None:
+                    self.count += 1
+                    thenNumber = self.count
+                else:
+                    thenNumber = numbers[id(root)][0]
+                controlStructures[i].append(Delta(thenNumber))
+                scopes[thenNumber] = scopes[i]
+                pending.append((root.children[0], i))
+                pending.append(("beta", i, root.line))
+                pending.append(("else", root, i))
+                pending.append((root.children[1], thenNumber))
+
+            elif (root.value == "tau"):
+                n = len(root.children)
+                temp = Tau(n)
+                controlStructures[i].append(temp)
+                for child in reversed(root.children):
+                    pending.append((child, i))
 
-    elif (function == "Isstring"):
-        if (type(argument) == str):
-            stack.push(True)
-        else:
-            stack.push(False)
+            else:
+                instruction = compileInstruction(root.value)
+                if type(instruction) == Identifier:
+                    address = resolveName(instruction.name, scopes[i])
+                    if address is None:
+                        print(self.location(root.line) + ": Undeclared Identifier: " + instruction.name)
+                        exit(1)
+                    instruction.depth, instruction.slot = address
+                controlStructures[i].append(instruction)
+                for child in reversed(root.children):
+                    pending.append((child, i))
+
+    # 'file:line' for a source line, or the file name alone when the line is not known.
+    def location(self, line):
+        if line:
+            return self.sourceName + ":" + str(line)
+        return self.sourceName
+
+    # Where the control element the table-driven evaluator is running came from, as 'file:line: ',
+    # to start an error message with. Empty when no frame is running one, as with the other engines.
+    def errorPrefix(self):
+        if not self.controlFrames:
+            return ""
+        structure, pc = self.controlFrames[-1][0], self.controlFrames[-1][1]
+        for number, candidate in enumerate(self.controlStructures):
+            if candidate is structure and pc < len(self.sourceLines[number]):
+                return self.location(self.sourceLines[number][pc]) + ": "
+        return ""
+
+    # Reports that a rule found the stack empty, and exits.
+    def reportUnderflow(self):
+        print(self.errorPrefix() + "Error: CSE machine stack underflow.")
+        exit(1)
+
+    # Value of a resolved identifier in the current environment.
+    def lookup(self, symbol):
+        environment = self.currentEnvironment
+        depth = symbol.depth
+        while depth:
+            environment = environment.parent
+            depth -= 1
+        return environment.values[symbol.slot]
+
+    def builtIn(self, function, argument):
+        stack = self.stack
+
+        if (function == "Order"):
+            order = len(argument)
+            stack.push(order)
+
+        elif (function == "Print" or function == "print"):
+            self.printPresent = True
+
+            if type(argument) == str:
+                if "\\n" in argument:
+                    argument = argument.replace("\\n", "\n")
+                if "\\t" in argument:
+                    argument = argument.replace("\\t", "\t")
+
+            stack.push(argument)
+
+        elif (function == "Conc"):
+            stackSymbol = stack.pop()
+            self.popControl()
+            temp = argument + stackSymbol
+            stack.push(temp)
 
-    elif (function == "Istuple"):
-        if (type(argument) == tuple):
-            stack.push(True)
-        else:
-            stack.push(False)
+        elif (function == "Stern"):
+            stack.push(argument[1:])
 
-    elif (function == "Isfunction"):
-        if (argument in builtInFunctions):
-            return True
-        else:
-            False
-    
-    elif (function == "ItoS"):
-        if (type(argument) == int):
-            stack.push(str(argument))
-        else:
-            print("Error: ItoS function can only accept integers.")
-            exit()
+        elif (function == "Stem"):
+            stack.push(argument[0])
 
-def applyRules():
-    op = ["+", "-", "*", "/", "**", "gr", "ge", "ls", "le", "eq", "ne", "or", "&", "aug"]
-    uop = ["neg", "not"]
+        elif (function == "Isinteger"):
+            if (type(argument) == int):
+                stack.push(True)
+            else:
+                stack.push(False)
 
-    global control
-    global currentEnvironment
+        elif (function == "Istruthvalue"):
+            if (type(argument) == bool):
+                stack.push(True)
+            else:
+                stack.push(False)
 
-    while(len(control) > 0):
-        symbol = control.pop()
+        elif (function == "Isstring"):
+            if (type(argument) == str):
+                stack.push(True)
+            else:
+                stack.push(False)
 
-        if type(symbol) == str and (symbol[0] == "<" and symbol[-1] == ">"):
-            stack.push(lookup(symbol))
+        elif (function == "Istuple"):
+            if (type(argument) == tuple or type(argument) == RpalTuple):
+                stack.push(True)
+            else:
+                stack.push(False)
 
-        elif type(symbol) == Lambda:
-            temp = Lambda(symbol.number)
-            temp.boundedVariable = symbol.boundedVariable
-            temp.environment = currentEnvironment
-            stack.push(temp)
+        elif (function == "Isfunction"):
+            if (type(argument) == Lambda or type(argument) == Eta or argument in builtInFunctions):
+                stack.push(True)
+            else:
+                stack.push(False)
 
-        elif (symbol == "gamma"):
-            stackSymbol1 = stack.pop()
-            stackSymbol2 = stack.pop()
+        elif (function == "ItoS"):
+            if (type(argument) == int):
+                stack.push(str(argument))
+            else:
+                print(self.errorPrefix() + "Error: ItoS function can only accept integers.")
+                exit()
+
+    # Removes and returns the next control element of the table-driven evaluator.
+    def popFrameControl(self):
+        frame = self.controlFrames[-1]
+        frame[1] -= 1
+        return frame[0][frame[1]]
+
+    def ruleConstant(self, symbol):
+        self.stackItems.append(symbol.value)
+
+    def ruleIdentifier(self, symbol):
+        environment = self.currentEnvironment
+        depth = symbol.depth
+        while depth:
+            environment = environment.parent
+            depth -= 1
+        self.stackItems.append(environment.values[symbol.slot])
+
+    def ruleLambda(self, symbol):
+        self.stackItems.append(Lambda(symbol.number, symbol.boundedVariable, self.currentEnvironment, symbol.parameters))
+
+    def ruleGamma(self, symbol):
+        stackItems = self.stackItems
+        rator = stackItems.pop()
+        rand = stackItems.pop()
+        self.applicationRules.get(type(rator), self.applyOther)(rator, rand)
+
+    def ruleExitEnvironment(self, symbol):
+        stackItems = self.stackItems
+        value = stackItems.pop()
+        stackItems.pop()
+        self.currentEnvironment = symbol.previous
+        stackItems.append(value)
+
+    def ruleOperator(self, symbol):
+        stackItems = self.stackItems
+        if symbol.arity == 2:
+            rand1 = stackItems.pop()
+            rand2 = stackItems.pop()
+            stackItems.append(symbol.function(rand1, rand2))
+        else:
+            stackItems.append(symbol.function(stackItems.pop()))
+
+    def ruleBeta(self, symbol):
+        B = self.stackItems.pop()
+        elsePart = self.popFrameControl()
+        thenPart = self.popFrameControl()
+        if (B):
+            structure = self.controlStructures[thenPart.number]
+        else:
+            structure = self.controlStructures[elsePart.number]
+        self.controlFrames.append([structure, len(structure), None])
+
+    def ruleTau(self, symbol):
+        stackItems = self.stackItems
+        n = symbol.number
+        if n > len(stackItems):
+            raise IndexError("tau")
+        tauTuple = tuple(stackItems[:-n - 1:-1])
+        del stackItems[-n:]
+        stackItems.append(tauTuple)
+
+    def ruleYStar(self, symbol):
+        self.stackItems.append(symbol)
+
+    # Strings other than the ones in the table (leftover tree labels) have no effect.
+    def ruleIgnore(self, symbol):
+        pass
+
+    # Rule 4/11: apply a closure in a new environment.
+    def applyLambda(self, rator, rand):
+        self.environmentCount += 1
+
+        parameters = rator.parameters
+        n = len(parameters)
+        if (n > 1):
+            values = list(rand[:n])
+            if len(values) < n:
+                raise IndexError("tuple index out of range")
+        else:
+            values = [rand]
+        child = self.environmentClass(self.environmentCount, rator.environment, parameters, values)
+
+        structure = self.controlStructures[rator.number]
+
+        # Finished branch frames only lead to the marker below them.
+        frames = self.controlFrames
+        while frames[-1][1] == 0 and frames[-1][2] is None:
+            frames.pop()
+
+        frame = frames[-1]
+        if frame[1] == 0:
+            # Tail call: the caller's marker is on top of the stack and its frame has nothing left to do.
+            # Returning from the callee restores the same environment the caller's return would have.
+            frame[2].environment = child
+            frame[0] = structure
+            frame[1] = len(structure)
+        else:
+            marker = EnvironmentMarker(child, self.currentEnvironment)
+            self.stackItems.append(marker)
+            frames.append([structure, len(structure), marker])
+
+        self.currentEnvironment = child
+
+    # Rule 10: tuple selection.
+    def applyTuple(self, rator, rand):
+        self.stackItems.append(rator[rand - 1])
+
+    # Rule 13: unfold one level of recursion.
+    def applyEta(self, rator, rand):
+        stackItems = self.stackItems
+        self.controlFrames.append([etaControl, 2, None])
+        stackItems.append(rand)
+        stackItems.append(rator)
+        stackItems.append(Lambda(rator.number, rator.boundedVariable, rator.environment, rator.parameters))
+
+    # Rule 12 (Y* applied to a lambda) and the built-in functions.
+    def applyOther(self, rator, rand):
+        if (rator == "Y*"):
+            if not (self.recursionMode == "knot" and self.tieKnot(rand)):
+                self.stackItems.append(Eta(rand.number, rand.boundedVariable, rand.environment, rand.parameters))
+        elif rator in builtInFunctions:
+            self.builtIn(rator, rand)
+
+    # Y* applied to 'lambda f. lambda x. E' (or 'lambda (f, g). (lambda.., lambda..)' for simultaneous
+    # definitions) builds the recursive closures once, in an environment that already binds their
+    # own names, so a recursive call costs the same as any other call.
+    # Returns False when the body is not made of lambdas; the caller then falls back to an Eta.
+    def tieKnot(self, rand):
+        structure = self.controlStructures[rand.number]
+        parameters = rand.parameters
+
+        if len(parameters) == 1 and len(structure) == 1 and type(structure[0]) == Lambda:
+            bodies = structure
+        elif (len(parameters) > 1 and len(structure) == len(parameters) + 1 and type(structure[0]) == Tau
+                and structure[0].number == len(parameters) and all(type(body) == Lambda for body in structure[1:])):
+            bodies = structure[1:]
+        else:
+            return False
 
-            if (type(stackSymbol1) == Lambda):
-                currentEnvironment = len(environments)
-                
-                lambdaNumber = stackSymbol1.number
-                boundedVariable = stackSymbol1.boundedVariable
-                parentEnvironmentNumber = stackSymbol1.environment
+        self.environmentCount += 1
+        knot = self.environmentClass(self.environmentCount, rand.environment, parameters)
+        closures = tuple(Lambda(body.number, body.boundedVariable, knot, body.parameters) for body in bodies)
+        knot.values = list(closures)
 
-                parent = environments[parentEnvironmentNumber]
-                child = Environment(currentEnvironment, parent)
-                parent.addChild(child)
-                environments.append(child)
+        if len(parameters) == 1:
+            self.stackItems.append(closures[0])
+        else:
+            self.stackItems.append(closures)
+        return True
 
-                variableList = boundedVariable.split(",")
-                
-                if (len(variableList) > 1):
-                    for i in range(len(variableList)):
-                        child.addVariable(variableList[i], stackSymbol2[i])
+    def applyRules(self, rootMarker):
+        stack = self.stack
+        self.popControl = self.popFrameControl
+        rules = self.controlRules
+        ruleIgnore = self.ruleIgnore
+        frames = self.controlFrames
+        frames.append([self.controlStructures[0], len(self.controlStructures[0]), rootMarker])
+        limit = self.stepLimit + 1 if self.stepLimit is not None else 0
+
+        steps = 0
+        try:
+            while frames:
+                frame = frames[-1]
+                pc = frame[1]
+                if pc:
+                    pc -= 1
+                    frame[1] = pc
+                    symbol = frame[0][pc]
+                    kind = type(symbol)
+                    if kind is str:
+                        kind = symbol
+                    rules.get(kind, ruleIgnore)(symbol)
+                    steps += 1
                 else:
-                    child.addVariable(boundedVariable, stackSymbol2)
-
-                stack.push(child.name)
-                control.append(child.name)
-                control += controlStructures[lambdaNumber]
-
-            elif (type(stackSymbol1) == tuple):
-                stack.push(stackSymbol1[stackSymbol2 - 1])
-
-            elif (stackSymbol1 == "Y*"):
-                temp = Eta(stackSymbol2.number)
-                temp.boundedVariable = stackSymbol2.boundedVariable
-                temp.environment = stackSymbol2.environment
-                stack.push(temp)
-
-            elif (type(stackSymbol1) == Eta):
-                temp = Lambda(stackSymbol1.number)
-                temp.boundedVariable = stackSymbol1.boundedVariable
-                temp.environment = stackSymbol1.environment
-                
-                control.append("gamma")
-                control.append("gamma")
-                stack.push(stackSymbol2)
-                stack.push(stackSymbol1)
+                    frames.pop()
+                    if frame[2] is not None:
+                        self.ruleExitEnvironment(frame[2])
+                        steps += 1
+                if steps == limit:
+                    raise StepLimitExceeded(self.stepLimit)
+        except IndexError:
+            if stack.is_empty():
+                self.reportUnderflow()
+            raise
+
+        self.stepCount = steps
+
+    # Names of the rules the profiler counts steps under, by kind of control element.
+    # Applications are named by the kind of value being applied, see ruleNameOfGamma.
+    profiledRules = {
+        Constant: "constant",
+        Identifier: "identifier",
+        Lambda: "closure",
+        Tau: "tau",
+        "beta": "beta",
+        "Y*": "constant",
+    }
+
+    def ruleNameOfGamma(self, rator):
+        kind = type(rator)
+        if kind == Lambda:
+            return "gamma lambda"
+        elif kind == tuple or kind == RpalTuple:
+            return "gamma tuple"
+        elif kind == Eta:
+            return "gamma Eta"
+        elif rator == "Y*":
+            return "gamma Y*"
+        elif rator in builtInFunctions:
+            return "built-in " + rator
+        return "gamma other"
+
+    # applyRules, also counting the steps of every rule, control structure and source line into self.profile.
+    # Kept apart so that evaluations without a profile pay nothing for it.
+    def applyRulesProfiled(self, rootMarker):
+        profile = self.profile
+        ruleSteps = profile.rules
+        invocations = profile.invocations
+        structureSteps = profile.steps
+        lineSteps = profile.lineSteps
+        profile.sourceName = self.sourceName
+        profile.labels = structureLabels(self.controlStructures)
+        profile.lines = structureLines(self.controlStructures, self.sourceLines)
+        structureNumbers = {id(structure): number for number, structure in enumerate(self.controlStructures)}
+        structureNumbers[id(etaControl)] = ETA_STRUCTURE
+        sourceLines = self.sourceLines + [array("i", [0]) * len(etaControl)]     # Indexed by ETA_STRUCTURE as well
+
+        stack = self.stack
+        stackItems = self.stackItems
+        self.popControl = self.popFrameControl
+        rules = self.controlRules
+        ruleNames = self.profiledRules
+        ruleIgnore = self.ruleIgnore
+        frames = self.controlFrames
+        frames.append([self.controlStructures[0], len(self.controlStructures[0]), rootMarker])
+        invocations[0] = 1
+        limit = self.stepLimit + 1 if self.stepLimit is not None else 0
+
+        steps = 0
+        try:
+            while frames:
+                frame = frames[-1]
+                structure = frame[0]
+                number = structureNumbers[id(structure)]
+                pc = frame[1]
+                if pc:
+                    pc -= 1
+                    frame[1] = pc
+                    symbol = structure[pc]
+                    kind = type(symbol)
+                    if kind is str:
+                        kind = symbol
+                    line = sourceLines[number][pc]
+                    lineSteps[line] = lineSteps.get(line, 0) + 1
+                    if kind == "gamma":
+                        rator = stackItems[-1]
+                        rule = self.ruleNameOfGamma(rator)
+                    elif kind == Operator:
+                        rule = "binary " + symbol.symbol if symbol.arity == 2 else "unary " + symbol.symbol
+                    else:
+                        rule = ruleNames.get(kind, "other")
+
+                    rules.get(kind, ruleIgnore)(symbol)
+
+                    # Applying a closure enters its body, whether in a new frame or in this one for a tail call,
+                    # applying an Eta enters its unfolding, and a conditional enters the branch it takes.
+                    if kind == "gamma":
+                        if type(rator) == Lambda:
+                            invocations[rator.number] = invocations.get(rator.number, 0) + 1
+                        elif type(rator) == Eta:
+                            invocations[ETA_STRUCTURE] = invocations.get(ETA_STRUCTURE, 0) + 1
+                    elif kind == "beta":
+                        entered = structureNumbers[id(frames[-1][0])]
+                        invocations[entered] = invocations.get(entered, 0) + 1
+                else:
+                    frames.pop()
+                    if frame[2] is None:
+                        continue
+                    self.ruleExitEnvironment(frame[2])
+                    rule = "exit environment"
+
+                steps += 1
+                ruleSteps[rule] = ruleSteps.get(rule, 0) + 1
+                structureSteps[number] = structureSteps.get(number, 0) + 1
+                if steps == limit:
+                    raise StepLimitExceeded(self.stepLimit)
+        except IndexError:
+            if stack.is_empty():
+                self.reportUnderflow()
+            raise
+
+        self.stepCount = steps
+        profile.totalSteps = steps
+
+    # The original if/elif evaluator, kept as a reference implementation for differential testing.
+    # Selected with '--engine=legacy'.
+    def applyRulesLegacy(self, rootMarker):
+        control = self.control
+        stack = self.stack
+        controlStructures = self.controlStructures
+
+        self.popControl = control.pop
+        control.append(rootMarker)
+        control += controlStructures[0]
+        limit = self.stepLimit + 1 if self.stepLimit is not None else 0
+
+        steps = 0
+        while(len(control) > 0):
+            symbol = control.pop()
+            steps += 1
+            if steps == limit:
+                raise StepLimitExceeded(self.stepLimit)
+
+            if type(symbol) == Constant:
+                stack.push(symbol.value)
+
+            elif type(symbol) == Identifier:
+                stack.push(self.lookup(symbol))
+
+            elif type(symbol) == Lambda:
+                temp = Lambda(symbol.number)
+                temp.boundedVariable = symbol.boundedVariable
+                temp.environment = self.currentEnvironment
+                temp.parameters = symbol.parameters
                 stack.push(temp)
 
-            elif stackSymbol1 in builtInFunctions:
-                builtIn(stackSymbol1, stackSymbol2)
-              
-        elif type(symbol) == str and (symbol[0:2] == "e_"):
-            stackSymbol = stack.pop()
-            stack.pop()
-            
-            if (currentEnvironment != 0):
-                for element in reversed(stack):
-                    if (type(element) == str and element[0:2] == "e_"):
-                        currentEnvironment = int(element[2:])
-                        break
-            stack.push(stackSymbol)
-
-        elif (symbol in op):
-            rand1 = stack.pop()
-            rand2 = stack.pop()
-            if (symbol == "+"): 
-                stack.push(rand1 + rand2)
-            elif (symbol == "-"):
-                stack.push(rand1 - rand2)
-            elif (symbol == "*"):
-                stack.push(rand1 * rand2)
-            elif (symbol == "/"):
-                stack.push(rand1 // rand2)
-            elif (symbol == "**"):
-                stack.push(rand1 ** rand2)
-            elif (symbol == "gr"):
-                stack.push(rand1 > rand2)
-            elif (symbol == "ge"):
-                stack.push(rand1 >= rand2)
-            elif (symbol == "ls"):
-                stack.push(rand1 < rand2)
-            elif (symbol == "le"):
-                stack.push(rand1 <= rand2)
-            elif (symbol == "eq"):
-                stack.push(rand1 == rand2)
-            elif (symbol == "ne"):
-                stack.push(rand1 != rand2)
-            elif (symbol == "or"):
-                stack.push(rand1 or rand2)
-            elif (symbol == "&"):
-                stack.push(rand1 and rand2)
-            elif (symbol == "aug"):
-                if (type(rand2) == tuple):
+            elif (symbol == "gamma"):
+                stackSymbol1 = stack.pop()
+                stackSymbol2 = stack.pop()
+
+                if (type(stackSymbol1) == Lambda):
+                    self.environmentCount += 1
+
+                    lambdaNumber = stackSymbol1.number
+                    parameters = stackSymbol1.parameters
+
+                    if (len(parameters) > 1):
+                        values = [stackSymbol2[i] for i in range(len(parameters))]
+                    else:
+                        values = [stackSymbol2]
+
+                    # The new frame is only reachable through the stack, the control and
+                    # closures created inside it, so it is freed once those are gone.
+                    child = self.environmentClass(self.environmentCount, stackSymbol1.environment, parameters, values)
+                    marker = EnvironmentMarker(child, self.currentEnvironment)
+                    self.currentEnvironment = child
+
+                    stack.push(marker)
+                    control.append(marker)
+                    control += controlStructures[lambdaNumber]
+
+                elif (type(stackSymbol1) == tuple):
+                    stack.push(stackSymbol1[stackSymbol2 - 1])
+
+                elif (stackSymbol1 == "Y*"):
+                    temp = Eta(stackSymbol2.number)
+                    temp.boundedVariable = stackSymbol2.boundedVariable
+                    temp.environment = stackSymbol2.environment
+                    temp.parameters = stackSymbol2.parameters
+                    stack.push(temp)
+
+                elif (type(stackSymbol1) == Eta):
+                    temp = Lambda(stackSymbol1.number)
+                    temp.boundedVariable = stackSymbol1.boundedVariable
+                    temp.environment = stackSymbol1.environment
+                    temp.parameters = stackSymbol1.parameters
+
+                    control.append("gamma")
+                    control.append("gamma")
+                    stack.push(stackSymbol2)
+                    stack.push(stackSymbol1)
+                    stack.push(temp)
+
+                elif stackSymbol1 in builtInFunctions:
+                    self.builtIn(stackSymbol1, stackSymbol2)
+
+            elif type(symbol) == EnvironmentMarker:
+                stackSymbol = stack.pop()
+                stack.pop()
+                self.currentEnvironment = symbol.previous
+                stack.push(stackSymbol)
+
+            elif type(symbol) == Operator and symbol.arity == 2:
+                symbol = symbol.symbol
+                rand1 = stack.pop()
+                rand2 = stack.pop()
+                if (symbol == "+"):
                     stack.push(rand1 + rand2)
+                elif (symbol == "-"):
+                    stack.push(rand1 - rand2)
+                elif (symbol == "*"):
+                    stack.push(rand1 * rand2)
+                elif (symbol == "/"):
+                    stack.push(rand1 // rand2)
+                elif (symbol == "**"):
+                    stack.push(rand1 ** rand2)
+                elif (symbol == "gr"):
+                    stack.push(rand1 > rand2)
+                elif (symbol == "ge"):
+                    stack.push(rand1 >= rand2)
+                elif (symbol == "ls"):
+                    stack.push(rand1 < rand2)
+                elif (symbol == "le"):
+                    stack.push(rand1 <= rand2)
+                elif (symbol == "eq"):
+                    stack.push(rand1 == rand2)
+                elif (symbol == "ne"):
+                    stack.push(rand1 != rand2)
+                elif (symbol == "or"):
+                    stack.push(rand1 or rand2)
+                elif (symbol == "&"):
+                    stack.push(rand1 and rand2)
+                elif (symbol == "aug"):
+                    if (type(rand2) == tuple):
+                        stack.push(rand1 + rand2)
+                    else:
+                        stack.push(rand1 + (rand2,))
+
+            elif type(symbol) == Operator:
+                symbol = symbol.symbol
+                rand = stack.pop()
+                if (symbol == "not"):
+                    stack.push(not rand)
+                elif (symbol == "neg"):
+                    stack.push(-rand)
+
+            elif (symbol == "beta"):
+                B = stack.pop()
+                elsePart = control.pop()
+                thenPart = control.pop()
+                if (B):
+                    control += controlStructures[thenPart.number]
                 else:
-                    stack.push(rand1 + (rand2,))
-
-        elif (symbol in uop):
-            rand = stack.pop()
-            if (symbol == "not"):
-                stack.push(not rand)
-            elif (symbol == "neg"):
-                stack.push(-rand)
-
-        elif (symbol == "beta"):
-            B = stack.pop()
-            elsePart = control.pop()
-            thenPart = control.pop()
-            if (B):
-                control += controlStructures[thenPart.number]
-            else:
-                control += controlStructures[elsePart.number]
-
-        elif type(symbol) == Tau:
-            n = symbol.number
-            tauList = []
-            for i in range(n):
-                tauList.append(stack.pop())
-            tauTuple = tuple(tauList)
-            stack.push(tauTuple)
-
-        elif (symbol == "Y*"):
-            stack.push(symbol)
-
-    if type(stack[0]) == Lambda:
-        stack[0] = "[lambda closure: " + str(stack[0].boundedVariable) + ": " + str(stack[0].number) + "]"
-         
-    if type(stack[0]) == tuple:          
-        for i in range(len(stack[0])):
-            if type(stack[0][i]) == bool:
-                stack[0] = list(stack[0])
-                stack[0][i] = str(stack[0][i]).lower()
-                stack[0] = tuple(stack[0])
-                
-        if len(stack[0]) == 1:
-            stack[0] = "(" + str(stack[0][0]) + ")"
-        else: 
-            if any(type(element) == str for element in stack[0]):
-                temp = "("
-                for element in stack[0]:
-                    temp += str(element) + ", "
-                temp = temp[:-2] + ")"
-                stack[0] = temp
-                
-    if stack[0] == True or stack[0] == False:
-        stack[0] = str(stack[0]).lower()
+                    control += controlStructures[elsePart.number]
+
+            elif type(symbol) == Tau:
+                n = symbol.number
+                tauList = []
+                for i in range(n):
+                    tauList.append(stack.pop())
+                tauTuple = tuple(tauList)
+                stack.push(tauTuple)
+
+            elif (symbol == "Y*"):
+                stack.push(symbol)
+
+        self.stepCount = steps
+
+    # Generates the control structures for a standardized tree and returns them.
+    def compile(self, st):
+        numbers = None
+        if self.optimize:
+            st, numbers = optimize(st)
+        self.generateControlStructure(st, 0, numbers)
+
+        # Control structures are shared by every activation, so freeze them.
+        # Their source lines are only read to report errors and profiles, so pack them.
+        controlStructures = self.controlStructures
+        sourceLines = self.sourceLines
+        for i in range(len(controlStructures)):
+            controlStructures[i] = tuple(controlStructures[i])
+            sourceLines[i] = array("i", sourceLines[i])
+        return controlStructures
+
+    # Compiles a program given as a str or bytes-like buffer, reusing the cached control structures
+    # for the same source when there are any, so an unchanged program skips the whole front end.
+    def compileSource(self, source, cache):
+        variant = "-O" if self.optimize else ""
+        entry = cache.load(source, variant)
+        if entry is None:
+            controlStructures = self.compile(buildST(parseSource(source)))
+            cache.store(source, controlStructures, variant, self.sourceLines)
+        else:
+            controlStructures, self.sourceLines = entry
+        self.controlStructures = controlStructures
+        return controlStructures
+
+    # Generates the control structures for a standardized tree, runs them with the named engine
+    # and returns the value left on the stack in its printed form.
+    def evaluate(self, st, engine="cse"):
+        self.compile(st)
+        return self.execute(engine)
+
+    # Runs the compiled control structures with the named engine.
+    def execute(self, engine="cse"):
+        self.currentEnvironment = self.environmentClass(0, None)
+        marker = EnvironmentMarker(self.currentEnvironment, self.currentEnvironment)
+
+        self.stack.push(marker)
+
+        if self.profile is not None:
+            if engine != "cse":
+                raise ValueError("Profiling is only supported by the cse engine")
+            self.applyRulesProfiled(marker)
+        else:
+            engines[engine](self, marker)
+
+        result = self.stack[0]
+        if type(result) == RpalTuple:
+            result = tuple(result)
+        return formatResult(result)
+
+# Evaluators selectable with '--engine=NAME'.
+engines = {
+    "cse": CSEMachine.applyRules,
+    "legacy": CSEMachine.applyRulesLegacy,
+    "vm": runBytecode,
+    "pycompile": runPython,
+}
+
+# With 'profile', the evaluation is profiled and the profile is written as a table on stderr,
+# or as JSON to 'profileFile' when one is given.
+def getResult(fileName, memStats=False, engine="cse", recursion="knot", useCache=True, optimize=False, profile=False, profileFile=None):
+    if memStats:
+        TrackedEnvironment.resetStats()
+        machine = CSEMachine(TrackedEnvironment, recursion, optimize=optimize)
+    else:
+        machine = CSEMachine(Environment, recursion, optimize=optimize)
+    if profile:
+        machine.profile = Profile()
+    machine.sourceName = fileName
+
+    if useCache:
+        try:
+            with open(fileName, "rb") as file:
+                source = file.read()
+        except FileNotFoundError:
+            print("Error: File not found.")
+            exit(1)
+        machine.compileSource(source, ArtifactCache())
+        result = machine.execute(engine)
+    else:
+        result = machine.evaluate(standardize(fileName), engine)
 
-def getResult(fileName):
-    global control
+    if machine.printPresent:
+        print(result)
 
-    st = standardize(fileName)
-    
-    generateControlStructure(st,0) 
-    
-    control.append(environments[0].name)
-    control += controlStructures[0]
+    if memStats:
+        printMemStats()
 
-    stack.push(environments[0].name)
+    if profile:
+        if profileFile:
+            with open(profileFile, "w") as stream:
+                machine.profile.writeJson(stream)
+        else:
+            machine.profile.writeTable(sys.stderr)
 
-    applyRules()
+    return machine
 
-    if printPresent:
-        print(stack[0])
\ No newline at end of file
+# Reports how many environments were created in total and how many were alive at once.
+def printMemStats():
+    print("Environments created: " + str(TrackedEnvironment.created), file=sys.stderr)
+    print("Peak live environments: " + str(TrackedEnvironment.peakLive), file=sys.stderr)
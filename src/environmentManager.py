@@ -1,21 +1,108 @@
 '''
 Defines the Environment class used to manage variable scopes and 
 hierarchical relationships between execution contexts in the RPAL-interpreter.
+
+Each environment only stores the values it binds itself, in a list in the
+order of the names that bind them (a closure's parameters). The CSE machine
+never looks names up: every identifier is resolved when the control
+structures are generated to how many parent links up its environment is and
+the index of its value there. Names are kept alongside the values so scopes
+can still be inspected and searched by name.
+
+Environments are ordinary objects: closures refer to them directly and only
+children point at their parents, so a frame is freed as soon as nothing
+can reach it any more.
+
+A frame is created for every closure application, so the class uses
+__slots__, and the children list is only built when asked for.
 '''
 
+# Index of the value bound to 'name' among 'names', or None when the names do not include it.
+# A name given twice is bound to the later value, as it always has been.
+def slotOf(names, name):
+    for slot in range(len(names) - 1, -1, -1):
+        if names[slot] == name:
+            return slot
+    return None
+
 class Environment:
-    def __init__(self, envNumber, parentEnv):
-        self.name = f"e_{envNumber}"
-        self.variables = {}
-        self.children = []
+    __slots__ = ("number", "names", "values", "childList", "parent")
+
+    def __init__(self, envNumber, parentEnv, names=(), values=None):
+        self.number = envNumber
+        self.names = names                  # Tuple of the names bound here, shared with the closure that bound them
+        self.values = values if values is not None else []
+        self.childList = None
         self.parent = parentEnv
 
-    # Store a variable in the current environment scope.
+    @property
+    def name(self):
+        return f"e_{self.number}"
+
+    # The bindings of this scope as a dict, for inspection.
+    @property
+    def variables(self):
+        return dict(zip(self.names, self.values))
+
+    @property
+    def children(self):
+        if self.childList is None:
+            self.childList = []
+        return self.childList
+
+    # Store a variable in the current environment scope, in a new slot unless the name is already bound here.
     def addVariable(self, key, value):
-        self.variables[key] = value
+        slot = slotOf(self.names, key)
+        if slot is None:
+            self.names = tuple(self.names) + (key,)
+            self.values.append(value)
+        else:
+            self.values[slot] = value
         
-    # Attach a new child environment and inherit current variables.
+    # Attach a new child environment. The child sees our variables through its parent link.
+    # Only used for inspecting scope trees; the CSE machine never registers children,
+    # otherwise every frame would stay alive for as long as its parent does.
     def addChild(self, childEnv):
         self.children.append(childEnv)
-        childEnv.variables.update(self.variables)
+        childEnv.parent = self
+
+    # Resolve a name through the scope chain. Raises KeyError when it is not bound anywhere.
+    def lookup(self, key):
+        slot = slotOf(self.names, key)
+        if slot is not None:
+            return self.values[slot]
+
+        env = self.parent
+        while env is not None:
+            slot = slotOf(env.names, key)
+            if slot is not None:
+                return env.values[slot]
+            env = env.parent
+
+        raise KeyError(key)
+
+
+# Environment that keeps counts of how many frames were created and how many are alive.
+# Used by the CSE machine when memory statistics are requested.
+class TrackedEnvironment(Environment):
+    __slots__ = ()
+
+    created = 0
+    live = 0
+    peakLive = 0
+
+    def __init__(self, envNumber, parentEnv, names=(), values=None):
+        super().__init__(envNumber, parentEnv, names, values)
+        TrackedEnvironment.created += 1
+        TrackedEnvironment.live += 1
+        if TrackedEnvironment.live > TrackedEnvironment.peakLive:
+            TrackedEnvironment.peakLive = TrackedEnvironment.live
+
+    def __del__(self):
+        TrackedEnvironment.live -= 1
 
+    @classmethod
+    def resetStats(cls):
+        cls.created = 0
+        cls.live = 0
+        cls.peakLive = 0
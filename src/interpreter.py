@@ -0,0 +1,58 @@
+'''
+A reusable entry point to the whole interpreter.
+
+An Interpreter runs RPAL programs given as source text or as files, one after
+another in the same process. Every run screens, parses and standardizes the
+program and evaluates it on a CSE machine of its own, so nothing is left over
+from one program to the next.
+'''
+
+from src.ASTtoST import buildST
+from src.cseMachine import CSEMachine, engines
+from src.environmentManager import Environment, TrackedEnvironment
+from src.lexicalAnalyzer import mappedFile
+from src.parser import parseSource
+from src.profiler import Profile
+
+class Interpreter:
+    def __init__(self, engine="cse", recursion="knot", memStats=False, stepLimit=None, cache=None, optimize=False, profile=False):
+        if engine not in engines:
+            raise ValueError("Unknown engine: " + engine)
+        if recursion not in ("knot", "eta"):
+            raise ValueError("Unknown recursion mode: " + recursion)
+
+        self.engine = engine
+        self.recursion = recursion
+        self.memStats = memStats
+        self.stepLimit = stepLimit          # Runs taking more machine steps raise StepLimitExceeded
+        self.cache = cache                  # ArtifactCache for compiled programs, or None to always compile
+        self.optimize = optimize            # Whether programs are compiled with the optimizer (-O)
+        self.profile = profile              # Whether runs are profiled, into machine.profile
+        self.machine = None                 # Machine of the last run, for its step count
+        self.printed = False                # Whether the last program used Print, so myrpal.py would show its result
+
+    # Evaluates a program given as a str or bytes-like buffer and returns its result in printed form.
+    # Errors are reported as on the command line: the message is printed and SystemExit is raised.
+    # Messages and profiles give 'sourceName' as the file the program came from.
+    def run(self, source, sourceName="<string>"):
+        if self.memStats:
+            TrackedEnvironment.resetStats()
+            self.machine = CSEMachine(TrackedEnvironment, self.recursion, self.stepLimit, self.optimize)
+        else:
+            self.machine = CSEMachine(Environment, self.recursion, self.stepLimit, self.optimize)
+        if self.profile:
+            self.machine.profile = Profile()
+        self.machine.sourceName = sourceName
+
+        self.printed = False
+        if self.cache is not None:
+            self.machine.compileSource(source, self.cache)
+        else:
+            self.machine.compile(buildST(parseSource(source)))
+        result = self.machine.execute(self.engine)
+        self.printed = self.machine.printPresent
+        return result
+
+    def runFile(self, fileName):
+        with mappedFile(fileName) as buffer:
+            return self.run(buffer, fileName)
@@ -1,7 +1,15 @@
 '''
 Converts a raw string of characters into a list of Token objects that represent 
 identifiers, integers, keywords, operators, strings, punctuation etc.
+
+generateTokens and tokenizeFile produce the same tokens lazily from a str,
+a bytes-like buffer or a memory-mapped file.
 '''
+import mmap
+import os
+import re
+from contextlib import contextmanager
+
 from src.tokenDefinitions import Token
 
 def extractTokens(inputChars): 
@@ -178,3 +186,126 @@ def extractTokens(inputChars):
             tokenValues[i] = Token(tokenValues[i], tokenTypes[i], lineInfo[i])
 
     return tokenValues
+
+
+##############################################################
+# Streaming lexer. Produces exactly the same tokens as extractTokens, but scans a str or a
+# bytes-like buffer (such as a memory-mapped file) with one compiled regular expression,
+# slices each lexeme out of the buffer and yields the tokens one at a time.
+
+operatorCharacters = re.escape('+-*<>&.@:=~|$!#%^_[]{}"?')
+
+# Alternatives are tried in the same order as the branches of extractTokens. An operator run
+# never swallows the start of a '//' comment, and any other character is reported as an error.
+tokenPattern = (
+    r"(?P<identifier>[A-Za-z][A-Za-z0-9_]*)"
+    r"|(?P<number>[0-9][0-9A-Za-z]*)"
+    r"|(?P<comment>//[^\r\n]*)"
+    r"|(?P<string>'[^']*')"
+    r"|(?P<punctuation>[();,])"
+    r"|(?P<space>[ \t]+)"
+    r"|(?P<newline>\r\n|\r|\n)"
+    r"|(?P<operator>(?:[" + operatorCharacters + r"]|/(?!/))+)"
+    r"|(?P<error>.)"
+)
+textTokenRegex = re.compile(tokenPattern.replace(r"\r\n|\r|\n", r"\n").replace(r"[^\r\n]", r"[^\n]"), re.DOTALL)
+bufferTokenRegex = re.compile(tokenPattern.encode(), re.DOTALL)
+
+# Yields (content, tokenType, lineNumber) for every lexeme, including whitespace and comments.
+def scanLexemes(source):
+    isText = isinstance(source, str)
+    regex = textTokenRegex if isText else bufferTokenRegex
+    end = len(source)
+    currentLine = 1
+
+    for found in regex.finditer(source):
+        kind = found.lastgroup
+        if isText:
+            lexeme = found.group()
+        elif kind == "error":
+            # Decode the whole (possibly multi-byte) character for the error message.
+            lexeme = bytes(source[found.start():found.start() + 4]).decode(errors="ignore")[:1]
+        else:
+            lexeme = found.group().decode()
+
+        if kind == "space" or kind == "comment":
+            yield lexeme, '<DELETE>', currentLine
+
+        elif kind == "identifier":
+            yield lexeme, '<IDENTIFIER>', currentLine
+
+        elif kind == "newline":
+            yield '\n', '<DELETE>', currentLine
+            currentLine += 1
+
+        elif kind == "operator":
+            stop = found.end()
+            if stop == end and lexeme[-1] == '/':
+                # extractTokens stops, dropping this run, when the input ends with a '/'.
+                return
+            yield lexeme, '<OPERATOR>', currentLine
+            if source[stop:stop + 2] in ('//', b'//'):
+                # An operator run cut short by a comment is followed by an empty operator token.
+                yield '', '<OPERATOR>', currentLine
+
+        elif kind == "punctuation":
+            yield lexeme, lexeme, currentLine
+
+        elif kind == "number":
+            yield lexeme, ('<INTEGER>' if lexeme.isdigit() else '<INVALID>'), currentLine
+
+        elif kind == "string":
+            if not isText:
+                lexeme = lexeme.replace("\r\n", "\n").replace("\r", "\n")
+            currentLine += lexeme.count("\n")
+            yield lexeme, '<STRING>', currentLine
+
+        else:
+            if lexeme == "'":
+                print("Unterminated string detected.")
+            else:
+                print(f"Unexpected character: {lexeme} at index {found.start()}")
+            exit(1)
+
+# Lazily yields Token objects for a str or bytes-like source.
+# Two tokens are held back so the first/last flags can be set exactly as extractTokens does.
+def generateTokens(source):
+    lexemes = scanLexemes(source)
+    lexeme = next(lexemes, None)
+    if lexeme is None:
+        return
+
+    previous = None
+    current = Token(*lexeme)
+    current.markAsFirst()
+
+    for lexeme in lexemes:
+        if previous is not None:
+            yield previous
+        previous = current
+        current = Token(*lexeme)
+
+    if previous is None:
+        yield current                       # A single token is only marked as the first one
+    elif current.content == '\n':
+        previous.markAsLast()
+        yield previous
+    else:
+        current.markAsLast()
+        yield previous
+        yield current
+
+# Opens a file as a read-only memory map. An empty file, which cannot be mapped, gives an empty buffer.
+@contextmanager
+def mappedFile(fileName):
+    with open(fileName, 'rb') as sourceFile:
+        if os.fstat(sourceFile.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(sourceFile.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+# Lazily yields the tokens of a file, scanning it through a memory map instead of reading it in.
+def tokenizeFile(fileName):
+    with mappedFile(fileName) as buffer:
+        yield from generateTokens(buffer)
@@ -1,21 +1,87 @@
 '''
 This module defines the Node class and
-'preOrderTraversal' function to recursively display the tree structure using pre-order traversal.
+'preOrderTraversal' function to display the tree structure using pre-order traversal.
+
+'dumpTree' writes a tree to any text stream, either in the indented text format
+(one '.' per level) or as JSON lines, one object per node in pre-order.
 '''
 
+from json.encoder import encode_basestring_ascii
+import sys
+
+# 'line' is the source line the node's text starts on, or 0 when it is not known.
 class Node:
-    def __init__(self, value):
+    __slots__ = ("value", "children", "line")
+
+    def __init__(self, value, line=0):
         self.value = value
-        self.children = []  
-        self.depth = 0
+        self.children = []
+        self.line = line
 
-# Recursive function to print the tree in pre-order fashion with indentation (.) based on depth       
-def preOrderTraversal(root):
+# Both formatters walk the tree with a stack of iterators over the children still to visit,
+# so the depth of a node is the height of the stack and the tree itself is never modified.
+# Deep trees do not hit the recursion limit. The lines are joined and written with one call.
+
+# One line per node: '.' repeated once per level, then the node's value.
+def textLines(root):
+    lines = [root.value]
+    append = lines.append
+    pending = [iter(root.children)]
+    prefix = "."
+
+    while pending:
+        for node in pending[-1]:
+            append(prefix + node.value)
+            if node.children:
+                pending.append(iter(node.children))
+                prefix += "."
+                break
+        else:
+            pending.pop()
+            prefix = prefix[:-1]
+
+    return lines
+
+# One JSON object per node with its depth, its value and the number of children that follow it.
+def jsonLines(root):
+    quoted = {}                         # JSON string of each value seen so far
+    heads = ['{"depth": 0, "value": ']  # Start of the object for each depth
+
+    lines = [heads[0] + encode_basestring_ascii(root.value) + ', "children": ' + str(len(root.children)) + '}']
+    append = lines.append
+    pending = [iter(root.children)]
+
+    while pending:
+        depth = len(pending)
+        if depth == len(heads):
+            heads.append('{"depth": ' + str(depth) + ', "value": ')
+        head = heads[depth]
+
+        for node in pending[-1]:
+            value = node.value
+            if value not in quoted:
+                quoted[value] = encode_basestring_ascii(value)
+            children = node.children
+            append(head + quoted[value] + ', "children": ' + str(len(children)) + '}')
+            if children:
+                pending.append(iter(children))
+                break
+        else:
+            pending.pop()
+
+    return lines
+
+treeFormats = {"text": textLines, "json": jsonLines}
+
+# Writes the tree in pre-order to 'stream' (standard output by default) in the given format.
+def dumpTree(root, stream=None, format="text"):
     if root is None:
         return
 
-    print("." * root.depth + root.value)
+    lines = treeFormats[format](root)
+    lines.append("")
+    (stream or sys.stdout).write("\n".join(lines))
 
-    for child in root.children:
-        child.depth = root.depth + 1
-        preOrderTraversal(child)  
\ No newline at end of file
+# Prints the tree in pre-order fashion with indentation (.) based on depth.
+def preOrderTraversal(root):
+    dumpTree(root)
@@ -0,0 +1,282 @@
+'''
+Optimization pass over the standardized tree (ST), run between buildST and
+control structure generation when the interpreter is started with -O.
+
+- Operators whose operands are all literals are evaluated once, at compile
+  time, and replaced by their result.
+- A conditional whose condition is a literal is replaced by the branch that
+  would be taken.
+- A binding made by 'let' or 'where' (gamma applied to a lambda of one name)
+  to a literal is substituted into its body, and the lambda and the gamma go
+  away. A binding to a function that is used once, and not from inside
+  another function, has the function moved to where it is used.
+
+Anything whose evaluation would fail, or whose result is not an integer or a
+truth value, is left for the CSE machine, so programs print exactly what they
+print without -O. The lambdas and conditionals keep the control structure
+numbers they have without -O, so closures shown as results do not change.
+'''
+
+from src.node import Node
+
+# Literals that can be evaluated at compile time. Identifiers (including the built-in functions) and Y* are not.
+literalPrefixes = ("<INT:", "<STR:")
+literalValues = ("<true>", "<false>", "<nil>", "<dummy>")
+
+# Largest integer, in bits, that an operator is folded into. Its digits stay well within str()'s limit.
+MAX_FOLDED_BITS = 4096
+
+# The tree is optimized again while the previous pass changed something, at most this many times.
+# Inlining a function can give another pass a literal argument to substitute.
+MAX_PASSES = 4
+
+# Kinds of entries on the pass's work stack.
+VISIT, BUILD, BIND, LET, LEAVE = range(5)
+
+# What a name stands for while the body it is bound in is optimized. Every lambda parameter and
+# every 'let' that is kept gets a Binding with neither a literal nor a function, so two different
+# bindings of the same name are never mistaken for each other.
+class Binding:
+    __slots__ = ("literal", "function", "outerScope", "lambdaDepth", "uses", "inlinable")
+
+    def __init__(self, literal=None, function=None, outerScope=None, lambdaDepth=0):
+        self.literal = literal              # Literal node substituted for the name
+        self.function = function            # Lambda node that may be moved to the one place it is used
+        self.outerScope = outerScope        # What each name used in the function refers to where it is defined
+        self.lambdaDepth = lambdaDepth      # Number of functions entered when the name was bound
+        self.uses = []                      # Nodes standing for the name in the body
+        self.inlinable = True               # Whether every use sees the function as it is where it is defined
+
+def isLiteral(node):
+    value = node.value
+    return value.startswith(literalPrefixes) or value in literalValues
+
+# Node for an integer or truth value computed by the optimizer, or None for any other value.
+def literalNode(value, line=0):
+    if type(value) == bool:
+        return Node("<true>" if value else "<false>", line)
+    elif type(value) == int:
+        return Node("<INT:" + str(value) + ">", line)
+    return None
+
+# Names of the identifiers used anywhere under root.
+def identifierNames(root):
+    names = set()
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        if node.value.startswith("<ID:"):
+            names.add(node.value[4:-1])
+        pending.extend(node.children)
+    return names
+
+# Optimizes the tree in place. 'numbers' holds the control structure number of every lambda and
+# conditional; lambdas moved to a new node have their number carried over.
+class TreeOptimizer:
+    def __init__(self, numbers):
+        from src.cseMachine import binaryOperations, builtInFunctions, compileInstruction, unaryOperations
+
+        self.numbers = numbers
+        self.binaryOperations = binaryOperations
+        self.unaryOperations = unaryOperations
+        self.compileInstruction = compileInstruction
+        self.builtInFunctions = builtInFunctions
+        self.scope = {}                     # Name -> list of the Bindings in scope, innermost last
+        self.lambdaDepth = 0                # Number of functions (lambdas other than a 'let') the walk is inside
+        self.changed = False
+
+    # Returns the Binding the name refers to at this point of the walk, or None.
+    def lookup(self, name):
+        bindings = self.scope.get(name)
+        return bindings[-1] if bindings else None
+
+    def bind(self, name, binding):
+        self.scope.setdefault(name, []).append(binding)
+
+    def unbind(self, name):
+        return self.scope[name].pop()
+
+    # One pass over the tree, in post-order from an explicit stack. Returns the new root.
+    def run(self, root):
+        results = []                        # Optimized nodes, waiting for their parent
+        pending = [(VISIT, root)]
+
+        while pending:
+            entry = pending.pop()
+            kind = entry[0]
+
+            if kind == VISIT:
+                self.visit(entry[1], pending, results)
+
+            elif kind == BUILD:
+                node = entry[1]
+                n = len(node.children)
+                node.children = results[-n:]
+                del results[-n:]
+                results.append(self.fold(node))
+
+            # The value of a 'let' has been optimized: bind its name before the body is.
+            elif kind == BIND:
+                self.bindLet(entry[1], results[-1])
+
+            elif kind == LET:
+                body = results.pop()
+                value = results.pop()
+                results.append(self.finishLet(entry[1], value, body))
+
+            # Leaving the body of a function
+            else:
+                function, names = entry[1], entry[2]
+                for name in names:
+                    self.unbind(name)
+                self.lambdaDepth -= 1
+                function.children = [function.children[0], results.pop()]
+                results.append(function)
+
+        return results[0]
+
+    def visit(self, node, pending, results):
+        value = node.value
+        children = node.children
+
+        if not children:
+            results.append(self.substitute(node))
+
+        # let x = E in B, standardized to gamma (lambda x. B) E. E is optimized first, then B with x bound.
+        elif value == "gamma" and children[0].value == "lambda" and children[0].children[0].value.startswith("<ID:"):
+            function = children[0]
+            pending.append((LET, node))
+            pending.append((VISIT, function.children[1]))
+            pending.append((BIND, node))
+            pending.append((VISIT, children[1]))
+
+        elif value == "lambda":
+            parameters = children[0]
+            names = [child.value[4:-1] for child in (parameters.children if parameters.value == "," else [parameters])]
+            for name in names:
+                self.bind(name, Binding())
+            self.lambdaDepth += 1
+            pending.append((LEAVE, node, names))
+            pending.append((VISIT, children[1]))
+
+        else:
+            pending.append((BUILD, node))
+            for child in reversed(children):
+                pending.append((VISIT, child))
+
+    # Replaces an identifier bound to a literal by the literal. A use of a function that may be
+    # moved gets a node of its own, which becomes the function if it turns out to be the only use.
+    def substitute(self, node):
+        value = node.value
+        if not value.startswith("<ID:"):
+            return node
+
+        name = value[4:-1]
+        if name in self.builtInFunctions:
+            return node                     # Always the built-in function, whatever is bound to the name
+
+        binding = self.lookup(name)
+        if binding is None or (binding.literal is None and binding.function is None):
+            return node
+
+        if binding.literal is not None:
+            self.changed = True
+            return Node(binding.literal.value, node.line)
+
+        use = Node(value, node.line)
+        binding.uses.append(use)
+        if self.lambdaDepth != binding.lambdaDepth:
+            binding.inlinable = False       # Would create the function on every call of the one around it
+        elif any(self.lookup(name) is not outer for name, outer in binding.outerScope.items()):
+            binding.inlinable = False       # A name the function uses means something else here
+        return use
+
+    def bindLet(self, node, value):
+        name = node.children[0].children[0].value[4:-1]
+
+        if isLiteral(value):
+            binding = Binding(literal=value)
+        elif value.value == "lambda":
+            names = identifierNames(value) - set(self.builtInFunctions)
+            binding = Binding(function=value, outerScope={name: self.lookup(name) for name in names}, lambdaDepth=self.lambdaDepth)
+        else:
+            binding = Binding()
+
+        self.bind(name, binding)
+
+    def finishLet(self, node, value, body):
+        function = node.children[0]
+        binding = self.unbind(function.children[0].value[4:-1])
+
+        if binding.literal is not None:
+            self.changed = True
+            return body
+
+        if binding.function is not None and binding.inlinable and len(binding.uses) <= 1:
+            for use in binding.uses:
+                use.value = "lambda"
+                use.children = value.children
+                use.line = value.line
+                self.numbers[id(use)] = self.numbers[id(value)]
+            self.changed = True
+            return body
+
+        function.children = [function.children[0], body]
+        node.children = [function, value]
+        return node
+
+    # Folds an operator on literals or a conditional on a literal. Returns the node that replaces 'node'.
+    def fold(self, node):
+        children = node.children
+        value = node.value
+
+        if value in self.binaryOperations and value != "aug" and len(children) == 2:
+            if isLiteral(children[0]) and isLiteral(children[1]):
+                return self.foldOperator(node, self.binaryOperations)
+
+        elif value in self.unaryOperations and len(children) == 1:
+            if isLiteral(children[0]):
+                return self.foldOperator(node, self.unaryOperations)
+
+        elif value == "->" and isLiteral(children[0]):
+            self.changed = True
+            return children[1] if self.compileInstruction(children[0].value).value else children[2]
+
+        return node
+
+    def foldOperator(self, node, operations):
+        operands = [self.compileInstruction(child.value).value for child in node.children]
+
+        if node.value == "**":
+            base, exponent = operands
+            if type(exponent) != int or exponent < 0 or type(base) != int or abs(base).bit_length() * exponent > MAX_FOLDED_BITS:
+                return node
+
+        try:
+            result = operations[node.value](*operands)
+        except Exception:
+            return node                     # Fails at run time with the CSE machine's own error
+        if type(result) == int and abs(result).bit_length() > MAX_FOLDED_BITS:
+            return node                     # Computed at run time, like any other large result
+
+        try:
+            folded = literalNode(result, node.line)
+        except ValueError:
+            return node
+        if folded is None:
+            return node
+        self.changed = True
+        return folded
+
+# Optimizes a standardized tree. Returns the new root and the control structure numbers to generate it with.
+def optimize(root):
+    from src.cseMachine import numberStructures
+
+    numbers = numberStructures(root)
+    optimizer = TreeOptimizer(numbers)
+    for _ in range(MAX_PASSES):
+        optimizer.changed = False
+        root = optimizer.run(root)
+        if not optimizer.changed:
+            break
+    return root, numbers
@@ -1,499 +1,530 @@
-from src.screener import filterTokens
+from src.screener import filterTokens, screenTokens
 from src.stack import Stack
 from src.node import *
+from src.tokenDefinitions import Token
 
-# A stack containing nodes
-stack = Stack("AST")
+# Levels of the expression grammar, from the outermost nonterminal to the innermost one.
+E, Ew, T, Ta, Tc, B, Bt, Bs, Bp, A, At, Af, Ap, R = range(14)
 
-# This function is used to build the abstract syntax tree.
-def buildAST(value, num_children):
-    node = Node(value)
-    node.children = [None] * num_children
-    
-    for i in range (0, num_children):
-        if stack.is_empty():
-            print("Stack is empty")
-            exit(1)
-        node.children[num_children - i - 1] = stack.pop()
-        
-    stack.push(node)
- 
-# This function is used to print the abstract syntax tree in preorder traversal.    
-def printAST(root):
-    preOrderTraversal(root)
- 
-# This function is used to read the expected token. 
-def read(expected_token):
-    if tokens[0].content != expected_token:
-        print("Syntax error in line " + str(tokens[0].lineNumber) + ": Expected " + str(expected_token) + " but got " + str(tokens[0].content))
-        exit(1)
-     
-    if not tokens[0].isLastToken:
-        del tokens[0]   
-        
-    else:
-        if tokens[0].tokenType != ")":
-            tokens[0].tokenType = ")"    
-            
+# Levels of the definition grammar.
+D, Da, Dr = range(3)
 
-def parse(file_name):
-    global tokens
-    tokens, invalid_flag, invalid_token = filterTokens(file_name)
-    
-    # If there are invalid tokens, we cannot proceed with the parsing.
-    if invalid_flag:
-        print("Invalid token present in line " + str(invalid_token.lineNumber) + ": " + str(invalid_token.content))
-        exit(1)
-    
-    procedureE()
-    
-    if not stack.is_empty():
-        root = stack.pop()
-    else:
-        print("Stack is empty")
-        exit(1)
-        
-    return root
- 
-############################################################## 
-def procedureE():      
-    # E -> 'let' D 'in' E 
-    if tokens[0].content == "let":
-        read("let")
-        procedureD()
-        
-        if tokens[0].content == "in":
-            read("in")
-            procedureE()
-            buildAST("let", 2)
-        else:
-            print("Syntax error in line " + str(tokens[0].lineNumber) + ": 'in' expected")
-            exit(1)
-    
-    # E -> 'fn'  Vb+ '.' E    
-    elif tokens[0].content == "fn":
-        read("fn")
-        n = 0
+# The level whose rule continues an operand when it is followed by the given token.
+operatorLevels = {
+    "where": Ew, ",": T, "aug": Ta, "->": Tc, "or": B, "&": Bt,
+    "gr": Bp, ">": Bp, "ge": Bp, ">=": Bp, "ls": Bp, "<": Bp, "le": Bp, "<=": Bp, "eq": Bp, "ne": Bp,
+    "+": A, "-": A, "*": At, "/": At, "**": Af, "@": Ap,
+}
 
-        while tokens[0].tokenType == "<IDENTIFIER>" or tokens[0].tokenType == "(":  
-            procedureVb()
-            n += 1
-            
-        if n == 0:
-            print("Syntax error in line " + str(tokens[0].lineNumber) + ": Identifier or '(' expected")
-            exit(1)
-            
-        if tokens[0].content == ".":
-            read(".")
-            procedureE()
-            buildAST("lambda", n + 1)
+# Node names of the comparison operators.
+comparisons = {"gr": "gr", ">": "gr", "ge": "ge", ">=": "ge", "ls": "ls", "<": "ls", "le": "le", "<=": "le", "eq": "eq", "ne": "ne"}
+
+# Tokens that start an Rn.
+rnTypes = frozenset(["<IDENTIFIER>", "<INTEGER>", "<STRING>"])
+rnKeywords = frozenset(["true", "false", "nil", "(", "dummy"])
+
+# Content of the token that stands for the end of the input once the last token has been read.
+# No rule expects it, so a program that stops too early ends with a syntax error.
+END_OF_INPUT = "end of input"
+
+# Kinds of entries on the parser's work stack.
+FRAME, BUILD, DESCEND, DEFINE, RN_CLOSE, T_MORE, TC_THEN, E_LET_IN, D_WITHIN, DA_AND, DB_CLOSE = range(11)
+
+# Recursive descent parser for one token list.
+# It owns the stack of nodes it builds, the tokens being parsed, the index of the current one
+# and the current token itself, so any number of parsers can be used in the same process.
+# Reading a token only moves the index, so parsing is linear in the number of tokens.
+#
+# The procedures for E and D do not call each other. Whatever is left to do after a nested
+# nonterminal is pushed on an explicit work stack, and parse() pops the entries one by one, so
+# deeply nested programs never hit Python's recursion limit. The entries are tuples whose first
+# item is their kind:
+#   (FRAME, first, last)   an operand was parsed; the rules of levels first..last may still continue it
+#   (BUILD, value, n)      build a node from the top n nodes
+#   (DESCEND, level)       parse an expression of the given level
+#   (DEFINE, level)        parse a definition of the given level
+# and the remaining kinds mark the point reached inside a rule, named after the rule and the
+# token it expects next. Vb and Vl never lead back to an expression, so they remain ordinary methods.
+class Parser:
+    def __init__(self, tokenList):
+        # A stack containing nodes
+        self.stack = Stack("AST")
+        self.tokens = tokenList
+        self.position = 0
+        self.current = tokenList[0]
+        self.line = 0                       # Line of the last token read, for the leaves of the AST
+        self.work = []
+
+    # Parses the whole token list and returns the root of the AST.
+    def parse(self):
+        work = self.work
+        self.descend(E)
+
+        while work:
+            entry = work.pop()
+            kind = entry[0]
+
+            if kind == FRAME:
+                self.continueOperand(entry[1], entry[2])
+            elif kind == BUILD:
+                self.buildAST(entry[1], entry[2])
+            elif kind == DESCEND:
+                self.descend(entry[1])
+            elif kind == DEFINE:
+                self.define(entry[1])
+            else:
+                self.resume(entry)
+
+        if not self.stack.is_empty():
+            root = self.stack.pop()
         else:
-            print("Syntax error in line " + str(tokens[0].lineNumber) + ": '.' expected")
+            print("Stack is empty")
             exit(1)
-             
-    # E  ->  Ew    
-    else:
-        procedureEw()
-
-##############################################################
-def procedureEw():
-    # Ew -> T
-    procedureT()
-
-    # Ew -> T 'where' Dr
-    if tokens[0].content == "where":
-        read("where")
-        procedureDr()
-        buildAST("where", 2)  
-        
-##############################################################
-def procedureT():     
-    # T -> Ta
-    procedureTa()
-    
-    # T -> Ta (','  Ta)+
-    n = 0
-    while tokens[0].content == ",":
-        read(",")
-        procedureTa()
-        n += 1
-        
-    if n > 0:
-        buildAST("tau", n+1)
-        
-##############################################################      
-def procedureTa():  
-    # Ta -> Tc
-    procedureTc()
-    
-    # Ta -> Ta 'aug' Tc 
-    while tokens[0].content == "aug":
-        read("aug")
-        procedureTc()
-        buildAST("aug", 2)  
-        
-##############################################################
-def procedureTc():   
-    # Tc -> B
-    procedureB()
-    
-    # Tc -> B '->' Tc '|' Tc
-    if tokens[0].content == "->":  
-        read("->")
-        procedureTc()
-        
-        if tokens[0].content == "|":
-            read("|")
-            procedureTc()
-            buildAST("->", 3)
-        else:
-            print("Syntax error in line " + str(tokens[0].lineNumber) + ": '|' expected")
+
+        return root
+
+    # This function is used to build the abstract syntax tree.
+    # A leaf is built right after its token is read and starts on that token's line; any other
+    # node starts where its first child does.
+    def buildAST(self, value, num_children):
+        node = Node(value, self.line)
+        node.children = [None] * num_children
+
+        for i in range (0, num_children):
+            if self.stack.is_empty():
+                print("Stack is empty")
+                exit(1)
+            node.children[num_children - i - 1] = self.stack.pop()
+
+        if num_children:
+            node.line = node.children[0].line
+        self.stack.push(node)
+
+    # This function is used to read the expected token.
+    # Reading the last token leaves the end of input as the current token.
+    def read(self, expected_token):
+        current = self.current
+
+        if current.content != expected_token:
+            print("Syntax error in line " + str(current.lineNumber) + ": Expected " + str(expected_token) + " but got " + str(current.content))
             exit(1)
-            
-##############################################################
-def procedureB():
-    # B -> Bt
-    procedureBt()
-    
-    # B -> B 'or' Bt
-    while tokens[0].content == "or":
-        read("or")
-        procedureBt()
-        buildAST("or", 2) 
-
-##############################################################
-def procedureBt():    
-    # Bt -> Bs
-    procedureBs()
-    
-    # Bt -> Bt '&' Bs
-    while tokens[0].content == "&":
-        read("&")
-        procedureBs()
-        buildAST("&", 2)
-        
-##############################################################
-def procedureBs():
-    # Bs -> 'not' Bp
-    if tokens[0].content == "not":
-        read("not")
-        procedureBp()
-        buildAST("not", 1)
-        
-    # Bs -> Bp
-    else:
-        procedureBp()
-        
-##############################################################
-def procedureBp():           
-    # Bp -> A
-    procedureA()
-    
-    # Bp -> A ('gr' | '>' ) A
-    if tokens[0].content == "gr" or tokens[0].content == ">":
-        read(tokens[0].content)
-        procedureA()
-        buildAST("gr", 2)
-        
-    # Bp -> A ('ge' | '>=' ) A
-    elif tokens[0].content == "ge" or tokens[0].content == ">=":
-        read(tokens[0].content)
-        procedureA()
-        buildAST("ge", 2)
-        
-    # Bp -> A ('ls' | '<' ) A
-    elif tokens[0].content == "ls" or tokens[0].content == "<":
-        read(tokens[0].content)
-        procedureA()
-        buildAST("ls", 2)
-        
-    # Bp -> A ('le' | '<=' ) A
-    elif tokens[0].content == "le" or tokens[0].content == "<=":
-        read(tokens[0].content)
-        procedureA()
-        buildAST("le", 2)
-        
-    # Bp -> A 'eq' A
-    elif tokens[0].content == "eq":
-        read("eq")
-        procedureA()
-        buildAST("eq", 2)
-        
-    # Bp -> A 'ne' A
-    elif tokens[0].content == "ne":
-        read("ne")
-        procedureA()
-        buildAST("ne", 2)
-
-##############################################################
-def procedureA():
-    # A -> '+' At
-    if tokens[0].content=="+":
-        read("+")
-        procedureAt()
-        
-    # A -> '-' At
-    elif tokens[0].content=="-":
-        read("-")
-        procedureAt()
-        buildAST("neg", 1)
-        
-    # A -> At
-    else:
-        procedureAt()
-        
-    while tokens[0].content in ["+", "-"]:
-        # A -> A '+' At
-        if tokens[0].content=="+":
-            read("+")
-            procedureAt()
-            buildAST("+", 2)
-            
-        # A -> A '-' At
+
+        self.line = current.lineNumber
+        if not current.isLastToken:
+            self.position += 1
+            self.current = self.tokens[self.position]
+
         else:
-            read("-")
-            procedureAt()
-            buildAST("-", 2)
-    
-##############################################################
-def procedureAt():
-    # At -> Af
-    procedureAf()
-    
-    while tokens[0].content in ["*", "/"]:
+            self.current = Token(END_OF_INPUT, "<END>", current.lineNumber)
+            self.current.markAsLast()
+
+    ##############################################################
+    # Parses the start of an expression of the given level, down to its first Rn, and
+    # leaves a FRAME for the rules that may continue it.
+    def descend(self, level):
+        work = self.work
+
+        while level == E:
+            # E -> 'let' D 'in' E
+            if self.current.content == "let":
+                self.read("let")
+                work.append((E_LET_IN,))
+                work.append((DEFINE, D))
+                return
+
+            # E -> 'fn'  Vb+ '.' E
+            elif self.current.content == "fn":
+                self.read("fn")
+                n = 0
+
+                while self.current.tokenType == "<IDENTIFIER>" or self.current.tokenType == "(":
+                    self.procedureVb()
+                    n += 1
+
+                if n == 0:
+                    print("Syntax error in line " + str(self.current.lineNumber) + ": Identifier or '(' expected")
+                    exit(1)
+
+                if self.current.content == ".":
+                    self.read(".")
+                    work.append((BUILD, "lambda", n + 1))
+                else:
+                    print("Syntax error in line " + str(self.current.lineNumber) + ": '.' expected")
+                    exit(1)
+
+            # E  ->  Ew
+            else:
+                level = Ew
+
+        # Bs -> 'not' Bp
+        if level <= Bs and self.current.content == "not":
+            self.read("not")
+            if level <= Bt:
+                work.append((FRAME, level, Bt))
+            work.append((BUILD, "not", 1))
+            level = Bp
+
+        # A -> '+' At
+        #   -> '-' At
+        if level <= A and (self.current.content == "+" or self.current.content == "-"):
+            sign = self.current.content
+            self.read(sign)
+            work.append((FRAME, level, A))
+            if sign == "-":
+                work.append((BUILD, "neg", 1))
+            level = At
+
+        work.append((FRAME, level, R))
+        self.procedureRn()
+
+    ##############################################################
+    # Continues the operand just parsed with the rule of the innermost level in first..last
+    # that applies to the current token. When none does, the operand is complete at all those levels.
+    def continueOperand(self, first, last):
+        work = self.work
+        current = self.current
+        value = current.content
+
+        # R -> R Rn
+        if last == R and (current.tokenType in rnTypes or value in rnKeywords):
+            work.append((FRAME, first, R))
+            work.append((BUILD, "gamma", 2))
+            self.procedureRn()
+            return
+
+        level = operatorLevels.get(value)
+        if level is None or level < first or level > last:
+            return
+
+        # Ap -> Ap '@' <IDENTIFIER> R
+        if level == Ap:
+            self.read("@")
+
+            if self.current.tokenType == "<IDENTIFIER>":
+                name = self.current.content
+                self.read(name)
+                self.buildAST("<ID:" + name + ">", 0)
+                work.append((FRAME, first, Ap))
+                work.append((BUILD, "@", 3))
+                self.descend(R)
+            else:
+                print("Syntax error in line " + str(self.current.lineNumber) + ": Identifier expected")
+                exit(1)
+
         # At -> At '*' Af
-        if tokens[0].content=="*":
-            read("*")
-            procedureAf()
-            buildAST("*", 2)
-            
-        # At -> At '/' Af
-        else:
-            read("/")
-            procedureAf()
-            buildAST("/", 2)
-
-##############################################################
-def procedureAf():    
-    # Af -> Ap 
-    procedureAp()
-    
-    # Af -> Ap '**' Af
-    if tokens[0].content == "**":     
-        read("**")
-        procedureAf()
-        buildAST("**", 2)
- 
-##############################################################    
-def procedureAp():
-    # Ap -> R
-    procedureR()
-    
-    # Ap -> Ap '@' <IDENTIFIER> R
-    while tokens[0].content == "@":
-        read("@")
-        
-        if tokens[0].tokenType == "<IDENTIFIER>":
-            buildAST("<ID:" + tokens[0].content + ">", 0)
-            read(tokens[0].content)
-            procedureR()
-            buildAST("@", 3)            
+        #    -> At '/' Af
+        elif level == At:
+            self.read(value)
+            work.append((FRAME, first, At))
+            work.append((BUILD, value, 2))
+            self.descend(Af)
+
+        # A -> A '+' At
+        #   -> A '-' At
+        elif level == A:
+            self.read(value)
+            work.append((FRAME, first, A))
+            work.append((BUILD, value, 2))
+            self.descend(At)
+
+        # Af -> Ap '**' Af
+        elif level == Af:
+            self.read("**")
+            if first < Af:
+                work.append((FRAME, first, Af - 1))
+            work.append((BUILD, "**", 2))
+            self.descend(Af)
+
+        # Bp -> A ('gr' | '>' | 'ge' | '>=' | 'ls' | '<' | 'le' | '<=' | 'eq' | 'ne') A
+        elif level == Bp:
+            self.read(value)
+            if first < Bp:
+                work.append((FRAME, first, Bp - 1))
+            work.append((BUILD, comparisons[value], 2))
+            self.descend(A)
+
+        # Bt -> Bt '&' Bs
+        elif level == Bt:
+            self.read("&")
+            work.append((FRAME, first, Bt))
+            work.append((BUILD, "&", 2))
+            self.descend(Bs)
+
+        # B -> B 'or' Bt
+        elif level == B:
+            self.read("or")
+            work.append((FRAME, first, B))
+            work.append((BUILD, "or", 2))
+            self.descend(Bt)
+
+        # Tc -> B '->' Tc '|' Tc
+        elif level == Tc:
+            self.read("->")
+            if first < Tc:
+                work.append((FRAME, first, Tc - 1))
+            work.append((TC_THEN,))
+            self.descend(Tc)
+
+        # Ta -> Ta 'aug' Tc
+        elif level == Ta:
+            self.read("aug")
+            work.append((FRAME, first, Ta))
+            work.append((BUILD, "aug", 2))
+            self.descend(Tc)
+
+        # T -> Ta (','  Ta)+
+        elif level == T:
+            self.read(",")
+            if first < T:
+                work.append((FRAME, first, T - 1))
+            work.append((T_MORE, 1))
+            self.descend(Ta)
+
+        # Ew -> T 'where' Dr
         else:
-            print("Syntax error in line " + str(tokens[0].lineNumber) + ": Identifier expected")
-            exit(1)
-    
-##############################################################
-def procedureR():
-    # R -> Rn
-    procedureRn()
-    
-    # R -> R Rn
-    while  tokens[0].tokenType in ["<IDENTIFIER>", "<INTEGER>", "<STRING>"] or tokens[0].content in ["true", "false","nil", "(", "dummy"]: 
-        procedureRn()
-        buildAST("gamma", 2)
-
-##############################################################
-def procedureRn():   
-    value = tokens[0].content
-    
-    # Rn -> <IDENTIFIER>
-    if tokens[0].tokenType == "<IDENTIFIER>":
-        read(value)
-        buildAST("<ID:" + value + ">", 0)
-    
-    # Rn -> <INTEGER>    
-    elif tokens[0].tokenType == "<INTEGER>":
-        read(value)
-        buildAST("<INT:" + value + ">", 0)
-        
-    # Rn -> <STRING>    
-    elif tokens[0].tokenType == "<STRING>":
-        read(value)
-        buildAST("<STR:" + value + ">", 0)
-        
-    # Rn -> 'true'
-    #    -> 'false'
-    #    -> 'nil'
-    #    -> 'dummy'    
-    elif value in ["true", "false", "nil", "dummy"]:
-        read(value)
-        buildAST("<" + value + ">", 0)
-      
-    # Rn -> '(' E ')'    
-    elif value == "(":
-        read("(")
-        procedureE()
-        
-        if tokens[0].content == ")":     
-            read(")")
+            self.read("where")
+            work.append((BUILD, "where", 2))
+            self.define(Dr)
+
+    ##############################################################
+    # Carries on with a rule from the point recorded in the entry.
+    def resume(self, entry):
+        work = self.work
+        kind = entry[0]
+
+        # T -> Ta (','  Ta)+
+        if kind == T_MORE:
+            n = entry[1]
+            if self.current.content == ",":
+                self.read(",")
+                work.append((T_MORE, n + 1))
+                self.descend(Ta)
+            else:
+                self.buildAST("tau", n + 1)
+
+        # Rn -> '(' E ')'
+        # Db -> '(' D ')'
+        elif kind == RN_CLOSE or kind == DB_CLOSE:
+            if self.current.content == ")":
+                self.read(")")
+            else:
+                print("Syntax error in line " + str(self.current.lineNumber) + ": ')' expected")
+                exit(1)
+
+        # Tc -> B '->' Tc '|' Tc
+        elif kind == TC_THEN:
+            if self.current.content == "|":
+                self.read("|")
+                work.append((BUILD, "->", 3))
+                self.descend(Tc)
+            else:
+                print("Syntax error in line " + str(self.current.lineNumber) + ": '|' expected")
+                exit(1)
+
+        # E -> 'let' D 'in' E
+        elif kind == E_LET_IN:
+            if self.current.content == "in":
+                self.read("in")
+                work.append((BUILD, "let", 2))
+                self.descend(E)
+            else:
+                print("Syntax error in line " + str(self.current.lineNumber) + ": 'in' expected")
+                exit(1)
+
+        # Da -> Dr ('and' Dr)+
+        elif kind == DA_AND:
+            n = entry[1]
+            if self.current.content == "and":
+                self.read("and")
+                work.append((DA_AND, n + 1))
+                self.define(Dr)
+            elif n > 0:
+                self.buildAST("and", n + 1)
+
+        # D -> Da 'within' D
         else:
-            print("Syntax error in line " + str(tokens[0].lineNumber) + ": ')' expected")
-            exit(1)
-            
-    else:
-        print("Syntax error in line " + str(tokens[0].lineNumber) + ": Identifier, Integer, String, 'true', 'false', 'nil', 'dummy' or '(' expected")
-        exit(1)
+            if self.current.content == "within":
+                self.read("within")
+                work.append((BUILD, "within", 2))
+                self.define(D)
+
+    ##############################################################
+    def procedureRn(self):
+        value = self.current.content
+
+        # Rn -> <IDENTIFIER>
+        if self.current.tokenType == "<IDENTIFIER>":
+            self.read(value)
+            self.buildAST("<ID:" + value + ">", 0)
+
+        # Rn -> <INTEGER>
+        elif self.current.tokenType == "<INTEGER>":
+            self.read(value)
+            self.buildAST("<INT:" + value + ">", 0)
+
+        # Rn -> <STRING>
+        elif self.current.tokenType == "<STRING>":
+            self.read(value)
+            self.buildAST("<STR:" + value + ">", 0)
+
+        # Rn -> 'true'
+        #    -> 'false'
+        #    -> 'nil'
+        #    -> 'dummy'
+        elif value in ["true", "false", "nil", "dummy"]:
+            self.read(value)
+            self.buildAST("<" + value + ">", 0)
+
+        # Rn -> '(' E ')'
+        elif value == "(":
+            self.read("(")
+            self.work.append((RN_CLOSE,))
+            self.work.append((DESCEND, E))
 
-##############################################################
-def procedureD():
-    # D -> Da
-    procedureDa()
-    
-    # D -> Da 'within' D
-    if tokens[0].content == "within":
-        read("within")
-        procedureD()
-        buildAST("within", 2)
-    
-##############################################################
-def procedureDa():
-    # Da -> Dr
-    procedureDr()
-    
-    # Da -> Dr ('and' Dr)+
-    n = 0
-    while tokens[0].content == "and":
-        read("and")
-        procedureDr()
-        n += 1
-        
-    if n > 0:  
-        buildAST("and", n + 1)
-    
-##############################################################
-def procedureDr():
-    # Dr -> 'rec' Db
-    if tokens[0].content == "rec":
-        read("rec")
-        procedureDb()
-        buildAST("rec", 1)
-        
-    # Dr -> Db
-    else:
-        procedureDb()
-    
-##############################################################
-def procedureDb():    
-    value = tokens[0].content
-    
-    # Db -> '(' D ')'
-    if value == "(":
-        read("(")
-        procedureD()
-        
-        if tokens[0].content == ")":
-            read(")")
         else:
-            print("Syntax error in line " + str(tokens[0].lineNumber) + ": ')' expected")
+            print("Syntax error in line " + str(self.current.lineNumber) + ": Identifier, Integer, String, 'true', 'false', 'nil', 'dummy' or '(' expected")
             exit(1)
 
-    elif tokens[0].tokenType == "<IDENTIFIER>":
-        read(value)
-        buildAST("<ID:" + value + ">", 0)  
+    ##############################################################
+    # Parses the start of a definition of the given level and pushes what remains of it.
+    def define(self, level):
+        work = self.work
 
-        # Db -> <IDENTIFIER> Vb+ '=' E
-        if tokens[0].content in [",", "="]:  
-            procedureVl()
-            read("=")
-            procedureE()
-            buildAST("=", 2)
-        
-        # Db -> Vl '=' E
-        else: 
-            n = 0
-        
-            while tokens[0].tokenType == "<IDENTIFIER>" or tokens[0].tokenType == "(":
-                procedureVb()
-                n += 1
-                
-            if n == 0:
-                print("Syntax error in line " + str(tokens[0].lineNumber) + ": Identifier or '(' expected")
-                exit(1)    
-                
-            if tokens[0].content == "=":
-                read("=")
-                procedureE()
-                buildAST("function_form", n + 2)
+        # D -> Da ('within' D)?
+        if level == D:
+            work.append((D_WITHIN,))
+            level = Da
+
+        # Da -> Dr ('and' Dr)*
+        if level == Da:
+            work.append((DA_AND, 0))
+
+        # Dr -> 'rec' Db
+        if self.current.content == "rec":
+            self.read("rec")
+            work.append((BUILD, "rec", 1))
+
+        value = self.current.content
+
+        # Db -> '(' D ')'
+        if value == "(":
+            self.read("(")
+            work.append((DB_CLOSE,))
+            work.append((DEFINE, D))
+
+        elif self.current.tokenType == "<IDENTIFIER>":
+            self.read(value)
+            self.buildAST("<ID:" + value + ">", 0)
+
+            # Db -> <IDENTIFIER> Vb+ '=' E
+            if self.current.content in [",", "="]:
+                self.procedureVl()
+                self.read("=")
+                work.append((BUILD, "=", 2))
+                self.descend(E)
+
+            # Db -> Vl '=' E
             else:
-                print("Syntax error in line " + str(tokens[0].lineNumber) + ": '=' expected")
-                exit(1)
+                n = 0
+
+                while self.current.tokenType == "<IDENTIFIER>" or self.current.tokenType == "(":
+                    self.procedureVb()
+                    n += 1
+
+                if n == 0:
+                    print("Syntax error in line " + str(self.current.lineNumber) + ": Identifier or '(' expected")
+                    exit(1)
 
-##############################################################
-def procedureVb(): 
-    # Vb -> <IDENTIFIER>
-    #    -> '(' Vl ')'
-    #    -> '(' ')' 
+                if self.current.content == "=":
+                    self.read("=")
+                    work.append((BUILD, "function_form", n + 2))
+                    self.descend(E)
+                else:
+                    print("Syntax error in line " + str(self.current.lineNumber) + ": '=' expected")
+                    exit(1)
+
+        else:
+            print("Syntax error in line " + str(self.current.lineNumber) + ": Identifier or '(' expected")
+            exit(1)
+
+    ##############################################################
+    def procedureVb(self): 
+        # Vb -> <IDENTIFIER>
+        #    -> '(' Vl ')'
+        #    -> '(' ')' 
     
-    value_1 = tokens[0].content 
+        value_1 = self.current.content 
 
-    # Vb -> <IDENTIFIER>
-    if tokens[0].tokenType == "<IDENTIFIER>":
-        read(value_1)
-        buildAST("<ID:" + value_1 + ">", 0)     
-        
-    elif value_1 == "(":
-        read("(")
-        
-        value_2 = tokens[0].content 
-        
-        # Vb -> '(' ')'
-        if value_2 == ")":
-            read(")")
-            buildAST("()", 0)
-        
-        # Vb -> '(' Vl ')'
-        elif tokens[0].tokenType == "<IDENTIFIER>": 
-            read(value_2)
-            buildAST("<ID:" + value_2 + ">", 0)    
-            procedureVl()
+        # Vb -> <IDENTIFIER>
+        if self.current.tokenType == "<IDENTIFIER>":
+            self.read(value_1)
+            self.buildAST("<ID:" + value_1 + ">", 0)     
+        
+        elif value_1 == "(":
+            self.read("(")
+        
+            value_2 = self.current.content 
+        
+            # Vb -> '(' ')'
+            if value_2 == ")":
+                self.read(")")
+                self.buildAST("()", 0)
+        
+            # Vb -> '(' Vl ')'
+            elif self.current.tokenType == "<IDENTIFIER>": 
+                self.read(value_2)
+                self.buildAST("<ID:" + value_2 + ">", 0)    
+                self.procedureVl()
             
-            if tokens[0].content == ")":
-                read(")")
+                if self.current.content == ")":
+                    self.read(")")
+                else:
+                    print("Syntax error in line " + str(self.current.lineNumber) + ": ')' expected")
+                    exit(1)
             else:
-                print("Syntax error in line " + str(tokens[0].lineNumber) + ": ')' expected")
+                print("Syntax error in line " + str(self.current.lineNumber) + ": Identifier or ')' expected")
                 exit(1)
         else:
-            print("Syntax error in line " + str(tokens[0].lineNumber) + ": Identifier or ')' expected")
+            print("Syntax error in line " + str(self.current.lineNumber) + ": Identifier or '(' expected")
             exit(1)
-    else:
-        print("Syntax error in line " + str(tokens[0].lineNumber) + ": Identifier or '(' expected")
-        exit(1)
     
-##############################################################
-def procedureVl():
-    # Vl -> <IDENTIFIER> (',' <IDENTIFIER>)*   
-    n = 0
+    ##############################################################
+    def procedureVl(self):
+        # Vl -> <IDENTIFIER> (',' <IDENTIFIER>)*   
+        n = 0
     
-    while tokens[0].content == ",":
-        read(",")
+        while self.current.content == ",":
+            self.read(",")
         
-        if tokens[0].tokenType == "<IDENTIFIER>":
-            value = tokens[0].content
-            read(value)
-            buildAST("<ID:" + value + ">", 0)    
-            n += 1
-        else:
-            print("Syntax error in line " + str(tokens[0].lineNumber) + ": Identifier expected")
+            if self.current.tokenType == "<IDENTIFIER>":
+                value = self.current.content
+                self.read(value)
+                self.buildAST("<ID:" + value + ">", 0)    
+                n += 1
+            else:
+                print("Syntax error in line " + str(self.current.lineNumber) + ": Identifier expected")
             
-    if n > 0:
-        buildAST(",", n + 1) 
\ No newline at end of file
+        if n > 0:
+            self.buildAST(",", n + 1) 
+# This function is used to print the abstract syntax tree in preorder traversal.    
+def printAST(root):
+    preOrderTraversal(root)
+
+def parse(file_name):
+    return parseScreened(*filterTokens(file_name))
+
+# Parses program text given as a str or bytes-like buffer instead of a file name.
+def parseSource(source):
+    return parseScreened(*screenTokens(source))
+
+def parseScreened(tokenList, invalid_flag, invalid_token):
+    # If there are invalid tokens, we cannot proceed with the parsing.
+    if invalid_flag:
+        print("Invalid token present in line " + str(invalid_token.lineNumber) + ": " + str(invalid_token.content))
+        exit(1)
+
+    return parseTokens(tokenList)
+
+# Parses an already screened list of tokens and returns the root of the AST.
+def parseTokens(tokenList):
+    return Parser(tokenList).parse()
@@ -0,0 +1,112 @@
+'''
+Profile of one evaluation on the CSE machine, collected with '--profile'.
+
+The profiled evaluator counts every machine step twice: once under the rule
+that took it (identifier lookup, closure application, tuple selection, Y*,
+beta, an operator, a built-in function, ...) and once under the control
+structure it was taken in. It also counts how many times each control
+structure was entered: a lambda body once per application of its closure,
+a branch of a conditional once per time it is taken.
+
+Every step is also counted under the source line of the control element it
+ran, and each control structure is shown with the line of the lambda or
+conditional that opens it, so the profile points back into the program as
+'file:line'.
+
+The profile is reported as a table of the rules and of the hottest control
+structures, or written as JSON. Evaluations without '--profile' run the
+ordinary evaluator and pay nothing for it.
+'''
+
+import json
+
+from src.structures import Delta, Lambda
+
+# Number standing for the control elements of an Eta unfolding (rule 13), which belong to no control structure.
+ETA_STRUCTURE = -1
+
+# Rows shown in the tables of control structures and of source lines.
+TABLE_ROWS = 20
+
+# Describes every control structure by what opens it: the program, a lambda's body or a branch of a conditional.
+def structureLabels(controlStructures):
+    labels = {0: "program", ETA_STRUCTURE: "Eta unfolding"}
+    for number, structure in enumerate(controlStructures):
+        for index, symbol in enumerate(structure):
+            if type(symbol) == Lambda:
+                labels[symbol.number] = "lambda " + symbol.boundedVariable
+            elif type(symbol) == Delta and index + 2 < len(structure) and structure[index + 2] == "beta":
+                labels[symbol.number] = "then-branch in " + str(number)
+            elif type(symbol) == Delta and index + 1 < len(structure) and structure[index + 1] == "beta":
+                labels[symbol.number] = "else-branch in " + str(number)
+    return labels
+
+# Source line of every control structure: for a lambda body the line of the lambda, for a branch
+# and for the program the line their expression starts on.
+def structureLines(controlStructures, sourceLines):
+    lines = {number: sourceLines[number][0] for number, structure in enumerate(controlStructures) if structure}
+    for number, structure in enumerate(controlStructures):
+        for index, symbol in enumerate(structure):
+            if type(symbol) == Lambda:
+                lines[symbol.number] = sourceLines[number][index]
+    return lines
+
+class Profile:
+    def __init__(self):
+        self.totalSteps = 0
+        self.sourceName = "<string>"        # File the program came from
+        self.rules = {}                     # Rule name -> steps taken by it
+        self.invocations = {}               # Control structure number -> times it was entered
+        self.steps = {}                     # Control structure number -> steps taken in it
+        self.labels = {}                    # Control structure number -> description
+        self.lines = {}                     # Control structure number -> source line it starts on
+        self.lineSteps = {}                 # Source line -> steps taken by the control elements from it
+
+    # Control structures by the steps taken in them, most first.
+    def hotStructures(self):
+        return sorted(self.steps, key=lambda number: (-self.steps[number], number))
+
+    def label(self, number):
+        return self.labels.get(number, "structure " + str(number))
+
+    # 'file:line' of a source line, or of where a control structure starts. Empty when it is not known.
+    def location(self, line):
+        return self.sourceName + ":" + str(line) if line else ""
+
+    # Source lines by the steps taken by their control elements, most first.
+    def hotLines(self):
+        return sorted((line for line in self.lineSteps if line), key=lambda line: (-self.lineSteps[line], line))
+
+    def toJson(self):
+        return {
+            "steps": self.totalSteps,
+            "rules": dict(sorted(self.rules.items(), key=lambda item: -item[1])),
+            "source": self.sourceName,
+            "structures": [{"structure": number, "label": self.label(number), "line": self.lines.get(number, 0),
+                            "invocations": self.invocations.get(number, 0), "steps": self.steps[number]} for number in self.hotStructures()],
+            "lines": [{"line": line, "steps": self.lineSteps[line]} for line in self.hotLines()],
+        }
+
+    def writeJson(self, stream):
+        json.dump(self.toJson(), stream, indent=2)
+        stream.write("\n")
+
+    # Writes the rules and the hottest control structures as a table, with each one's share of the steps.
+    def writeTable(self, stream):
+        total = self.totalSteps or 1
+        lines = ["Machine steps: " + str(self.totalSteps), "", f"{'rule':<20} {'steps':>10} {'%':>6}"]
+        for rule, steps in sorted(self.rules.items(), key=lambda item: -item[1]):
+            lines.append(f"{rule:<20} {steps:>10} {steps * 100 / total:>6.1f}")
+
+        lines += ["", f"{'structure':>9}  {'label':<28} {'source':<24} {'calls':>8} {'steps':>10} {'%':>6}"]
+        for number in self.hotStructures()[:TABLE_ROWS]:
+            steps = self.steps[number]
+            source = self.location(self.lines.get(number, 0))
+            lines.append(f"{number:>9}  {self.label(number):<28} {source:<24} {self.invocations.get(number, 0):>8} {steps:>10} {steps * 100 / total:>6.1f}")
+
+        lines += ["", f"{'source':<38} {'steps':>10} {'%':>6}"]
+        for line in self.hotLines()[:TABLE_ROWS]:
+            steps = self.lineSteps[line]
+            lines.append(f"{self.location(line):<38} {steps:>10} {steps * 100 / total:>6.1f}")
+
+        stream.write("\n".join(lines) + "\n")
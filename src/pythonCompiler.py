@@ -0,0 +1,365 @@
+'''
+Python back end for the CSE machine, selected with '--engine=pycompile'.
+
+A program's control structures are translated into the source of a Python
+module, which is compiled with compile() and run natively:
+
+- The body of every lambda becomes a top-level function of one argument, the
+  environment it runs in. Variables are read from the environment's values
+  at the depth and slot they were resolved to, and closures are the same
+  Lambda objects the CSE machine builds, so they print the same way.
+- The machine's stack is replaced by Python locals: each operation that can
+  fail or call a closure stores its result in a temporary, in the order the
+  CSE machine would perform it (the rand before the rator, the right operand
+  before the left one).
+- Conditionals become if/else statements, or calls to functions of their
+  own when nested too deeply for Python's parser.
+- A closure applied in tail position is returned as a TailCall and applied
+  by a trampoline, so tail-recursive loops do not use up Python's stack.
+  Y* ties the knot the way the CSE machine does, or unfolds Eta closures
+  with '--recursion=eta'.
+
+Integer division, 'aug', the comparisons and the built-in functions behave
+as in the CSE machine. Conc only works where the machine's does: applied to
+its first argument and, straight away, to its second, as in 'Conc x y'.
+Anywhere else it raises TypeError. Differences: applying something that is
+not a function raises TypeError, and no machine steps are counted, so step
+limits cannot be enforced.
+
+A control structure that does not leave exactly one value on the stack has
+no Python translation. It is compiled to a call to 'malformed', which raises
+the error only if that code is actually run, so the rest of the program runs
+as it does on the other engines.
+'''
+
+import itertools
+import sys
+
+from src.structures import Constant, Delta, Eta, Identifier, Lambda, Operator, RpalTuple, Tau
+
+# Conditionals nested deeper than this inside one function are compiled into functions of their own.
+MAX_INLINE_DEPTH = 16
+
+# Recursion limit while a compiled program runs. Calls that are not in tail position use Python frames.
+RECURSION_LIMIT = 1000000
+
+# Python expression for each operator; the operands are the left and right values.
+operatorTemplates = {
+    "+": "({0}) + ({1})",
+    "-": "({0}) - ({1})",
+    "*": "({0}) * ({1})",
+    "/": "({0}) // ({1})",
+    "**": "({0}) ** ({1})",
+    "gr": "({0}) > ({1})",
+    "ge": "({0}) >= ({1})",
+    "ls": "({0}) < ({1})",
+    "le": "({0}) <= ({1})",
+    "eq": "({0}) == ({1})",
+    "ne": "({0}) != ({1})",
+    "or": "({0}) or ({1})",
+    "&": "({0}) and ({1})",
+    "aug": "augment({0}, {1})",
+    "not": "not ({0})",
+    "neg": "-({0})",
+}
+
+# Raised while compiling a control structure that leaves no value or several. One that takes a value
+# from an empty stack raises IndexError instead.
+class Untranslatable(Exception):
+    pass
+
+# A closure application returned from tail position, for the trampoline in 'apply' to make.
+class TailCall:
+    __slots__ = ("rator", "rand")
+
+    def __init__(self, rator, rand):
+        self.rator = rator
+        self.rand = rand
+
+# Conc applied to its first argument.
+class ConcPartial:
+    __slots__ = ("first",)
+
+    def __init__(self, first):
+        self.first = first
+
+# One function being generated: its lines, its temporaries and the environments it reads from.
+class FunctionCode:
+    def __init__(self, name):
+        self.name = name
+        self.lines = []
+        self.temporaries = 0
+        self.depths = set()
+
+    def temporary(self):
+        self.temporaries += 1
+        return "t" + str(self.temporaries)
+
+    # The function's source. Each environment it reads from is looked up once, on entry.
+    def source(self):
+        header = ["def " + self.name + "(env):"]
+        for depth in sorted(self.depths):
+            header.append("    v" + str(depth) + " = env" + ".parent" * depth + ".values")
+        return "\n".join(header + self.lines)
+
+class PythonCompiler:
+    def __init__(self, controlStructures):
+        self.controlStructures = controlStructures
+        self.functions = []                 # FunctionCode of every generated function
+        self.pending = []                   # (name, structure number, tail) of functions still to generate
+        self.lambdas = []                   # Numbers of the lambdas whose bodies have a function
+        self.parameters = {}                # Lambda number -> its parameter names, bound as P<number>
+
+    # Returns the module source. L<n> is the body of lambda n (L0 the program), D<n> a conditional branch.
+    def compile(self):
+        self.lambdas.append(0)
+        self.pending.append(("L0", 0, True))
+        while self.pending:
+            name, number, tail = self.pending.pop()
+            function = FunctionCode(name)
+            try:
+                result = self.compileStructure(number, function, 1, tail, 0)
+            except (Untranslatable, IndexError):
+                function = FunctionCode(name)
+                result = "malformed(" + str(number) + ")"
+            if result is not None:
+                function.lines.append("    return " + result)
+            self.functions.append(function)
+
+        lines = ["P" + str(number) + " = " + repr(parameters) for number, parameters in self.parameters.items()]
+        return "\n".join(lines + [function.source() for function in self.functions]) + "\n"
+
+    # Adds the statements of control structure 'number' to the function and returns the expression for
+    # its value, or None when the statements already return it. With 'tail', the value is the function's
+    # result, so a closure applied last is returned as a TailCall.
+    def compileStructure(self, number, function, indent, tail, depth):
+        controlStructures = self.controlStructures
+        structure = controlStructures[number]
+        lines = function.lines
+        pad = "    " * indent
+        stack = []                          # Python expressions for the values the CSE machine would have on its stack
+
+        index = len(structure)
+        while index:
+            index -= 1
+            symbol = structure[index]
+            kind = type(symbol)
+
+            if kind == Identifier:
+                function.depths.add(symbol.depth)
+                stack.append("v" + str(symbol.depth) + "[" + str(symbol.slot) + "]")
+
+            elif kind == Constant:
+                stack.append(repr(symbol.value))
+
+            elif kind == Lambda:
+                if symbol.number not in self.parameters:
+                    self.parameters[symbol.number] = symbol.parameters
+                    self.lambdas.append(symbol.number)
+                    self.pending.append(("L" + str(symbol.number), symbol.number, True))
+                stack.append("Lambda(" + str(symbol.number) + ", " + repr(symbol.boundedVariable) + ", env, P" + str(symbol.number) + ")")
+
+            elif kind == Operator:
+                left = stack.pop()
+                expression = operatorTemplates[symbol.symbol].format(left, stack.pop() if symbol.arity == 2 else None)
+                temporary = function.temporary()
+                lines.append(pad + temporary + " = " + expression)
+                stack.append(temporary)
+
+            elif kind == Tau:
+                items = [stack.pop() for _ in range(symbol.number)]
+                temporary = function.temporary()
+                lines.append(pad + temporary + " = (" + ", ".join(items) + ",)")
+                stack.append(temporary)
+
+            elif symbol == "gamma":
+                rator = stack.pop()
+                rand = stack.pop()
+                if tail and index == 0 and not stack:
+                    lines.append(pad + "return TailCall(" + rator + ", " + rand + ")")
+                    return None
+                temporary = function.temporary()
+                if index and structure[index - 1] == "gamma" and stack:
+                    # The result is applied straight away to a value already computed, as in 'Conc x y'
+                    lines.append(pad + temporary + " = apply(" + rator + ", " + rand + ", True)")
+                else:
+                    lines.append(pad + temporary + " = apply(" + rator + ", " + rand + ")")
+                stack.append(temporary)
+
+            # 'beta' is followed by the else and then parts of its conditional.
+            elif symbol == "beta" and index >= 2 and type(structure[index - 1]) == Delta and type(structure[index - 2]) == Delta:
+                condition = stack.pop()
+                elseNumber = structure[index - 1].number
+                thenNumber = structure[index - 2].number
+                branchTail = tail and index == 2 and not stack
+                index -= 2
+
+                if depth >= MAX_INLINE_DEPTH:
+                    for branch in (thenNumber, elseNumber):
+                        self.pending.append(("D" + str(branch), branch, branchTail))
+                    expression = "D" + str(thenNumber) + "(env) if " + condition + " else D" + str(elseNumber) + "(env)"
+                    if branchTail:
+                        lines.append(pad + "return " + expression)
+                        return None
+                    temporary = function.temporary()
+                    lines.append(pad + temporary + " = " + expression)
+                    stack.append(temporary)
+                    continue
+
+                temporary = None if branchTail else function.temporary()
+                lines.append(pad + "if " + condition + ":")
+                for branch in (thenNumber, elseNumber):
+                    start = len(lines)
+                    try:
+                        result = self.compileStructure(branch, function, indent + 1, branchTail, depth + 1)
+                    except (Untranslatable, IndexError):
+                        del lines[start:]
+                        result = "malformed(" + str(branch) + ")"
+                    if result is not None:
+                        lines.append(pad + "    " + ("return " if branchTail else temporary + " = ") + result)
+                    if branch == thenNumber:
+                        lines.append(pad + "else:")
+                if branchTail:
+                    return None
+                stack.append(temporary)
+
+            # Other strings are steps that do nothing, as in the CSE machine.
+
+        if len(stack) != 1:
+            raise Untranslatable(number)
+        return stack[0]
+
+# Bodies of the lambdas Y* can tie a knot for, by lambda number: the same shapes tieKnot accepts,
+# 'lambda f. lambda x. E' and 'lambda (f, g). (lambda x. E, lambda y. F)'.
+def knotBodies(controlStructures, parameters):
+    bodies = {}
+    for number, names in parameters.items():
+        structure = controlStructures[number]
+        if len(names) == 1 and len(structure) == 1 and type(structure[0]) == Lambda:
+            bodies[number] = structure
+        elif (len(names) > 1 and len(structure) == len(names) + 1 and type(structure[0]) == Tau
+                and structure[0].number == len(names) and all(type(body) == Lambda for body in structure[1:])):
+            bodies[number] = structure[1:]
+    return bodies
+
+# Engine entry point: translates the machine's control structures to Python and runs them.
+def runPython(machine, rootMarker):
+    from src.cseMachine import augment, builtInFunctions
+
+    if machine.stepLimit is not None:
+        raise ValueError("The pycompile engine does not count machine steps, so it cannot enforce a step limit")
+
+    compiler = PythonCompiler(machine.controlStructures)
+    code = compile(compiler.compile(), "<rpal>", "exec")
+
+    bodies = [None] * len(machine.controlStructures)
+    knots = knotBodies(machine.controlStructures, compiler.parameters) if machine.recursionMode == "knot" else {}
+    environmentClass = machine.environmentClass
+    counter = itertools.count(machine.environmentCount + 1)
+
+    def builtIn(function, argument):
+        if function == "Order":
+            return len(argument)
+        elif function == "Print" or function == "print":
+            machine.printPresent = True
+            if type(argument) == str:
+                if "\\n" in argument:
+                    argument = argument.replace("\\n", "\n")
+                if "\\t" in argument:
+                    argument = argument.replace("\\t", "\t")
+            return argument
+        elif function == "Conc":
+            return ConcPartial(argument)
+        elif function == "Stern":
+            return argument[1:]
+        elif function == "Stem":
+            return argument[0]
+        elif function == "Isinteger":
+            return type(argument) == int
+        elif function == "Istruthvalue":
+            return type(argument) == bool
+        elif function == "Isstring":
+            return type(argument) == str
+        elif function == "Istuple":
+            return type(argument) == tuple or type(argument) == RpalTuple
+        elif function == "Isfunction":
+            return type(argument) == Lambda or type(argument) == Eta or argument in builtInFunctions
+        elif type(argument) == int:         # ItoS
+            return str(argument)
+        else:
+            print("Error: ItoS function can only accept integers.")
+            exit()
+
+    # Applies a value to an argument and returns the result, making the tail calls of the closures it runs.
+    # 'curried' is set when the result is applied to the next argument straight away, the only place
+    # where the CSE machine's Conc finds its second argument.
+    def apply(rator, rand, curried=False):
+        while True:
+            kind = type(rator)
+
+            if kind is Lambda:
+                parameters = rator.parameters
+                n = len(parameters)
+                if n > 1:
+                    values = list(rand[:n])
+                    if len(values) < n:
+                        raise IndexError("tuple index out of range")
+                else:
+                    values = [rand]
+                result = bodies[rator.number](environmentClass(next(counter), rator.environment, parameters, values))
+                if type(result) is not TailCall:
+                    return result
+                rator = result.rator
+                rand = result.rand
+                curried = False
+
+            elif kind is tuple or kind is RpalTuple:
+                return rator[rand - 1]
+
+            # Rule 13: apply a fresh copy of the closure to the Eta, then the result to the argument.
+            elif kind is Eta:
+                rator = apply(Lambda(rator.number, rator.boundedVariable, rator.environment, rator.parameters), rator)
+
+            elif kind is ConcPartial:
+                return rator.first + rand
+
+            # Rule 12, with the recursive closures built once when their bodies allow it.
+            elif rator == "Y*":
+                knotted = knots.get(rand.number)
+                if knotted is None:
+                    return Eta(rand.number, rand.boundedVariable, rand.environment, rand.parameters)
+                knot = environmentClass(next(counter), rand.environment, rand.parameters)
+                closures = tuple(Lambda(body.number, body.boundedVariable, knot, body.parameters) for body in knotted)
+                knot.values = list(closures)
+                return closures[0] if len(rand.parameters) == 1 else closures
+
+            elif kind is str and rator in builtInFunctions:
+                if rator == "Conc" and not curried:
+                    raise TypeError("Conc applied to one argument has no second argument to take")
+                return builtIn(rator, rand)
+
+            else:
+                raise TypeError("Cannot apply " + repr(rator) + " to an argument")
+
+    # Stands for a control structure with no translation, when it is run.
+    def malformed(number):
+        raise ValueError("Control structure " + str(number) + " does not leave exactly one value")
+
+    namespace = {"Lambda": Lambda, "TailCall": TailCall, "augment": augment, "apply": apply, "malformed": malformed}
+    exec(code, namespace)
+    for number in compiler.lambdas:
+        bodies[number] = namespace["L" + str(number)]
+
+    previousLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(previousLimit, RECURSION_LIMIT))
+    try:
+        result = bodies[0](rootMarker.environment)
+        if type(result) is TailCall:
+            result = apply(result.rator, result.rand)
+    finally:
+        sys.setrecursionlimit(previousLimit)
+
+    stackItems = machine.stackItems
+    stackItems.pop()                        # The root marker, as the CSE machine leaves the program's environment
+    stackItems.append(result)
+    machine.environmentCount = next(counter) - 1
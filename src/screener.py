@@ -3,53 +3,59 @@ This module filters and processes the raw tokens generated from the source file.
 It tags RPAL keywords, removes unnecessary tokens, and identifies invalid ones.
 '''
 
-from src.lexicalAnalyzer import extractTokens
-
-def filterTokens(fileName):
-    # Reserved keywords in RPAL
-    rpalKeywords = {
-        "let", "in", "where", "rec", "fn",
-        "aug", "or", "not", "gr", "ge", "ls", "le", "eq", "ne",
-        "true", "false", "nil", "dummy", "within", "and"
-    }
-
-    characterStream = []
+from src.lexicalAnalyzer import mappedFile, scanLexemes
+from src.tokenDefinitions import Token
+
+# Reserved keywords in RPAL
+rpalKeywords = frozenset({
+    "let", "in", "where", "rec", "fn",
+    "aug", "or", "not", "gr", "ge", "ls", "le", "eq", "ne",
+    "true", "false", "nil", "dummy", "within", "and"
+})
+
+# Scans and screens a str or bytes-like source in one pass.
+# Whitespace, comments and line breaks are skipped before a Token is ever built, identifiers are
+# tagged as keywords as they are produced, and the first invalid token in the source is recorded.
+def screenTokens(source):
     tokenStream = []
-    hasInvalidToken = False
     firstInvalidToken = None
+    atStart = True
 
-    try:
-        with open(fileName, 'r') as sourceFile:
-            for line in sourceFile:
-                characterStream.extend(line)
-            tokenStream = extractTokens(characterStream)
+    for content, tokenType, lineNumber in scanLexemes(source):
+        isFirst = atStart
+        atStart = False
 
-    except FileNotFoundError:
-        print("Error: File not found.")
-        exit(1)
-    except Exception as error:
-        print("An unexpected error occurred:", error)
-        exit(1)
+        if tokenType == '<DELETE>':
+            continue
 
-    # Reverse traversal for safe removal and tagging
-    for i in range(len(tokenStream) - 1, -1, -1):
-        token = tokenStream[i]
+        token = Token(content, tokenType, lineNumber)
 
-        # Tag keywords
-        if token.tokenType == "<IDENTIFIER>" and token.content in rpalKeywords:
-            token.markAsKeyword()
+        if tokenType == '<IDENTIFIER>':
+            if content in rpalKeywords:
+                token.markAsKeyword()
+        elif tokenType == '<INVALID>' and firstInvalidToken is None:
+            firstInvalidToken = token
 
-        # Remove whitespace, comments, and line breaks
-        if token.tokenType == "<DELETE>" or token.content == "\n":
-            tokenStream.pop(i)
+        # Only the very first lexeme of the source carries the flag, as in extractTokens.
+        if isFirst:
+            token.markAsFirst()
 
-        # Flag first encountered invalid token
-        if token.tokenType == "<INVALID>" and not hasInvalidToken:
-            hasInvalidToken = True
-            firstInvalidToken = token
+        tokenStream.append(token)
 
     # Ensure last token is marked properly
     if tokenStream:
-        tokenStream[-1].isLastToken = True
+        tokenStream[-1].markAsLast()
 
-    return tokenStream, hasInvalidToken, firstInvalidToken
+    return tokenStream, firstInvalidToken is not None, firstInvalidToken
+
+def filterTokens(fileName):
+    try:
+        with mappedFile(fileName) as buffer:
+            return screenTokens(buffer)
+
+    except FileNotFoundError:
+        print("Error: File not found.")
+        exit(1)
+    except Exception as error:
+        print("An unexpected error occurred:", error)
+        exit(1)
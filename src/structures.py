@@ -1,21 +1,142 @@
 # Defined the Core object definitions for our RPAL-Interpreter project
+# The classes declare __slots__ because closures and instructions are created in large numbers.
+
+from itertools import islice
 
 class Delta:
+    __slots__ = ("number",)
+
     def __init__(self, number):
         self.number = number
 
 class Tau:
+    __slots__ = ("number",)
+
     def __init__(self, number):
         self.number = number
 
 class Lambda:
-    def __init__(self, number, boundedVariable=None, environment=None):
+    __slots__ = ("number", "boundedVariable", "environment", "parameters")
+
+    def __init__(self, number, boundedVariable=None, environment=None, parameters=None):
         self.number = number
         self.boundedVariable = boundedVariable
         self.environment = environment
+        self.parameters = parameters            # boundedVariable split into names ahead of time
 
 class Eta:
-    def __init__(self, number, boundedVariable=None, environment=None):
+    __slots__ = ("number", "boundedVariable", "environment", "parameters")
+
+    def __init__(self, number, boundedVariable=None, environment=None, parameters=None):
         self.number = number
         self.boundedVariable = boundedVariable
         self.environment = environment
+        self.parameters = parameters
+
+# Marks the start of a closure application on the control and the stack.
+# Records the environment that was entered and the one to restore when the body finishes.
+class EnvironmentMarker:
+    __slots__ = ("environment", "previous")
+
+    def __init__(self, environment, previous):
+        self.environment = environment
+        self.previous = previous
+
+# Pre-resolved control structure instructions.
+# Produced once when the control structures are generated so the CSE machine never parses node strings.
+
+# A literal (<INT:..>, <STR:..>, true, false, nil, dummy, Y*) or a built-in function name, already converted.
+class Constant:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+# A reference to a variable. Its value is found 'depth' parent links up from the current
+# environment, at index 'slot' of that environment's values. Both are filled in when the
+# control structures are generated.
+class Identifier:
+    __slots__ = ("name", "depth", "slot")
+
+    def __init__(self, name, depth=0, slot=0):
+        self.name = name
+        self.depth = depth
+        self.slot = slot
+
+# A unary or binary operator, together with the callable that implements it.
+class Operator:
+    __slots__ = ("symbol", "arity", "function")
+
+    def __init__(self, symbol, arity, function=None):
+        self.symbol = symbol
+        self.arity = arity
+        self.function = function
+
+# Tuple value built by 'aug'. It views the first 'length' items of a backing list that may be
+# shared with longer tuples built from it. Appending to the tuple that ends the shared list
+# reuses the list, so building a tuple element by element costs amortized O(1) per 'aug'.
+# Any other tuple copies its own items first, so earlier tuples never change.
+class RpalTuple:
+    __slots__ = ("items", "length")
+
+    def __init__(self, items, length):
+        self.items = items
+        self.length = length
+
+    # Returns a new tuple with the given values added at the end.
+    def extend(self, values):
+        items = self.items
+        if len(items) != self.length:
+            items = items[:self.length]
+        items.extend(values)
+        return RpalTuple(items, len(items))
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if type(index) == slice:
+            return tuple(self)[index]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("tuple index out of range")
+        return self.items[index]
+
+    def __iter__(self):
+        return islice(self.items, self.length)
+
+    def __add__(self, other):
+        return self.extend(other)
+
+    def __radd__(self, other):
+        return tuple(other) + tuple(self)
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, RpalTuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, (tuple, RpalTuple)):
+            return tuple(self) != tuple(other)
+        return NotImplemented
+
+    def __lt__(self, other):
+        return tuple(self) < tuple(other)
+
+    def __le__(self, other):
+        return tuple(self) <= tuple(other)
+
+    def __gt__(self, other):
+        return tuple(self) > tuple(other)
+
+    def __ge__(self, other):
+        return tuple(self) >= tuple(other)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    # Prints exactly like the equivalent Python tuple.
+    def __repr__(self):
+        return repr(tuple(self))
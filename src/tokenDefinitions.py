@@ -4,6 +4,8 @@ Each token stores its content, type, line number, and flags for parsing purposes
 """
 
 class Token:
+    __slots__ = ("content", "tokenType", "lineNumber", "isFirstToken", "isLastToken")
+
     def __init__(self, content, tokenType, lineNumber):
         self.content = content
         self.tokenType = tokenType
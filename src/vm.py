@@ -0,0 +1,320 @@
+'''
+Bytecode back end for the CSE machine, selected with '--engine=vm'.
+
+The control structures of a program are compiled into one array('i') of
+instructions, each an opcode followed by one operand, and a few pools the
+operands index into: constants, operator functions, lambda templates and
+variable addresses. A stack VM then runs the bytecode in a single loop.
+
+- Every lambda body is one run of code ending in RETURN. Closures are the
+  same Lambda objects the CSE machine builds, and applying one jumps to its
+  body with the return address and the caller's environment saved on a
+  return stack instead of on the value stack.
+- The branches of a conditional are compiled inline: BRANCH jumps to the
+  else-part when the condition is false and the then-part jumps over it.
+- A closure applied when the next instruction returns is a tail call and
+  saves nothing, so tail-recursive loops run in constant space.
+- Y*, Eta closures, tuples and the built-in functions behave as they do in
+  the CSE machine, and the VM counts one step for each step the CSE machine
+  takes, so step counts and step limits are the same for both.
+'''
+
+from array import array
+
+from src.structures import Constant, Delta, Eta, Identifier, Lambda, Operator, RpalTuple, Tau
+
+# Opcodes
+CONST, LOCAL, LOAD, LAMBDA, GAMMA, RETURN, BINARY, UNARY, TAU, BRANCH, JUMP, RESUME, NOP = range(13)
+opcodeNames = ["CONST", "LOCAL", "LOAD", "LAMBDA", "GAMMA", "RETURN", "BINARY", "UNARY", "TAU", "BRANCH", "JUMP", "RESUME", "NOP"]
+
+# Code every Eta application runs: apply a fresh copy of the closure to the Eta, then apply
+# the result to the argument (rule 13), and go back to the instruction after the application.
+etaCode = (GAMMA, 0, GAMMA, 0, RESUME, 0)
+
+class Bytecode:
+    def __init__(self):
+        self.code = array("i", etaCode)
+        self.constants = []                 # Values pushed by CONST
+        self.functions = []                 # Operator callables for BINARY and UNARY
+        self.templates = []                 # Lambda instructions LAMBDA makes closures from
+        self.addresses = []                 # (depth, slot) of the variables read with LOAD
+        self.starts = {}                    # Control structure number of a lambda -> offset of its body
+        self.entry = len(etaCode)           # Offset of the program's own code
+        self.pools = {}                     # Index of every pooled value, per pool
+
+    # Index of a value in one of the pools, adding it the first time it is seen.
+    # Keys include the type so that 1 and True get different entries.
+    def pooled(self, pool, value, key=None):
+        key = (id(pool), type(value), value) if key is None else (id(pool), key)
+        index = self.pools.get(key)
+        if index is None:
+            index = len(pool)
+            pool.append(value)
+            self.pools[key] = index
+        return index
+
+    def emit(self, opcode, operand=0):
+        self.code.append(opcode)
+        self.code.append(operand)
+        return len(self.code) - 2
+
+# Compiles a program's control structures. Structure 0 is the program itself; the body of every
+# lambda it can reach is compiled after it, each once. Works from explicit stacks of pending
+# work so deeply nested programs do not run into the recursion limit.
+def compileBytecode(controlStructures):
+    program = Bytecode()
+    code = program.code
+    bodies = [0]
+
+    while bodies:
+        number = bodies.pop()
+        program.starts[number] = len(code)
+        structure = controlStructures[number]
+
+        # Entries are ("code", structure, index) to compile structure[index - 1] down to structure[0],
+        # and ("else" | "end", cell) to finish a conditional, where cell holds the offsets of its
+        # BRANCH and of the JUMP at the end of its then-part.
+        pending = [("code", structure, len(structure))]
+        while pending:
+            entry = pending.pop()
+
+            if entry[0] == "else":
+                cell = entry[1]
+                cell[1] = program.emit(JUMP)
+                code[cell[0] + 1] = len(code)
+                continue
+
+            if entry[0] == "end":
+                code[entry[1][1] + 1] = len(code)
+                continue
+
+            structure, index = entry[1], entry[2]
+            while index:
+                index -= 1
+                symbol = structure[index]
+                kind = type(symbol)
+
+                if kind == Identifier:
+                    if symbol.depth == 0:
+                        program.emit(LOCAL, symbol.slot)
+                    else:
+                        address = (symbol.depth, symbol.slot)
+                        program.emit(LOAD, program.pooled(program.addresses, address, address))
+
+                elif kind == Constant:
+                    program.emit(CONST, program.pooled(program.constants, symbol.value))
+
+                elif kind == Lambda:
+                    program.emit(LAMBDA, program.pooled(program.templates, symbol, symbol.number))
+                    if symbol.number not in program.starts and symbol.number not in bodies:
+                        bodies.append(symbol.number)
+
+                elif kind == Operator:
+                    program.emit(BINARY if symbol.arity == 2 else UNARY, program.pooled(program.functions, symbol.function, symbol.symbol))
+
+                elif kind == Tau:
+                    program.emit(TAU, symbol.number)
+
+                elif symbol == "gamma":
+                    program.emit(GAMMA)
+
+                # 'beta' is followed by the else and then parts of its conditional.
+                elif symbol == "beta" and index >= 2 and type(structure[index - 1]) == Delta and type(structure[index - 2]) == Delta:
+                    elsePart = controlStructures[structure[index - 1].number]
+                    thenPart = controlStructures[structure[index - 2].number]
+                    cell = [program.emit(BRANCH), None]
+                    pending.append(("code", structure, index - 2))
+                    pending.append(("end", cell))
+                    pending.append(("code", elsePart, len(elsePart)))
+                    pending.append(("else", cell))
+                    pending.append(("code", thenPart, len(thenPart)))
+                    break
+
+                # Anything else is a step that does nothing, as in the CSE machine.
+                else:
+                    program.emit(NOP)
+
+        program.emit(RETURN)
+
+    threadJumps(code, program.entry)
+    return program
+
+# Points every jump at the end of the chain of jumps it starts, and turns jumps that reach a RETURN
+# into RETURNs, so a closure applied at the end of a branch is seen as a tail call.
+def threadJumps(code, start):
+    for pc in range(start, len(code), 2):
+        if code[pc] == JUMP:
+            target = code[pc + 1]
+            while code[target] == JUMP:
+                target = code[target + 1]
+            if code[target] == RETURN:
+                code[pc] = RETURN
+                code[pc + 1] = 0
+            else:
+                code[pc + 1] = target
+
+# Lists the instructions as text, one per line, for debugging.
+def disassemble(program):
+    code = program.code
+    return [f"{pc:>6} {opcodeNames[code[pc]]:<7} {code[pc + 1]}" for pc in range(0, len(code), 2)]
+
+# Engine entry point: compiles the machine's control structures and runs them.
+def runBytecode(machine, rootMarker):
+    execute(machine, compileBytecode(machine.controlStructures), rootMarker)
+
+def execute(machine, program, rootMarker):
+    from src.cseMachine import StepLimitExceeded, builtInFunctions
+
+    code = program.code
+    constants = program.constants
+    functions = program.functions
+    templates = program.templates
+    addresses = program.addresses
+    starts = program.starts
+    environmentClass = machine.environmentClass
+    knot = machine.recursionMode == "knot"
+    limit = machine.stepLimit + 1 if machine.stepLimit is not None else 0
+
+    stackItems = machine.stackItems
+    push = stackItems.append
+    pop = stackItems.pop
+
+    # Opcodes as locals, which the loop reads faster than globals.
+    local, gamma, const, ret, binary, branch, lambda_, load, tau, unary, jump, resume = LOCAL, GAMMA, CONST, RETURN, BINARY, BRANCH, LAMBDA, LOAD, TAU, UNARY, JUMP, RESUME
+
+    # Return stack entries are (return address, environment to restore). The root marker stays at
+    # the bottom of the value stack, as in the CSE machine, until the program returns.
+    environment = rootMarker.environment
+    returns = [(-1, rootMarker.previous)]
+    environmentCount = machine.environmentCount
+    pc = program.entry
+    steps = 0
+
+    try:
+        while True:
+            op = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+            steps += 1
+            if steps == limit:
+                raise StepLimitExceeded(machine.stepLimit)
+
+            if op == local:
+                push(environment.values[arg])
+
+            elif op == gamma:
+                rator = pop()
+                rand = pop()
+                kind = type(rator)
+
+                # Rule 4/11: apply a closure in a new environment
+                if kind is Lambda:
+                    parameters = rator.parameters
+                    n = len(parameters)
+                    if n > 1:
+                        values = list(rand[:n])
+                        if len(values) < n:
+                            raise IndexError("tuple index out of range")
+                    else:
+                        values = [rand]
+                    environmentCount += 1
+                    callee = environmentClass(environmentCount, rator.environment, parameters, values)
+
+                    following = code[pc]
+                    if following == ret:
+                        pass                # Tail call: the callee returns straight to our caller
+                    elif following == resume and code[returns[-1][0]] == ret:
+                        returns.pop()       # Tail call at the end of an Eta application
+                    else:
+                        returns.append((pc, environment))
+                    environment = callee
+                    pc = starts[rator.number]
+
+                # Rule 10: tuple selection
+                elif kind is tuple or kind is RpalTuple:
+                    push(rator[rand - 1])
+
+                # Rule 13: unfold one level of recursion
+                elif kind is Eta:
+                    push(rand)
+                    push(rator)
+                    push(Lambda(rator.number, rator.boundedVariable, rator.environment, rator.parameters))
+                    returns.append((pc, None))
+                    pc = 0
+
+                # Rule 12
+                elif rator == "Y*":
+                    machine.environmentCount = environmentCount
+                    if not (knot and machine.tieKnot(rand)):
+                        push(Eta(rand.number, rand.boundedVariable, rand.environment, rand.parameters))
+                    environmentCount = machine.environmentCount
+
+                elif rator in builtInFunctions:
+                    if rator == "Conc":
+                        # Takes its second argument straight away, with the application that would pass it.
+                        # At the end of a body the CSE machine finds the body's environment marker instead.
+                        second = rootMarker if code[pc] == ret else pop()
+                        pc += 2
+                        push(rand + second)
+                    else:
+                        machine.builtIn(rator, rand)
+
+            elif op == const:
+                push(constants[arg])
+
+            elif op == ret:
+                pc, environment = returns.pop()
+                if pc < 0:
+                    value = pop()
+                    pop()
+                    push(value)
+                    break
+
+            elif op == binary:
+                rand1 = pop()
+                rand2 = pop()
+                push(functions[arg](rand1, rand2))
+
+            elif op == branch:
+                if not pop():
+                    pc = arg
+
+            elif op == lambda_:
+                template = templates[arg]
+                push(Lambda(template.number, template.boundedVariable, environment, template.parameters))
+
+            elif op == load:
+                depth, slot = addresses[arg]
+                frame = environment
+                while depth:
+                    frame = frame.parent
+                    depth -= 1
+                push(frame.values[slot])
+
+            elif op == tau:
+                if arg > len(stackItems):
+                    raise IndexError("tau")
+                items = tuple(stackItems[:-arg - 1:-1])
+                del stackItems[-arg:]
+                push(items)
+
+            elif op == unary:
+                push(functions[arg](pop()))
+
+            # Jumps and leaving the Eta code are not steps of the CSE machine.
+            elif op == jump:
+                pc = arg
+                steps -= 1
+
+            elif op == resume:
+                pc = returns.pop()[0]
+                steps -= 1
+
+    except IndexError:
+        if not stackItems:
+            machine.stack.pop()             # Reports the stack underflow and exits
+        raise
+
+    machine.environmentCount = environmentCount
+    machine.currentEnvironment = environment
+    machine.stepCount = steps